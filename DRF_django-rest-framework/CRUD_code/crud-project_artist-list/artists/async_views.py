@@ -0,0 +1,137 @@
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework import status
+from rest_framework.utils.encoders import JSONEncoder
+
+from singer_api_service.instrumentation import timed
+
+from .models import Artists
+from .serializers import ArtistsSerializer, ArtistsListSerializer, ArtistsEditSerializer
+from .projection import serialize_row, values_fields, values_queryset
+from .updates import VersionConflict, aupdate_changed_fields, aupdate_with_version, conflict_data, etag, expected_version
+
+
+# views.py 의 artists_create / artists_list / artists_detail 를 async 함수로 만든 버전
+# ASGI로 실행할 때 동기 뷰는 요청마다 sync_to_async 스레드를 하나씩 차지하지만
+# async 뷰는 이벤트 루프에서 바로 실행되고 ORM 호출(aget, acreate, async for)만 DB 쪽으로 넘어감
+# @api_view는 동기 뷰만 감쌀 수 있으므로 요청 파싱 / 메소드 검사 / JSON 응답은 여기서 직접 처리함
+# settings.ARTISTS_ASYNC_VIEWS 가 True면 urls.py 에서 이 뷰들을 사용
+
+
+def async_api_view(methods):
+  def decorator(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+      if request.method not in methods:
+        return json_response(
+          {'detail': f'Method "{request.method}" not allowed.'},
+          status=status.HTTP_405_METHOD_NOT_ALLOWED,
+          headers={'Allow': ', '.join(methods)},
+        )
+      try:
+        data = parse_body(request) if request.method in ('POST', 'PUT', 'PATCH') else None
+      except ValueError as exc:
+        return json_response({'detail': f'JSON parse error - {exc}'}, status=status.HTTP_400_BAD_REQUEST)
+      return await view(request, data, *args, **kwargs)
+    # api_view처럼 세션 인증이 없는 API는 CSRF 검사를 하지 않음
+    # (장고 4.2의 csrf_exempt 데코레이터는 뷰를 동기 함수로 감싸버리기 때문에 속성만 직접 지정)
+    wrapper.csrf_exempt = True
+    return wrapper
+  return decorator
+
+
+def parse_body(request):
+  if request.content_type == 'application/json':
+    return json.loads(request.body or b'{}')
+  return request.POST
+
+
+def json_response(data, status=status.HTTP_200_OK, headers=None):
+  # DRF JSONRenderer와 같은 인코더로 같은 모양의 응답을 만듦
+  with timed('render'):
+    return JsonResponse(
+      data, status=status, headers=headers, safe=False,
+      encoder=JSONEncoder, json_dumps_params={'ensure_ascii': False},
+    )
+
+
+def not_found():
+  return json_response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+
+async def get_artist(page_pk):
+  try:
+    return await Artists.objects.aget(pk=page_pk)
+  except Artists.DoesNotExist:
+    return None
+
+
+@async_api_view(['POST'])
+async def artists_create(request, data):
+  serializer = ArtistsSerializer(data=data)
+  # (name, debut_data) 중복 검사가 DB를 조회하므로 is_valid는 스레드에서 실행
+  if not await sync_to_async(serializer.is_valid)():
+    return json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+  artist = await Artists.objects.acreate(**serializer.validated_data)
+  return json_response(ArtistsSerializer(artist).data, status=status.HTTP_201_CREATED)
+
+
+@async_api_view(['GET'])
+async def artists_list(request, data):
+  # 출력하는 컬럼만 values_list로 async for 로 읽어서 모델 인스턴스 없이 바로 dict로 변환 (projection.py)
+  fields = values_fields(ArtistsListSerializer)
+  rows = values_queryset(Artists.objects.all(), ArtistsListSerializer)
+  with timed('serialize'):
+    data = [serialize_row(row, fields) async for row in rows]
+  return json_response(data)
+
+
+## 상세 페이지
+@async_api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
+async def artists_detail(request, data, page_pk):
+  # agency와 is_group만 수정 가능 (views.artists_detail 과 같은 방식, updates.py)
+  if request.method in ('PUT', 'PATCH'):
+    serializer = ArtistsEditSerializer(data=data, partial=request.method == 'PATCH')
+    if not serializer.is_valid():
+      return json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    changes = dict(serializer.validated_data)
+    expected, precondition = expected_version(request, changes)
+    if expected is not None:
+      try:
+        version = await aupdate_with_version(page_pk, changes, expected, precondition)
+      except Artists.DoesNotExist:
+        return not_found()
+      except VersionConflict as conflict:
+        return json_response(
+          conflict_data(conflict),
+          status=status.HTTP_412_PRECONDITION_FAILED if conflict.precondition else status.HTTP_409_CONFLICT,
+          headers={'ETag': etag(conflict.current_version)},
+        )
+      return json_response({**changes, 'version': version}, status=status.HTTP_202_ACCEPTED, headers={'ETag': etag(version)})
+
+    artist = await get_artist(page_pk)
+    if artist is None:
+      return not_found()
+    await aupdate_changed_fields(artist, changes)
+    return json_response(
+      ArtistsEditSerializer(artist).data, status=status.HTTP_202_ACCEPTED, headers={'ETag': etag(artist.version)},
+    )
+
+  artist = await get_artist(page_pk)
+  if artist is None:
+    return not_found()
+
+  if request.method == 'GET':
+    return json_response(ArtistsSerializer(artist).data, headers={'ETag': etag(artist.version)})
+
+  elif request.method == 'DELETE':
+    pk = artist.pk
+    name = artist.name
+    await artist.adelete()
+    return json_response(
+      {'delete': f"'{pk}'번의 '{name}'을 삭제하였습니다."},
+      status=status.HTTP_204_NO_CONTENT,
+    )
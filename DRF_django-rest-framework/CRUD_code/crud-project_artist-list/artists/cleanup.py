@@ -0,0 +1,49 @@
+from django.db.models import Count, Q
+from django.db.models.functions import Length, Substr
+
+
+# 0003 마이그레이션(name / agency 를 CharField(max_length=100)로 바꾸고 (name, debut_data) UniqueConstraint 추가) 전에
+# 걸리는 데이터를 찾고 정리하는 함수
+# 마이그레이션은 데이터를 직접 고치지 않고 찾기만 해서 있으면 멈추고,
+# 정리는 python manage.py clean_artists --apply 로 운영자가 직접 실행 (artists/management/commands/clean_artists.py)
+# 마이그레이션에서 과거 모델(apps.get_model)의 queryset 으로도 호출하므로 아직 없는 컬럼(version 등)은 읽지 않음
+
+MAX_LENGTH = 100
+
+
+def find_long_values(artists):
+  # 100자를 넘는 name / agency 가 있는 행의 id
+  return list(
+    artists.annotate(name_length=Length('name'), agency_length=Length('agency'))
+    .filter(Q(name_length__gt=MAX_LENGTH) | Q(agency_length__gt=MAX_LENGTH))
+    .order_by('pk')
+    .values_list('pk', flat=True)
+  )
+
+
+def find_duplicates(artists):
+  # (100자로 자른 name, debut_data) 가 같은 행의 id 목록들 (자르고 나서 같아지는 이름도 중복)
+  rows = artists.annotate(short_name=Substr('name', 1, MAX_LENGTH))
+  groups = (
+    rows.values('short_name', 'debut_data')
+    .annotate(count=Count('id'))
+    .filter(count__gt=1)
+    .order_by('short_name', 'debut_data')
+  )
+  return [
+    list(
+      rows.filter(short_name=group['short_name'], debut_data=group['debut_data'])
+      .order_by('pk')
+      .values_list('pk', flat=True)
+    )
+    for group in groups
+  ]
+
+
+def describe_conflicts(long_ids, duplicates):
+  lines = []
+  if long_ids:
+    lines.append(f'name/agency longer than {MAX_LENGTH} characters: ids {long_ids}')
+  for ids in duplicates:
+    lines.append(f'duplicate (name, debut_data): ids {ids}')
+  return lines
@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.db import DatabaseError
+
+
+# SQLite FTS5 전문 검색(full-text search) 인덱스
+# name, agency 를 단어 단위로 색인해두기 때문에 icontains('%검색어%')처럼 테이블 전체를 훑지 않고 검색 가능
+# external content 테이블이라 원본 데이터는 artists_artists 에만 있고, 트리거로 색인만 같이 갱신함
+FTS_TABLE = 'artists_artists_fts'
+SOURCE_TABLE = 'artists_artists'
+
+CREATE_SQL = [
+  f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    name, agency, content='{SOURCE_TABLE}', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+  )""",
+  f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {SOURCE_TABLE} BEGIN
+    INSERT INTO {FTS_TABLE}(rowid, name, agency) VALUES (new.id, new.name, new.agency);
+  END""",
+  f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {SOURCE_TABLE} BEGIN
+    INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, agency) VALUES ('delete', old.id, old.name, old.agency);
+  END""",
+  f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, agency ON {SOURCE_TABLE} BEGIN
+    INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, agency) VALUES ('delete', old.id, old.name, old.agency);
+    INSERT INTO {FTS_TABLE}(rowid, name, agency) VALUES (new.id, new.name, new.agency);
+  END""",
+  # 이미 저장되어 있던 데이터도 색인
+  f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+  f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+  f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+  f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+  f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+
+def fts_enabled():
+  return getattr(settings, 'ARTISTS_SEARCH', {}).get('FTS', True)
+
+
+# 마이그레이션에서 호출 (RunPython)
+# SQLite가 아니거나 FTS5 없이 빌드된 SQLite면 색인 없이 넘어가고, 검색은 일반 인덱스를 쓰는 방식으로 동작
+def create_fts_index(apps, schema_editor):
+  connection = schema_editor.connection
+  if connection.vendor != 'sqlite' or not fts_enabled():
+    return
+  try:
+    with connection.cursor() as cursor:
+      cursor.execute('SAVEPOINT artists_fts')
+      for sql in CREATE_SQL:
+        cursor.execute(sql)
+      cursor.execute('RELEASE SAVEPOINT artists_fts')
+  except DatabaseError:
+    with connection.cursor() as cursor:
+      cursor.execute('ROLLBACK TO SAVEPOINT artists_fts')
+      cursor.execute('RELEASE SAVEPOINT artists_fts')
+
+
+def drop_fts_index(apps, schema_editor):
+  if schema_editor.connection.vendor != 'sqlite':
+    return
+  with schema_editor.connection.cursor() as cursor:
+    for sql in DROP_SQL:
+      cursor.execute(sql)
+
+
+def fts_available(connection):
+  # 검색할 때마다 sqlite_master를 조회하지 않도록 연결마다 한번만 확인
+  if connection.vendor != 'sqlite' or not fts_enabled():
+    return False
+  available = getattr(connection, '_artists_fts_available', None)
+  if available is None:
+    with connection.cursor() as cursor:
+      cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+      available = cursor.fetchone() is not None
+    connection._artists_fts_available = available
+  return available
+
+
+def match_expression(query):
+  # 사용자가 입력한 검색어를 FTS5 문법으로 변환
+  # 각 단어를 따옴표로 감싸서 특수문자(AND, OR, *, - 등)가 연산자로 해석되지 않게 하고
+  # 뒤에 * 를 붙여서 접두어 검색 ("블랙" -> "블랙핑크"도 검색)
+  terms = ['"' + term.replace('"', '""') + '"*' for term in query.split()]
+  return ' '.join(terms)
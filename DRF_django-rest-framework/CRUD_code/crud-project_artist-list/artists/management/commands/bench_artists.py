@@ -0,0 +1,117 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from artists.models import Artists
+
+
+AGENCIES = ['HYBE', 'SM', 'JYP', 'YG', 'EDAM', 'Starship', 'Cube', 'Pledis', 'RBW', 'WM']
+
+# 인덱스가 없던 스키마 (TextField, 인덱스 없음)
+BEFORE_MIGRATION = ('artists', '0001_initial')
+
+
+# 아티스트 목록/필터 조회 속도를 인덱스 마이그레이션 전후로 비교하는 벤치마크
+#   python manage.py bench_artists --rows 1000000
+# 실제 DB는 건드리지 않고 테스트 DB(임시)를 만들어서
+# 1) 0001 스키마로 되돌린 뒤 데이터를 넣고 측정  2) 최신 마이그레이션까지 적용한 뒤 다시 측정
+class Command(BaseCommand):
+  help = 'Compare artists list/filter latency before and after the schema/index migrations on a seeded throwaway database.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+
+  def handle(self, **options):
+    self.random = random.Random(options['seed'])
+    rows = options['rows']
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+      call_command('migrate', 'artists', BEFORE_MIGRATION[1], verbosity=0)
+      old_model = MigrationExecutor(connection).loader.project_state(BEFORE_MIGRATION).apps.get_model('artists', 'Artists')
+
+      started = time.perf_counter()
+      self.seed(old_model, rows, options['batch_size'])
+      self.stdout.write(f'seeded {rows:,} artists in {time.perf_counter() - started:.1f}s')
+
+      before = self.measure(old_model, rows, options['repeat'])
+
+      started = time.perf_counter()
+      call_command('migrate', 'artists', verbosity=0)
+      self.stdout.write(f'migrated to the indexed schema in {time.perf_counter() - started:.1f}s')
+
+      after = self.measure(Artists, rows, options['repeat'])
+      self.report(before, after)
+    finally:
+      connection.creation.destroy_test_db(old_name, verbosity=0)
+
+  def seed(self, model, rows, batch_size):
+    start = date(1990, 1, 1)
+    for offset in range(0, rows, batch_size):
+      model.objects.bulk_create([
+        model(
+          # (name, debut_data)가 유일하도록 이름에 번호를 붙임
+          name=f'artist-{i:07d}',
+          agency=self.random.choice(AGENCIES),
+          debut_data=start + timedelta(days=self.random.randrange(365 * 34)),
+          is_group=self.random.random() < 0.4,
+        )
+        for i in range(offset, min(offset + batch_size, rows))
+      ])
+    self.analyze()
+
+  def analyze(self):
+    # 통계 정보를 갱신해서 쿼리 플래너가 인덱스를 제대로 고르게 함 (전후 모두 동일하게 실행)
+    with connection.cursor() as cursor:
+      cursor.execute('ANALYZE')
+
+  def queries(self, model, rows):
+    name = f'artist-{self.random.randrange(rows):07d}'
+    agency = self.random.choice(AGENCIES)
+    return {
+      # artists_list 처럼 이름 순으로 정렬한 첫 페이지
+      'list ordered by name': lambda: list(model.objects.order_by('name').values('name', 'debut_data')[:100]),
+      'filter name =': lambda: list(model.objects.filter(name=name)),
+      'filter agency =': lambda: list(model.objects.filter(agency=agency).order_by('agency', 'id')[:100]),
+      'is_group + debut range': lambda: list(
+        model.objects.filter(is_group=True, debut_data__range=(date(2010, 1, 1), date(2010, 3, 31)))
+        .order_by('debut_data')[:100]
+      ),
+    }
+
+  def measure(self, model, rows, repeat):
+    results = {}
+    for label, query in self.queries(model, rows).items():
+      timings = []
+      for _ in range(repeat):
+        started = time.perf_counter()
+        query()
+        timings.append((time.perf_counter() - started) * 1000)
+      timings.sort()
+      results[label] = {
+        'median': statistics.median(timings),
+        'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+      }
+    return results
+
+  def report(self, before, after):
+    self.stdout.write('')
+    self.stdout.write(
+      f'{"query":<26}{"before ms":>12}{"before p95":>12}{"after ms":>12}{"after p95":>12}{"speedup":>10}'
+    )
+    for label in before:
+      b, a = before[label], after[label]
+      self.stdout.write(
+        f'{label:<26}{b["median"]:>12.3f}{b["p95"]:>12.3f}{a["median"]:>12.3f}{a["p95"]:>12.3f}'
+        f'{b["median"] / max(a["median"], 1e-6):>9.1f}x'
+      )
+    self.stdout.write('(ms columns are medians of the repeated runs)')
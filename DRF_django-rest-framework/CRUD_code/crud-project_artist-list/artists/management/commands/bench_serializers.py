@@ -0,0 +1,59 @@
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework import serializers
+
+from artists.models import Artists
+from artists.projection import serialize_row, values_fields
+from artists.serializers import ArtistsListSerializer
+
+
+# CompiledModelSerializer(컴파일된 직렬화) 와 일반 DRF ModelSerializer 의 목록 직렬화 속도 비교
+#   python manage.py bench_serializers --objects 100000
+# DB 없이 메모리에 만든 객체 목록을 many=True 로 직렬화하고, 두 결과가 같은지도 확인
+# values 열은 artists_list 가 쓰는 values_list 튜플 직렬화(projection.py)
+class Command(BaseCommand):
+  help = 'Benchmark compiled serializers against plain DRF ModelSerializers on large in-memory lists.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--objects', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+
+  def handle(self, **options):
+    count = options['objects']
+    start = date(1990, 1, 1)
+    artists = [
+      Artists(id=i, name=f'artist-{i}', agency='agency', debut_data=start + timedelta(days=i % 10000), is_group=False)
+      for i in range(1, count + 1)
+    ]
+    rows = [(artist.name, artist.debut_data) for artist in artists]
+
+    plain_class = plain_serializer(ArtistsListSerializer)
+    if plain_class(artists[:100], many=True).data != ArtistsListSerializer(artists[:100], many=True).data:
+      raise CommandError('ArtistsListSerializer: compiled output differs from DRF output.')
+
+    fields = values_fields(ArtistsListSerializer)
+    plain = self.measure(lambda: plain_class(artists, many=True).data, options['repeat'])
+    compiled = self.measure(lambda: ArtistsListSerializer(artists, many=True).data, options['repeat'])
+    values = self.measure(lambda: [serialize_row(row, fields) for row in rows], options['repeat'])
+
+    self.stdout.write(f'{"":<12}{"obj/s":>14}{"speedup":>10}')
+    for label, elapsed in (('plain', plain), ('compiled', compiled), ('values', values)):
+      self.stdout.write(f'{label:<12}{count / elapsed:>14,.0f}{plain / elapsed:>9.1f}x')
+    self.stdout.write('(median of the repeated runs)')
+
+  def measure(self, serialize, repeat):
+    timings = []
+    for _ in range(repeat):
+      started = time.perf_counter()
+      serialize()
+      timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def plain_serializer(serializer_class):
+  # 같은 Meta(model, fields)를 가진 일반 DRF ModelSerializer
+  meta = type('Meta', (), {'model': serializer_class.Meta.model, 'fields': serializer_class.Meta.fields})
+  return type(f'Plain{serializer_class.__name__}', (serializers.ModelSerializer,), {'Meta': meta})
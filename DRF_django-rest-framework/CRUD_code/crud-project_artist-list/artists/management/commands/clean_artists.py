@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.functions import Substr
+
+from artists.cleanup import MAX_LENGTH, describe_conflicts, find_duplicates, find_long_values
+from artists.models import Artists
+
+
+# 0003 마이그레이션 전에 마이그레이션을 막는 데이터를 확인 / 정리하는 명령어
+#   python manage.py clean_artists            # 확인만 (아무것도 바꾸지 않음)
+#   python manage.py clean_artists --apply    # 정리
+# --apply 는
+#   - 100자를 넘는 name / agency 를 100자로 자름
+#   - (name, debut_data) 가 같은 행 중 가장 먼저 등록된 행(id가 가장 작은 행)만 남기고 지움
+#   - 바꾸거나 지운 행의 원래 값을 모두 출력 (필요하면 다시 넣을 수 있게)
+class Command(BaseCommand):
+  help = 'Report (or with --apply, fix) artists rows that block the unique (name, debut_data) migration.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--apply', action='store_true', help='Truncate long values and delete duplicate rows.')
+    parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+  def handle(self, **options):
+    artists = Artists.objects.using(options['database'])
+    with transaction.atomic(using=options['database']):
+      long_ids = find_long_values(artists)
+      duplicates = find_duplicates(artists)
+      lines = describe_conflicts(long_ids, duplicates)
+      if not lines:
+        self.stdout.write(self.style.SUCCESS('No conflicting artists.'))
+        return
+      for line in lines:
+        self.stdout.write(line)
+      if not options['apply']:
+        self.stdout.write('Run again with --apply to truncate long values and delete duplicates (keeping the lowest id).')
+        return
+
+      # 잘린 이름으로 중복을 찾았으므로 자르기 -> 중복 지우기 순서
+      for row in artists.filter(pk__in=long_ids).values('id', 'name', 'agency'):
+        self.stdout.write(f'Truncated artist: {row}')
+      for field in ('name', 'agency'):
+        artists.filter(pk__in=long_ids).update(**{field: Substr(field, 1, MAX_LENGTH)})
+      for ids in duplicates:
+        keep, *removed = ids
+        for row in artists.filter(pk__in=removed).values('id', 'name', 'agency', 'debut_data', 'is_group'):
+          self.stdout.write(f'Deleted duplicate artist (kept id={keep}): {row}')
+        artists.filter(pk__in=removed).delete()
+      self.stdout.write(self.style.SUCCESS(f'Truncated {len(long_ids)} and deleted {sum(len(ids) - 1 for ids in duplicates)} artists.'))
+
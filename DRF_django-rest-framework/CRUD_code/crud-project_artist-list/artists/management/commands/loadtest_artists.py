@@ -0,0 +1,201 @@
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import include, path
+
+from artists.models import Artists
+from artists.urls import async_urlpatterns, sync_urlpatterns
+
+
+# 배포 방식별 URLConf (ROOT_URLCONF에는 모듈 대신 urlpatterns 속성을 가진 객체도 넣을 수 있음)
+class SyncURLConf:
+  urlpatterns = [path('api/v1/', include(sync_urlpatterns))]
+
+
+class AsyncURLConf:
+  urlpatterns = [path('api/v1/', include(async_urlpatterns))]
+
+
+# (이름, 사용할 핸들러, URLConf)
+#   wsgi       : 지금 배포 방식 (WSGIHandler + 동기 뷰, 스레드 여러개로 동시 요청)
+#   asgi-sync  : ASGIHandler + 동기 뷰 (요청마다 sync_to_async 스레드를 거침)
+#   asgi-async : ASGIHandler + async 뷰 (ARTISTS_ASYNC_VIEWS=1)
+SCENARIOS = [
+  ('wsgi', 'wsgi', SyncURLConf),
+  ('asgi-sync', 'asgi', SyncURLConf),
+  ('asgi-async', 'asgi', AsyncURLConf),
+]
+
+
+# WSGI / ASGI 배포 방식의 처리량(requests/sec)과 지연시간(p50 / p99)을 비교하는 부하 테스트
+#   python manage.py loadtest_artists --requests 2000 --concurrency 32
+# 실제 DB는 건드리지 않고 테스트 DB(임시)에 아티스트를 넣은 뒤
+# 같은 요청 목록(목록 / 상세 조회, --write-ratio 만큼 생성)을 각 방식에 똑같이 보냄
+# 서버 프로세스 없이 장고의 WSGI(Client) / ASGI(AsyncClient) 핸들러를 직접 호출하므로 네트워크 비용은 포함되지 않음
+# AsyncClient는 ASGIHandler와 달리 요청마다 ThreadSensitiveContext를 만들지 않아서
+# 동시에 처리 중인 모든 요청의 동기 코드(동기 뷰, async 뷰의 ORM 호출)가 스레드 하나에 줄을 서게 됨
+# 실제 ASGI 서버처럼 요청마다 ThreadSensitiveContext로 감싸서 요청별 스레드 / DB 연결을 사용
+# 측정 결과 (CPU 1개, SQLite, --requests 2000, --concurrency 1 / 4 / 32)
+#   wsgi 373~409 req/s, asgi-sync 126~135 req/s, asgi-async 123~155 req/s
+#   ASGI는 요청마다 새 스레드와 새 DB 연결을 쓰기 때문에 짧은 SQLite 조회뿐인 이 API에서는 WSGI가 2.5~3배 빠름
+#   async 뷰는 asgi-sync 보다 조금 나을 뿐이므로 기본 배포는 WSGI 그대로 둠 (ARTISTS_ASYNC_VIEWS=0)
+class Command(BaseCommand):
+  help = 'Compare requests/sec and p99 latency of the artists API served through WSGI and ASGI (sync and async views).'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--rows', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--write-ratio', type=float, default=0.0, help='Fraction of requests that create an artist.')
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument(
+      '--scenario', action='append', choices=[name for name, _, _ in SCENARIOS],
+      help='Run only the given scenario (repeatable).',
+    )
+
+  def handle(self, **options):
+    self.random = random.Random(options['seed'])
+    selected = options['scenario'] or [name for name, _, _ in SCENARIOS]
+    old_name = connection.settings_dict['NAME']
+    workdir = tempfile.mkdtemp()
+    if connection.vendor == 'sqlite':
+      # 메모리 DB(shared cache)는 스레드끼리 테이블 잠금 오류가 나므로 임시 파일 DB를 사용
+      connection.settings_dict['TEST']['NAME'] = os.path.join(workdir, 'loadtest.sqlite3')
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+      pks = self.seed(options['rows'])
+      results = []
+      for name, handler, urlconf in SCENARIOS:
+        if name not in selected:
+          continue
+        plan = self.plan(pks, options['requests'], options['write_ratio'], name)
+        warmup = self.plan(pks, options['warmup'], 0, name)
+        # 테스트 클라이언트의 Host(testserver)를 허용
+        with override_settings(ROOT_URLCONF=urlconf, ALLOWED_HOSTS=['testserver']):
+          run = self.run_wsgi if handler == 'wsgi' else self.run_asgi
+          run(warmup, options['concurrency'])
+          elapsed, latencies, errors = run(plan, options['concurrency'])
+        results.append((name, elapsed, latencies, errors))
+      self.report(results)
+    finally:
+      connection.creation.destroy_test_db(old_name, verbosity=0)
+      shutil.rmtree(workdir, ignore_errors=True)
+
+  def seed(self, rows):
+    start = date(1990, 1, 1)
+    Artists.objects.bulk_create([
+      Artists(
+        name=f'artist-{i:05d}',
+        agency=f'agency-{i % 10}',
+        debut_data=start + timedelta(days=i),
+        is_group=i % 3 == 0,
+      )
+      for i in range(rows)
+    ])
+    return list(Artists.objects.values_list('pk', flat=True))
+
+  def plan(self, pks, count, write_ratio, prefix):
+    # (method, url, data) 목록, 시나리오마다 같은 비율의 요청을 만듦
+    requests = []
+    for i in range(count):
+      roll = self.random.random()
+      if roll < write_ratio:
+        # (name, debut_data)가 겹치지 않도록 시나리오 이름과 번호를 붙임
+        data = {'name': f'{prefix}-{i}', 'agency': 'bench', 'debut_data': '2024-01-01', 'is_group': False}
+        requests.append(('post', '/api/v1/artists_create/', data))
+      elif roll < write_ratio + (1 - write_ratio) / 2:
+        requests.append(('get', '/api/v1/total_list/', None))
+      else:
+        requests.append(('get', f'/api/v1/detail/{self.random.choice(pks)}/', None))
+    return requests
+
+  def run_wsgi(self, plan, concurrency):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    queue = iter(plan)
+
+    def worker():
+      client = Client(raise_request_exception=False)
+      try:
+        while True:
+          with lock:
+            item = next(queue, None)
+          if item is None:
+            return
+          method, url, data = item
+          started = time.perf_counter()
+          response = getattr(client, method)(url, data, content_type='application/json') if data else getattr(client, method)(url)
+          elapsed = time.perf_counter() - started
+          with lock:
+            latencies.append(elapsed)
+            if response.status_code >= 400:
+              errors.append(response.status_code)
+      finally:
+        # 스레드마다 열린 DB 연결 정리
+        connections.close_all()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    return time.perf_counter() - started, latencies, errors
+
+  def run_asgi(self, plan, concurrency):
+    # async_to_sync 로 실행하면 그 안의 모든 sync_to_async(thread_sensitive) 호출이
+    # async_to_sync 를 부른 스레드(이 명령의 메인 스레드)로 모이므로 ASGI 서버처럼 새 이벤트 루프에서 실행
+    return asyncio.run(self.arun_asgi(plan, concurrency))
+
+  async def arun_asgi(self, plan, concurrency):
+    latencies = []
+    errors = []
+    queue = iter(plan)
+    client = AsyncClient(raise_request_exception=False)
+
+    async def worker():
+      # 이벤트 루프 하나에서 동시에 실행되므로 next()에 잠금이 필요 없음
+      for method, url, data in queue:
+        started = time.perf_counter()
+        async with ThreadSensitiveContext():
+          if data:
+            response = await getattr(client, method)(url, data, content_type='application/json')
+          else:
+            response = await getattr(client, method)(url)
+          # 요청이 끝나면 그 요청의 스레드에서 연 DB 연결을 닫음 (스레드도 같이 없어지므로)
+          await sync_to_async(connections.close_all)()
+        latencies.append(time.perf_counter() - started)
+        if response.status_code >= 400:
+          errors.append(response.status_code)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies, errors
+
+  def report(self, results):
+    self.stdout.write(f"{'scenario':<12} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, elapsed, latencies, errors in results:
+      self.stdout.write(
+        f'{name:<12} {len(latencies):>9} {len(errors):>7} {len(latencies) / max(elapsed, 1e-9):>9.1f} '
+        f'{percentile(latencies, 50) * 1000:>9.2f} {percentile(latencies, 99) * 1000:>9.2f}'
+      )
+
+
+def percentile(values, pct):
+  if not values:
+    return 0.0
+  values = sorted(values)
+  return values[min(len(values) - 1, int(len(values) * pct / 100))]
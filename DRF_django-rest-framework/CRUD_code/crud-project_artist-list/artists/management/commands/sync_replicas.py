@@ -0,0 +1,32 @@
+import sqlite3
+from contextlib import closing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+# settings.DATABASE_REPLICAS 의 SQLite 파일을 default DB의 지금 내용으로 덮어쓰는 명령어 (로컬에서 replica 를 흉내낼 때 사용)
+#   DATABASE_REPLICAS=2 python manage.py migrate
+#   DATABASE_REPLICAS=2 python manage.py sync_replicas
+#   DATABASE_REPLICAS=2 python manage.py runserver
+# 다시 실행하기 전까지 replica 는 예전 데이터 그대로라서 replication lag 가 있을 때의 동작(singer_api_service/routers.py)을 확인할 수 있음
+# 실제 replica 는 DB 서버가 복제하므로(PostgreSQL streaming replication 등) 이 명령은 SQLite 에서만 동작
+class Command(BaseCommand):
+  help = 'Copy the default SQLite database into every replica database file.'
+
+  def handle(self, **options):
+    replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+    if not replicas:
+      raise CommandError('No replicas configured (set DATABASE_REPLICAS).')
+    source = connections[DEFAULT_DB_ALIAS]
+    if source.vendor != 'sqlite':
+      raise CommandError('sync_replicas only copies SQLite databases.')
+    source.ensure_connection()
+    for alias in replicas:
+      target = connections[alias]
+      target.close()
+      # sqlite3 backup API : 복사하는 동안에도 default 는 계속 사용할 수 있음
+      with closing(sqlite3.connect(target.settings_dict['NAME'])) as destination:
+        source.connection.backup(destination)
+      self.stdout.write(f"{DEFAULT_DB_ALIAS} -> {alias} ({target.settings_dict['NAME']})")
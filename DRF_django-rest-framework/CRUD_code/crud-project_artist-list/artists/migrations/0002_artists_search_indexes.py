@@ -0,0 +1,25 @@
+# Generated by Django 4.2.20 on 2026-10-18 14:01
+
+from django.db import migrations, models
+
+from artists.fts import create_fts_index, drop_fts_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artists', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='artists',
+            index=models.Index(fields=['is_group', 'debut_data'], name='artists_group_debut_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='artists',
+            index=models.Index(fields=['debut_data'], name='artists_debut_idx'),
+        ),
+        # name, agency 전문 검색용 SQLite FTS5 색인 (SQLite가 아니면 아무것도 안함)
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.20 on 2026-10-18 14:01
+
+from django.core.management.base import CommandError
+from django.db import migrations, models
+
+from artists.cleanup import describe_conflicts, find_duplicates, find_long_values
+from artists.fts import create_fts_index, drop_fts_index
+
+
+# TextField -> CharField(max_length=100) 와 (name, debut_data) UniqueConstraint 를 만들 수 없는 데이터가 있으면
+# 데이터를 고치지 않고 문제가 되는 id 를 알려주고 멈춤
+# (100자를 넘는 값은 PostgreSQL 등에서 변경 자체가 실패하고, 100자로 자른 뒤 같아지는 이름도 중복)
+# 정리는 python manage.py clean_artists 로 확인하고 clean_artists --apply 로 직접 실행한 뒤 다시 migrate
+def check_conflicts(apps, schema_editor):
+    Artists = apps.get_model('artists', 'Artists')
+    artists = Artists.objects.using(schema_editor.connection.alias)
+    lines = describe_conflicts(find_long_values(artists), find_duplicates(artists))
+    if lines:
+        raise CommandError(
+            'Cannot migrate artists: ' + '; '.join(lines)
+            + '. Run "python manage.py clean_artists --apply" (after checking "python manage.py clean_artists") first.'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artists', '0002_artists_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_conflicts, migrations.RunPython.noop),
+        # SQLite는 컬럼을 바꿀 때 테이블을 새로 만들어 복사하기 때문에 기존 테이블에 걸린 FTS 트리거가 사라짐
+        # 변경 전에 FTS 색인을 지우고 변경이 끝난 뒤 다시 만듦
+        migrations.RunPython(drop_fts_index, create_fts_index),
+        migrations.AlterField(
+            model_name='artists',
+            name='agency',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='artists',
+            name='name',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.AddConstraint(
+            model_name='artists',
+            constraint=models.UniqueConstraint(fields=('name', 'debut_data'), name='artists_unique_name_debut'),
+        ),
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.20 on 2026-10-18 14:09
+
+from django.db import migrations, models
+
+from artists.fts import create_fts_index, drop_fts_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artists', '0003_artists_bounded_fields_and_indexes'),
+    ]
+
+    operations = [
+        # SQLite는 CHECK 제약이 있는 컬럼을 추가할 때 테이블을 새로 만들기 때문에 FTS 트리거를 지웠다가 다시 만듦
+        migrations.RunPython(drop_fts_index, create_fts_index),
+        migrations.AddField(
+            model_name='artists',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
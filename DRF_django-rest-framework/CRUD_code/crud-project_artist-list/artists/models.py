@@ -2,7 +2,21 @@ from django.db import models
 
 # Create your models here.
 class Artists(models.Model):
-  name = models.TextField(max_length=100)
-  agency = models.TextField()
+  # 길이 제한이 있는 CharField(varchar)로 바꾸고 검색/정렬에 쓰는 컬럼에 인덱스 추가
+  name = models.CharField(max_length=100, db_index=True)
+  agency = models.CharField(max_length=100, db_index=True)
   debut_data = models.DateField()
-  is_group = models.BooleanField()
\ No newline at end of file
+  is_group = models.BooleanField()
+  # 낙관적 동시성 제어용 버전 (수정할 때마다 1씩 증가, If-Match / version 으로 확인)
+  version = models.PositiveIntegerField(default=1, editable=False)
+
+  class Meta:
+    # 검색 필터(is_group + 데뷔일 범위, 데뷔일 범위만)에 쓰는 인덱스
+    indexes = [
+      models.Index(fields=['is_group', 'debut_data'], name='artists_group_debut_idx'),
+      models.Index(fields=['debut_data'], name='artists_debut_idx'),
+    ]
+    # 같은 이름 + 같은 데뷔일의 아티스트가 중복으로 등록되지 않게 막기
+    constraints = [
+      models.UniqueConstraint(fields=['name', 'debut_data'], name='artists_unique_name_debut'),
+    ]
@@ -0,0 +1,85 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+# 시리얼라이저가 실제로 출력하는 필드만 DB에서 가져오기
+# ArtistsListSerializer 는 name, debut_data 만 출력하는데 Artists.objects.all() 은 모든 컬럼을 읽고
+# 행마다 모델 인스턴스를 만든 뒤 DRF가 필드마다 getattr -> to_representation 을 거침
+#   - project_queryset : Meta.fields 에서 컬럼 목록을 구해서 .only() 로 필요한 컬럼만 조회
+#   - serialize_values : 모든 필드가 모델 컬럼을 그대로 출력하면 values_list() 튜플에서 바로 dict를 만듦
+#                        (모델 인스턴스를 만들지 않음), 아니면 .only() 한 queryset을 시리얼라이저로 직렬화
+
+
+@lru_cache(maxsize=None)
+def get_projection(serializer_class):
+  # (컬럼 목록, values_list 로 직렬화할 (출력 이름, 필드) 목록 또는 None)
+  model = serializer_class.Meta.model
+  columns = []
+  flat_fields = []
+  for field in serializer_class().fields.values():
+    if field.write_only:
+      continue
+    # SerializerMethodField, source='*', 관계를 따라가는 source('a.b') 등은 컬럼 하나로 대응되지 않음
+    model_field = get_concrete_field(model, field)
+    if model_field is None:
+      columns = None
+      flat_fields = None
+      break
+    columns.append(model_field.attname)
+    flat_fields.append((field.field_name, field))
+  if columns is None:
+    return None, None
+  if model._meta.pk.attname not in columns:
+    # .only()는 pk를 항상 포함하므로 목록에 넣어둠 (values_list 에는 출력 필드만 사용)
+    only_columns = (model._meta.pk.attname, *columns)
+  else:
+    only_columns = tuple(columns)
+  return only_columns, tuple(flat_fields)
+
+
+def get_concrete_field(model, field):
+  if isinstance(field, (serializers.SerializerMethodField, serializers.BaseSerializer)):
+    return None
+  if len(field.source_attrs) != 1:
+    return None
+  try:
+    model_field = model._meta.get_field(field.source_attrs[0])
+  except FieldDoesNotExist:
+    return None
+  if not model_field.concrete or model_field.is_relation:
+    return None
+  return model_field
+
+
+def project_queryset(queryset, serializer_class):
+  columns, _ = get_projection(serializer_class)
+  if columns is None:
+    return queryset
+  return queryset.only(*columns)
+
+
+def values_fields(serializer_class):
+  # values_list 로 바로 직렬화할 수 있으면 (출력 이름, 필드) 목록, 아니면 None
+  return get_projection(serializer_class)[1]
+
+
+def values_queryset(queryset, serializer_class):
+  fields = values_fields(serializer_class)
+  return queryset.values_list(*(field.source_attrs[0] for _, field in fields))
+
+
+def serialize_row(row, fields):
+  # DRF Serializer.to_representation 과 같이 None은 그대로, 나머지는 필드의 to_representation 으로 변환
+  return {
+    name: None if value is None else field.to_representation(value)
+    for (name, field), value in zip(fields, row)
+  }
+
+
+def serialize_values(queryset, serializer_class):
+  fields = values_fields(serializer_class)
+  if fields is None:
+    return serializer_class(project_queryset(queryset, serializer_class), many=True).data
+  return [serialize_row(row, fields) for row in values_queryset(queryset, serializer_class)]
@@ -0,0 +1,36 @@
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .fts import FTS_TABLE, fts_available, match_expression
+from .models import Artists
+
+
+# 아티스트 검색
+#   q : 이름(name), 소속사(agency)에서 찾을 검색어
+#   is_group : 그룹 여부
+#   debut_from, debut_to : 데뷔일 범위
+def search_artists(q='', is_group=None, debut_from=None, debut_to=None, limit=20):
+  artists = Artists.objects.all()
+
+  # 공백뿐인 검색어는 검색어가 없는 것과 같음 (빈 MATCH 식은 FTS5 문법 오류)
+  q = q.strip()
+  if q:
+    # 색인이 있는지는 이 queryset 을 실제로 읽을 DB(router 가 고른 replica 등)에서 확인
+    if fts_available(connections[artists.db]):
+      # FTS5 색인에서 일치하는 rowid(=id)만 골라서 조회
+      artists = artists.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match_expression(q)],
+      ))
+    else:
+      # FTS를 쓸 수 없는 DB에서는 인덱스를 탈 수 있는 접두어 검색으로 대신함
+      artists = artists.filter(Q(name__istartswith=q) | Q(agency__istartswith=q))
+
+  if is_group is not None:
+    artists = artists.filter(is_group=is_group)
+  if debut_from is not None:
+    artists = artists.filter(debut_data__gte=debut_from)
+  if debut_to is not None:
+    artists = artists.filter(debut_data__lte=debut_to)
+
+  return artists.order_by('name', 'id')[:limit]
@@ -1,20 +1,39 @@
 from rest_framework import serializers
 from .models import Artists
+from .compiled import CompiledModelSerializer
+from singer_api_service.instrumentation import TimedSerializerMixin
 
 
-class ArtistsSerializer(serializers.ModelSerializer):
+class ArtistsSerializer(TimedSerializerMixin, serializers.ModelSerializer):
   class Meta:
     model = Artists
     fields = '__all__'
 
   
-class ArtistsListSerializer(serializers.ModelSerializer):
+class ArtistsListSerializer(TimedSerializerMixin, CompiledModelSerializer):
   class Meta:
     model = Artists
     fields = ('name','debut_data',)
 
 
-class ArtistsEditSerializer(serializers.ModelSerializer):
+class ArtistsEditSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+  # 클라이언트가 마지막으로 본 버전 (보내면 그 버전일 때만 수정, If-Match 헤더로도 보낼 수 있음)
+  version = serializers.IntegerField(required=False, min_value=1)
+
   class Meta:
     model = Artists
-    fields = ('agency','is_group',)
\ No newline at end of file
+    fields = ('agency','is_group','version',)
+
+
+# 검색 요청의 쿼리스트링(?q=&is_group=&debut_from=&debut_to=&limit=)을 검사하는 시리얼라이저
+class ArtistsSearchSerializer(serializers.Serializer):
+  q = serializers.CharField(required=False, allow_blank=True, default='', max_length=100)
+  is_group = serializers.BooleanField(required=False, allow_null=True, default=None)
+  debut_from = serializers.DateField(required=False, default=None)
+  debut_to = serializers.DateField(required=False, default=None)
+  limit = serializers.IntegerField(required=False, min_value=1)
+
+  def validate(self, attrs):
+    if attrs['debut_from'] and attrs['debut_to'] and attrs['debut_from'] > attrs['debut_to']:
+      raise serializers.ValidationError('debut_from은 debut_to보다 늦을 수 없습니다.')
+    return attrs
@@ -1,3 +1,357 @@
-from django.test import TestCase
+import io
+import time
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, router
+from django.http import HttpResponse
+from django.db.migrations.executor import MigrationExecutor
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path
+
+from singer_api_service.instrumentation import InstrumentationMiddleware
+from singer_api_service.routers import PrimaryStickinessMiddleware
+
+from .management.commands.bench_serializers import plain_serializer
+from .fts import fts_available
+from .models import Artists
+from .search import search_artists
+from .projection import get_projection, serialize_values
+from .serializers import ArtistsListSerializer
+from .urls import async_urlpatterns
 
 # Create your tests here.
+
+
+class AsyncURLConf:
+  urlpatterns = [path('api/v1/', include(async_urlpatterns))]
+
+
+# ARTISTS_ASYNC_VIEWS=1 일 때 사용하는 async 뷰
+@override_settings(ROOT_URLCONF=AsyncURLConf)
+class AsyncViewsTest(TestCase):
+  async def test_create_list_detail(self):
+    data = {'name': 'IU', 'agency': 'EDAM', 'debut_data': '2008-09-18', 'is_group': False}
+    response = await self.async_client.post('/api/v1/artists_create/', data, content_type='application/json')
+    self.assertEqual(response.status_code, 201)
+    pk = response.json()['id']
+
+    # 같은 이름 + 데뷔일은 중복 검사에 걸림
+    response = await self.async_client.post('/api/v1/artists_create/', data, content_type='application/json')
+    self.assertEqual(response.status_code, 400)
+
+    response = await self.async_client.get('/api/v1/total_list/')
+    self.assertEqual(response.json(), [{'name': 'IU', 'debut_data': '2008-09-18'}])
+
+    response = await self.async_client.put(
+      f'/api/v1/detail/{pk}/', {'agency': 'EDAM Entertainment', 'is_group': False}, content_type='application/json',
+    )
+    self.assertEqual(response.status_code, 202)
+    self.assertEqual((await Artists.objects.aget(pk=pk)).agency, 'EDAM Entertainment')
+
+    response = await self.async_client.delete(f'/api/v1/detail/{pk}/')
+    self.assertEqual(response.status_code, 204)
+    self.assertFalse(await Artists.objects.filter(pk=pk).aexists())
+
+  async def test_missing_artist_and_wrong_method(self):
+    self.assertEqual((await self.async_client.get('/api/v1/detail/999/')).status_code, 404)
+    response = await self.async_client.get('/api/v1/artists_create/')
+    self.assertEqual(response.status_code, 405)
+    self.assertEqual(response['Allow'], 'POST')
+
+
+class ProjectionTest(TestCase):
+  def setUp(self):
+    Artists.objects.create(name='IU', agency='EDAM', debut_data='2008-09-18', is_group=False)
+    Artists.objects.create(name='BTS', agency='HYBE', debut_data='2013-06-13', is_group=True)
+
+  def test_columns_come_from_serializer_fields(self):
+    self.assertEqual(get_projection(ArtistsListSerializer)[0], ('id', 'name', 'debut_data'))
+
+  def test_values_fast_path_matches_serializer(self):
+    queryset = Artists.objects.order_by('pk')
+    self.assertEqual(
+      serialize_values(queryset, ArtistsListSerializer),
+      [dict(item) for item in ArtistsListSerializer(queryset, many=True).data],
+    )
+
+  def test_list_reads_only_serialized_columns(self):
+    with CaptureQueriesContext(connection) as queries:
+      response = self.client.get('/api/v1/total_list/')
+    self.assertEqual(len(response.json()), 2)
+    self.assertEqual(len(queries), 1)
+    self.assertNotIn('agency', queries[0]['sql'])
+
+
+class CompiledSerializerTest(TestCase):
+  def test_compiled_output_matches_drf(self):
+    Artists.objects.create(name='IU', agency='EDAM', debut_data='2008-09-18', is_group=False)
+    queryset = Artists.objects.all()
+    self.assertIsNotNone(ArtistsListSerializer.compiled_to_dict)
+    self.assertEqual(
+      ArtistsListSerializer(queryset, many=True).data,
+      plain_serializer(ArtistsListSerializer)(queryset, many=True).data,
+    )
+
+
+class UniqueConstraintMigrationTest(TransactionTestCase):
+  before = [('artists', '0002_artists_search_indexes')]
+  after = [('artists', '0003_artists_bounded_fields_and_indexes')]
+
+  def migrate(self, targets):
+    executor = MigrationExecutor(connection)
+    executor.loader.build_graph()
+    executor.migrate(targets)
+    return executor.loader.project_state(targets).apps
+
+  def tearDown(self):
+    # 다른 테스트를 위해 최신 상태로 되돌림 (남은 중복이 있으면 0003 이 멈추므로 데이터는 먼저 지움)
+    Artists.objects.all().delete()
+    self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes('artists'))
+
+  def create_conflicts(self, Artists):
+    self.first = Artists.objects.create(name='bts', agency='big hit', debut_data='2013-06-13', is_group=True)
+    self.duplicate = Artists.objects.create(name='bts', agency='hybe', debut_data='2013-06-13', is_group=True)
+    self.other_debut = Artists.objects.create(name='bts', agency='hybe', debut_data='2014-01-01', is_group=True)
+    # 100자로 자른 뒤에 같아지는 이름도 중복
+    self.long_name = Artists.objects.create(name='a' * 100, agency='agency', debut_data='2020-01-01', is_group=False)
+    self.truncated = Artists.objects.create(name='a' * 120, agency='agency', debut_data='2020-01-01', is_group=False)
+
+  def test_conflicts_abort_the_migration(self):
+    Artists = self.migrate(self.before).get_model('artists', 'Artists')
+    self.create_conflicts(Artists)
+
+    with self.assertRaises(CommandError) as raised:
+      self.migrate(self.after)
+    message = str(raised.exception)
+    self.assertIn(f'ids [{self.truncated.pk}]', message)
+    self.assertIn(f'ids [{self.first.pk}, {self.duplicate.pk}]', message)
+    self.assertIn(f'ids [{self.long_name.pk}, {self.truncated.pk}]', message)
+    self.assertIn('clean_artists --apply', message)
+    # 아무것도 지우거나 바꾸지 않음
+    self.assertEqual(Artists.objects.count(), 5)
+    self.assertEqual(Artists.objects.get(pk=self.truncated.pk).name, 'a' * 120)
+
+  def test_clean_command_then_migrate(self):
+    Artists = self.migrate(self.before).get_model('artists', 'Artists')
+    self.create_conflicts(Artists)
+
+    output = io.StringIO()
+    call_command('clean_artists', stdout=output)
+    self.assertIn('--apply', output.getvalue())
+    self.assertEqual(Artists.objects.count(), 5)
+
+    output = io.StringIO()
+    call_command('clean_artists', '--apply', stdout=output)
+    self.assertIn(f"kept id={self.first.pk}): {{'id': {self.duplicate.pk},", output.getvalue())
+    self.assertIn(f"kept id={self.long_name.pk}): {{'id': {self.truncated.pk},", output.getvalue())
+
+    Artists = self.migrate(self.after).get_model('artists', 'Artists')
+    self.assertEqual(
+      sorted(Artists.objects.values_list('pk', flat=True)),
+      sorted([self.first.pk, self.other_debut.pk, self.long_name.pk]),
+    )
+
+
+class ArtistsSearchTest(TestCase):
+  url = '/api/v1/artists/search'
+
+  def setUp(self):
+    self.blackpink = Artists.objects.create(name='BLACKPINK', agency='YG Entertainment', debut_data='2016-08-08', is_group=True)
+    self.bts = Artists.objects.create(name='BTS', agency='Big Hit Music', debut_data='2013-06-13', is_group=True)
+    self.iu = Artists.objects.create(name='아이유', agency='EDAM Entertainment', debut_data='2008-09-18', is_group=False)
+
+  def search(self, **params):
+    response = self.client.get(self.url, params)
+    self.assertEqual(response.status_code, 200, response.content)
+    return [item['id'] for item in response.json()]
+
+  def test_uses_fts_index(self):
+    self.assertTrue(fts_available(connection))
+    self.assertEqual(self.search(q='black'), [self.blackpink.pk])
+    self.assertEqual(self.search(q='entertain'), [self.blackpink.pk, self.iu.pk])
+    self.assertEqual(self.search(q='아이'), [self.iu.pk])
+
+  def test_blank_q_returns_everything(self):
+    everything = [self.blackpink.pk, self.bts.pk, self.iu.pk]
+    self.assertEqual(self.search(q=''), everything)
+    self.assertEqual(self.search(q='   '), everything)
+    self.assertEqual(self.search(), everything)
+    self.assertEqual(list(search_artists(q='   ').values_list('pk', flat=True)), everything)
+
+  def test_fts_operators_are_searched_as_text(self):
+    Artists.objects.create(name='AND OR NOT', agency='NEAR', debut_data='2020-01-01', is_group=True)
+    for q in ['AND', 'OR', 'NOT', 'NEAR(bts', '*', '-bts', '"', '""', "'", '(', ')', 'name:bts', '^bts', 'bts*', '+', '{', 'a"b']:
+      with self.subTest(q=q):
+        self.search(q=q)
+    self.assertEqual(self.search(q='OR'), [Artists.objects.get(agency='NEAR').pk])
+    self.assertEqual(self.search(q='bts OR'), [])
+
+  def test_filters_and_invalid_dates(self):
+    self.assertEqual(self.search(is_group='false'), [self.iu.pk])
+    self.assertEqual(self.search(debut_from='2010-01-01', debut_to='2014-01-01'), [self.bts.pk])
+    for params in ({'debut_from': '2020-13-01'}, {'debut_to': 'yesterday'}, {'debut_from': '2020-01-02', 'debut_to': '2020-01-01'}):
+      with self.subTest(params=params):
+        self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+  def test_triggers_keep_index_in_sync(self):
+    self.bts.name = 'Bangtan'
+    self.bts.save()
+    self.assertEqual(self.search(q='bts'), [])
+    self.assertEqual(self.search(q='bangtan'), [self.bts.pk])
+    # save() 를 거치지 않는 update 도 트리거로 반영
+    Artists.objects.filter(pk=self.bts.pk).update(agency='HYBE')
+    self.assertEqual(self.search(q='hybe'), [self.bts.pk])
+    self.assertEqual(self.search(q='big'), [])
+    self.bts.delete()
+    self.assertEqual(self.search(q='bangtan'), [])
+    self.assertEqual(self.search(q='hybe'), [])
+
+
+class ArtistsUpdateTest(TestCase):
+  def setUp(self):
+    self.artist = Artists.objects.create(name='IU', agency='EDAM', debut_data='2008-09-18', is_group=False)
+    self.url = f'/api/v1/detail/{self.artist.pk}/'
+
+  def test_unknown_artist_returns_404(self):
+    self.assertEqual(self.client.get('/api/v1/detail/999/').status_code, 404)
+    self.assertEqual(self.client.patch('/api/v1/detail/999/', {'agency': 'x'}, content_type='application/json').status_code, 404)
+    self.assertEqual(
+      self.client.patch('/api/v1/detail/999/', {'agency': 'x', 'version': 1}, content_type='application/json').status_code, 404,
+    )
+
+  def test_patch_writes_only_changed_fields(self):
+    with CaptureQueriesContext(connection) as queries:
+      response = self.client.patch(self.url, {'agency': 'EDAM', 'is_group': True}, content_type='application/json')
+    self.assertEqual(response.status_code, 202)
+    self.assertEqual(response.json(), {'agency': 'EDAM', 'is_group': True, 'version': 2})
+    update = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+    self.assertEqual(len(update), 1)
+    self.assertIn('"is_group"', update[0])
+    self.assertNotIn('"agency"', update[0])
+
+    # 바뀐 값이 없으면 UPDATE 하지 않음
+    with CaptureQueriesContext(connection) as queries:
+      self.client.patch(self.url, {'is_group': True}, content_type='application/json')
+    self.assertFalse([query for query in queries if query['sql'].startswith('UPDATE')])
+
+  def test_version_check_is_a_single_update(self):
+    etag = self.client.get(self.url)['ETag']
+    self.assertEqual(etag, '"1"')
+    with self.assertNumQueries(1):
+      response = self.client.patch(self.url, {'agency': 'EDAM Entertainment'}, content_type='application/json', HTTP_IF_MATCH=etag)
+    self.assertEqual(response.status_code, 202)
+    self.assertEqual(response['ETag'], '"2"')
+
+    # 이미 지난 버전으로 수정하면 덮어쓰지 않음
+    response = self.client.patch(self.url, {'agency': 'lost'}, content_type='application/json', HTTP_IF_MATCH=etag)
+    self.assertEqual(response.status_code, 412)
+    response = self.client.put(self.url, {'agency': 'lost', 'is_group': False, 'version': 1}, content_type='application/json')
+    self.assertEqual(response.status_code, 409)
+    self.assertEqual(response.json()['version'], 2)
+    self.artist.refresh_from_db()
+    self.assertEqual((self.artist.agency, self.artist.version), ('EDAM Entertainment', 2))
+
+
+class InstrumentationTest(TestCase):
+  def test_server_timing_header(self):
+    Artists.objects.create(name='IU', agency='EDAM', debut_data='2008-09-18', is_group=False)
+    timing = self.client.get('/api/v1/total_list/')['Server-Timing']
+    for metric in ('db;dur=', 'serialize;dur=', 'render;dur=', 'total;dur='):
+      self.assertIn(metric, timing)
+    self.assertIn('desc="1 queries"', timing)
+
+  @override_settings(ROOT_URLCONF=AsyncURLConf)
+  async def test_async_views_are_measured(self):
+    timing = (await self.async_client.get('/api/v1/total_list/'))['Server-Timing']
+    # async 뷰의 ORM 호출도 같은 요청의 DB 연결에서 실행되므로 쿼리 수가 기록됨
+    self.assertIn('desc="1 queries"', timing)
+    self.assertIn('serialize;dur=', timing)
+    self.assertIn('render;dur=', timing)
+
+  def test_middleware_keeps_async_chain_async(self):
+    # get_response 가 async 면 미들웨어도 async 로 동작해서 async 뷰가 요청마다 스레드로 바뀌지 않음
+    async def get_response(request):
+      return HttpResponse()
+    self.assertTrue(iscoroutinefunction(InstrumentationMiddleware(get_response)))
+    self.assertFalse(iscoroutinefunction(InstrumentationMiddleware(lambda request: HttpResponse())))
+
+
+# DB에 연결하지 않고 router 가 고르는 DB 별칭만 확인 (TestCase 는 테스트 전체가 트랜잭션 안이라서 읽기가 항상 primary)
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'], DATABASE_ROUTING={'STICKY_SECONDS': 5, 'COOKIE_NAME': 'db_primary_until'})
+class ReplicaRouterTest(SimpleTestCase):
+  def read_write_read(self):
+    # 읽기 -> 쓰기 -> 읽기 에 쓰인 DB
+    used = [router.db_for_read(Artists)]
+    used.append(router.db_for_write(Artists))
+    used.append(router.db_for_read(Artists))
+    return used
+
+  def test_read_your_writes(self):
+    used = []
+
+    def view(request):
+      used.extend(self.read_write_read())
+      return HttpResponse()
+
+    response = PrimaryStickinessMiddleware(view)(RequestFactory().get('/api/v1/total_list/'))
+    self.assertIn(used[0], ['replica1', 'replica2'])
+    self.assertEqual(used[1:], ['default', 'default'])
+    cookie = response.cookies['db_primary_until']
+
+    # 쿠키의 시간이 지나기 전에는 다음 요청의 읽기도 primary
+    request = RequestFactory().get('/api/v1/total_list/')
+    request.COOKIES['db_primary_until'] = cookie.value
+    used.clear()
+    PrimaryStickinessMiddleware(view)(request)
+    self.assertEqual(used, ['default', 'default', 'default'])
+
+    request.COOKIES['db_primary_until'] = str(time.time() - 1)
+    used.clear()
+    PrimaryStickinessMiddleware(view)(request)
+    self.assertIn(used[0], ['replica1', 'replica2'])
+
+  def test_replica_is_pinned_per_request(self):
+    used = []
+
+    def view(request):
+      used.append({router.db_for_read(Artists) for _ in range(5)})
+      return HttpResponse()
+
+    with mock.patch('singer_api_service.routers.random.choice', side_effect=['replica1', 'replica2']):
+      PrimaryStickinessMiddleware(view)(RequestFactory().get('/api/v1/total_list/'))
+      PrimaryStickinessMiddleware(view)(RequestFactory().get('/api/v1/total_list/'))
+    self.assertEqual(used, [{'replica1'}, {'replica2'}])
+
+  def test_search_checks_fts_on_the_replica(self):
+    checked = []
+
+    def view(request):
+      checked.append(search_artists(q='iu').db)
+      return HttpResponse()
+
+    # replica 테스트 DB는 따로 만들지 않으므로 연결은 별칭만 있는 가짜 객체
+    fake_connections = {alias: mock.Mock(alias=alias) for alias in ('default', 'replica1', 'replica2')}
+    with mock.patch('artists.search.connections', fake_connections), \
+        mock.patch('artists.search.fts_available', return_value=False) as available:
+      PrimaryStickinessMiddleware(view)(RequestFactory().get('/api/v1/artists/search'))
+    self.assertIn(checked[0], ['replica1', 'replica2'])
+    self.assertEqual(available.call_args.args[0].alias, checked[0])
+
+  async def test_async_views(self):
+    used = []
+
+    # async 뷰의 ORM 호출처럼 sync_to_async 스레드에서 router 를 사용
+    async def view(request):
+      used.extend(await sync_to_async(self.read_write_read)())
+      return HttpResponse()
+
+    middleware = PrimaryStickinessMiddleware(view)
+    self.assertTrue(iscoroutinefunction(middleware))
+    response = await middleware(RequestFactory().get('/api/v1/total_list/'))
+    self.assertIn(used[0], ['replica1', 'replica2'])
+    self.assertEqual(used[1:], ['default', 'default'])
+    self.assertIn('db_primary_until', response.cookies)
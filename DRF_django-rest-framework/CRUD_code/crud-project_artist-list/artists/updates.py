@@ -0,0 +1,106 @@
+from django.db.models import F
+
+from .models import Artists
+
+
+# artists_detail 의 PUT / PATCH 처리
+#   - 버전 확인 모드 : If-Match: "<version>" 헤더나 본문의 version 을 보내면
+#       UPDATE ... SET <보낸 필드>, version = version + 1 WHERE id = <pk> AND version = <version>
+#     쿼리 한번으로 확인과 수정을 같이 처리함 (먼저 조회하지 않으므로 동시에 수정해도 나중 요청이 덮어쓰지 못함)
+#     수정된 행이 없을 때만 한번 더 조회해서 404(없는 아티스트)인지 버전 충돌인지 구분
+#       If-Match 가 맞지 않으면 412, 본문의 version 이 맞지 않으면 409 + 현재 버전
+#   - 버전 없이 보내면 현재 행을 읽어서 실제로 바뀐 필드만 save(update_fields=...) 로 저장
+#     (바뀐 값이 없으면 UPDATE 자체를 하지 않음)
+
+
+class VersionConflict(Exception):
+  def __init__(self, current_version, precondition):
+    super().__init__(current_version)
+    self.current_version = current_version
+    # If-Match 헤더로 보낸 경우 True (412), 본문의 version 인 경우 False (409)
+    self.precondition = precondition
+
+
+def parse_if_match(header):
+  # 'If-Match: "3"' / 'W/"3"' -> 3, 없거나 '*' 면 None
+  # 버전 숫자가 아니면 어떤 행과도 맞지 않으므로 0 (버전은 1부터 시작)
+  if not header or header.strip() == '*':
+    return None
+  value = header.split(',')[0].strip()
+  if value.startswith('W/'):
+    value = value[2:]
+  try:
+    return int(value.strip('"'))
+  except ValueError:
+    return 0
+
+
+def etag(version):
+  return f'"{version}"'
+
+
+def expected_version(request, changes):
+  # (확인할 버전, If-Match 헤더로 보냈는지 여부)
+  body_version = changes.pop('version', None)
+  if_match = parse_if_match(request.headers.get('If-Match'))
+  if if_match is not None:
+    return if_match, True
+  return body_version, False
+
+
+def changed_fields(artist, changes):
+  return [field for field, value in changes.items() if getattr(artist, field) != value]
+
+
+def update_with_version(page_pk, changes, expected, precondition):
+  updated = Artists.objects.filter(pk=page_pk, version=expected).update(**changes, version=F('version') + 1)
+  if updated:
+    return expected + 1
+  current = Artists.objects.filter(pk=page_pk).values_list('version', flat=True).first()
+  if current is None:
+    raise Artists.DoesNotExist
+  raise VersionConflict(current, precondition)
+
+
+async def aupdate_with_version(page_pk, changes, expected, precondition):
+  updated = await Artists.objects.filter(pk=page_pk, version=expected).aupdate(**changes, version=F('version') + 1)
+  if updated:
+    return expected + 1
+  current = await Artists.objects.filter(pk=page_pk).values_list('version', flat=True).afirst()
+  if current is None:
+    raise Artists.DoesNotExist
+  raise VersionConflict(current, precondition)
+
+
+def apply_changes(artist, changes):
+  # 바뀐 필드만 저장할 목록을 돌려줌 (버전은 DB에서 1 증가시키고 저장 후 다시 읽음)
+  fields = changed_fields(artist, changes)
+  for field in fields:
+    setattr(artist, field, changes[field])
+  if fields:
+    artist.version = F('version') + 1
+    fields.append('version')
+  return fields
+
+
+def update_changed_fields(artist, changes):
+  fields = apply_changes(artist, changes)
+  if fields:
+    artist.save(update_fields=fields)
+    artist.refresh_from_db(fields=['version'])
+  return artist
+
+
+async def aupdate_changed_fields(artist, changes):
+  fields = apply_changes(artist, changes)
+  if fields:
+    await artist.asave(update_fields=fields)
+    await artist.arefresh_from_db(fields=['version'])
+  return artist
+
+
+def conflict_data(conflict):
+  return {
+    'detail': '다른 요청이 먼저 수정했습니다. 최신 정보를 다시 조회한 뒤 수정해주세요.',
+    'version': conflict.current_version,
+  }
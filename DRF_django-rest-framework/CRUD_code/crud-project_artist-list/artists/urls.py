@@ -1,10 +1,21 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, async_views
+
+sync_urlpatterns = [
 
-urlpatterns = [
-    
     path('artists_create/', views.artists_create),
     path('total_list/', views.artists_list),
     path('detail/<int:page_pk>/', views.artists_detail),
     path('artists/search', views.artists_search),
 ]
+
+# 같은 주소를 async 뷰로 처리 (검색은 동기 뷰 그대로 사용)
+async_urlpatterns = [
+    path('artists_create/', async_views.artists_create),
+    path('total_list/', async_views.artists_list),
+    path('detail/<int:page_pk>/', async_views.artists_detail),
+    path('artists/search', views.artists_search),
+]
+
+urlpatterns = async_urlpatterns if getattr(settings, 'ARTISTS_ASYNC_VIEWS', False) else sync_urlpatterns
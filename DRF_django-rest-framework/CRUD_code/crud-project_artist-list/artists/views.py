@@ -2,8 +2,17 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from rest_framework import status
 
+from django.conf import settings
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+
+from singer_api_service.instrumentation import timed
+
 from .models import Artists
-from .serializers import ArtistsSerializer,ArtistsListSerializer, ArtistsEditSerializer
+from .serializers import ArtistsSerializer,ArtistsListSerializer, ArtistsEditSerializer, ArtistsSearchSerializer
+from .search import search_artists
+from .projection import serialize_values
+from .updates import VersionConflict, conflict_data, etag, expected_version, update_changed_fields, update_with_version
 
 # Create your views here.
 @api_view(['POST'])
@@ -36,28 +45,51 @@ def artists_list(request):
       # Artists라는 querySet의 데이터를 다 받아와와
       artist = Artists.objects.all()
       # 그 다 받아온 정보는 이제 JSON으로 변환하는 거지
-      # many라는 옵션으로 여러개의 데이터를변환할수 있도록 한거지지
-      all_info = ArtistsListSerializer(artist, many=True)
+      # ArtistsListSerializer가 출력하는 컬럼(name, debut_data)만 values_list로 읽어서
+      # 모델 인스턴스를 만들지 않고 바로 dict로 변환 (projection.py)
+      # (serializer.data를 거치지 않으므로 직렬화 시간을 직접 기록)
+      with timed('serialize'):
+        all_info = serialize_values(artist, ArtistsListSerializer)
       # 그렇게 변환한 데이터를 응답으로 보내는 거지 
-      return Response(all_info.data)
+      return Response(all_info)
   
 ## 상세 페이지 
-@api_view(['GET','PUT','DELETE'])    
+@api_view(['GET','PUT','PATCH','DELETE'])    
 def artists_detail(request,page_pk):
-  artist = Artists.objects.get(pk=page_pk)
+  # 정보 수정하기, agnecy와 is_group만 수정가능하게 하기 (PATCH는 보낸 필드만)
+  # 버전을 보내면 조회 없이 UPDATE 한번으로 수정 (updates.py)
+  if request.method in ('PUT', 'PATCH'):
+     serializer = ArtistsEditSerializer(data=request.data, partial=request.method == 'PATCH')
+     if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+     changes = dict(serializer.validated_data)
+     expected, precondition = expected_version(request, changes)
+     if expected is not None:
+        try:
+           version = update_with_version(page_pk, changes, expected, precondition)
+        except Artists.DoesNotExist:
+           raise Http404
+        except VersionConflict as conflict:
+           return Response(
+              conflict_data(conflict),
+              status=status.HTTP_412_PRECONDITION_FAILED if conflict.precondition else status.HTTP_409_CONFLICT,
+              headers={'ETag': etag(conflict.current_version)},
+           )
+        return Response({**changes, 'version': version}, status=status.HTTP_202_ACCEPTED, headers={'ETag': etag(version)})
+
+     artist = update_changed_fields(get_object_or_404(Artists, pk=page_pk), changes)
+     return Response(
+        ArtistsEditSerializer(artist).data, status=status.HTTP_202_ACCEPTED, headers={'ETag': etag(artist.version)},
+     )
+
+  # 없는 번호면 404
+  artist = get_object_or_404(Artists, pk=page_pk)
 
   # 디테일 페이지 보기
   if request.method == 'GET':
       serializer = ArtistsSerializer(artist)
-      return Response(serializer.data)
-  
-  # 정보 수정하기, agnecy와 debut_data만 수정가능하게 하기 
-  elif request.method == 'PUT':
-     serializer = ArtistsEditSerializer(artist, request.data)
-     if serializer.is_valid():
-        serializer.save()
-        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
-     return Response(status=status.HTTP_400_BAD_REQUEST)
+      # 수정할 때 If-Match 헤더로 보낼 수 있도록 현재 버전을 ETag로 알려줌
+      return Response(serializer.data, headers={'ETag': etag(artist.version)})
   
   # 삭제 하기 
   elif request.method == 'DELETE':
@@ -70,4 +102,18 @@ def artists_detail(request,page_pk):
      return Response(
         {'delete' : f"'{pk}'번의 '{name}'을 삭제하였습니다."},
         status=status.HTTP_204_NO_CONTENT
-     )
\ No newline at end of file
+     )
+
+
+## 검색 
+@api_view(['GET'])
+def artists_search(request):
+  # 쿼리스트링 검사 (잘못된 날짜 등은 400)
+  params = ArtistsSearchSerializer(data=request.query_params)
+  params.is_valid(raise_exception=True)
+  options = getattr(settings, 'ARTISTS_SEARCH', {})
+  # 한번에 너무 많은 결과를 돌려주지 않도록 MAX_LIMIT 으로 제한
+  limit = min(params.validated_data.pop('limit', None) or options.get('LIMIT', 20), options.get('MAX_LIMIT', 100))
+  artists = search_artists(limit=limit, **params.validated_data)
+  serializer = ArtistsSerializer(artists, many=True)
+  return Response(serializer.data)
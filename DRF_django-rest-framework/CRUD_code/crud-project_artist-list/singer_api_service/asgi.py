@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'singer_api_service.settings')
+# settings 의 CONN_MAX_AGE 를 ASGI 에 맞게 정함 (settings.SERVER_MODE 참고)
+os.environ.setdefault('DJANGO_SERVER_MODE', 'asgi')
 
 application = get_asgi_application()
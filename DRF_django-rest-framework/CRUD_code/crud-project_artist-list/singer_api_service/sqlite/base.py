@@ -0,0 +1,39 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+
+# settings.DATABASES 의 ENGINE 으로 사용하는 SQLite backend ('singer_api_service.sqlite')
+# 장고의 sqlite3 backend 와 같고, 연결을 새로 만들 때 OPTIONS['pragmas'] 의 PRAGMA 를 실행
+#   - journal_mode=WAL : 쓰는 중에도 다른 연결이 읽을 수 있음 (읽기와 쓰기가 서로 기다리지 않음, 쓰기는 여전히 한번에 하나)
+#   - synchronous=NORMAL : WAL 에서는 커밋마다 fsync 하지 않아도 DB 파일이 깨지지 않음 (전원이 꺼지면 마지막 커밋 몇 개는 사라질 수 있음)
+#   - mmap_size / cache_size : 읽기를 메모리 맵과 연결별 페이지 캐시로 처리
+#   - 잠겨 있을 때 기다리는 시간(busy timeout)은 OPTIONS['timeout'](초), sqlite3.connect 에 그대로 넘어감
+# OPTIONS['transaction_mode'] 가 있으면 transaction.atomic 을 BEGIN <transaction_mode> 로 시작
+#   기본(DEFERRED) 트랜잭션은 읽다가 쓰기를 시작할 때 다른 연결이 쓰는 중이면 busy timeout 을 기다리지 않고 바로 "database is locked" 로 실패하므로
+#   IMMEDIATE 로 시작해서 트랜잭션을 시작할 때 쓰기 잠금을 기다리게 함
+# (장고 5.1 부터는 기본 backend 의 OPTIONS 에 init_command / transaction_mode 가 있지만 4.2 에는 없어서 backend 를 따로 둠)
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        # sqlite3.connect 가 모르는 옵션은 빼고 넘김
+        kwargs.pop('pragmas', None)
+        mode = kwargs.pop('transaction_mode', None)
+        if mode is not None and mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"settings.DATABASES['{self.alias}']['OPTIONS']['transaction_mode'] must be one of {', '.join(TRANSACTION_MODES)}."
+            )
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict['OPTIONS'].get('pragmas', {}).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        self.cursor().execute(f'BEGIN {mode.upper()}' if mode else 'BEGIN')
@@ -0,0 +1,97 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from drf.routers import read_from_primary
+
+
+# article_detail GET 응답(ArticleSerializer 결과)을 게시글 pk 단위로 저장해두는 read-through 캐시
+# 캐시 키에 버전 번호를 넣어두고, 게시글이나 그 게시글의 댓글이 바뀌면 버전만 올려서 이전 응답을 무효화함
+#   articles:detail:<pk>:version  -> 현재 버전
+#   articles:detail:<pk>:<버전>    -> 직렬화된 응답 데이터
+# 어떤 캐시 백엔드를 쓸지는 settings.ARTICLES_DETAIL_CACHE['ALIAS'] (CACHES의 별칭)로 정함
+
+HITS_KEY = 'articles:detail:hits'
+MISSES_KEY = 'articles:detail:misses'
+
+
+def get_options():
+    return getattr(settings, 'ARTICLES_DETAIL_CACHE', {})
+
+
+def get_cache():
+    return caches[get_options().get('ALIAS', 'default')]
+
+
+def version_key(article_pk):
+    return f'articles:detail:{article_pk}:version'
+
+
+def payload_key(article_pk, version):
+    return f'articles:detail:{article_pk}:{version}'
+
+
+def get_version(cache, article_pk):
+    version = cache.get(version_key(article_pk))
+    if version is None:
+        # 버전 키가 없거나 캐시에서 밀려난 경우 1부터 다시 시작하면 예전 응답을 다시 읽을 수 있으므로
+        # 현재 시간(ms)을 시작 버전으로 사용
+        cache.add(version_key(article_pk), int(time.time() * 1000), timeout=None)
+        version = cache.get(version_key(article_pk))
+    return version
+
+
+def get_article_detail(article_pk, build):
+    # 캐시에 있으면 그대로 돌려주고, 없으면 build()로 직렬화한 뒤 저장
+    # (data, 캐시 적중 여부)를 돌려줌
+    cache = get_cache()
+    key = payload_key(article_pk, get_version(cache, article_pk))
+    data = cache.get(key)
+    if data is not None:
+        count(cache, HITS_KEY)
+        return data, True
+
+    count(cache, MISSES_KEY)
+    # 캐시에 넣을 데이터는 primary 에서 읽음 (replica 가 아직 따라오지 않은 예전 데이터를 새 버전 키로 저장하면
+    # 다음 수정 때까지 예전 응답이 나가므로)
+    with read_from_primary():
+        data = build()
+    cache.set(key, data, timeout=get_options().get('TIMEOUT', 300))
+    return data, False
+
+
+def invalidate_article(article_pk):
+    # 트랜잭션이 롤백되면 무효화할 필요가 없고, 커밋 전에 무효화하면 다른 요청이 예전 데이터를 다시 캐시할 수 있으므로
+    # 커밋된 뒤에 버전을 올림
+    transaction.on_commit(lambda: bump_version(article_pk))
+
+
+def bump_version(article_pk):
+    cache = get_cache()
+    try:
+        cache.incr(version_key(article_pk))
+    except ValueError:
+        # 버전 키가 없으면 캐시된 응답도 읽힐 일이 없으므로 새 버전만 만들어둠
+        get_version(cache, article_pk)
+
+
+def count(cache, key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def stats():
+    cache = get_cache()
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
@@ -0,0 +1,88 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+
+
+# 읽기 전용의 평평한(flat) ModelSerializer 를 빠르게 직렬화하기 위한 기반 클래스
+# DRF는 객체 하나를 직렬화할 때마다 필드마다 get_attribute -> to_representation 을 호출하고
+# OrderedDict 를 만들기 때문에 행이 많은 목록에서는 이 오버헤드가 대부분을 차지함
+# CompiledModelSerializer 를 상속하면 클래스를 만들 때 Meta.fields 를 보고
+#   def to_dict(obj):
+#       return {'id': obj.id, 'title': obj.title, 'created_at': _repr_2(obj.created_at)}
+# 같은 전용 함수를 한번만 만들어두고, to_representation 과 many=True 목록 직렬화에서 이 함수를 사용함
+# 모든 필드가 모델 컬럼을 그대로 출력하는 경우에만 컴파일하고
+# (중첩 시리얼라이저, SerializerMethodField, source='a.b' 등이 있으면 기존 DRF 방식 그대로 동작)
+# 쓰기(to_internal_value / save)는 DRF 그대로 사용
+
+# DB에서 읽은 값이 이미 DRF 출력과 같은 타입인 필드는 변환 없이 그대로 사용
+IDENTITY_REPRESENTATIONS = {
+    serializers.CharField.to_representation,
+    serializers.IntegerField.to_representation,
+    serializers.BooleanField.to_representation,
+}
+
+
+class CompiledListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        to_dict = getattr(self.child, 'compiled_to_dict', None)
+        if to_dict is None:
+            return super().to_representation(data)
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        return [to_dict(item) for item in iterable]
+
+
+class CompiledModelSerializer(serializers.ModelSerializer):
+    compiled_to_dict = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        meta = getattr(cls, 'Meta', None)
+        if getattr(meta, 'model', None) is None:
+            return
+        cls.compiled_to_dict = staticmethod(compile_to_dict(cls)) if is_compilable(cls) else None
+        if cls.compiled_to_dict is not None and not hasattr(meta, 'list_serializer_class'):
+            meta.list_serializer_class = CompiledListSerializer
+
+    def to_representation(self, instance):
+        if self.compiled_to_dict is not None:
+            return self.compiled_to_dict(instance)
+        return super().to_representation(instance)
+
+
+def readable_fields(serializer_class):
+    return [field for field in serializer_class().fields.values() if not field.write_only]
+
+
+def is_compilable(serializer_class):
+    model = serializer_class.Meta.model
+    for field in readable_fields(serializer_class):
+        if isinstance(field, (serializers.SerializerMethodField, serializers.BaseSerializer, serializers.RelatedField)):
+            return False
+        if len(field.source_attrs) != 1:
+            return False
+        try:
+            model_field = model._meta.get_field(field.source_attrs[0])
+        except FieldDoesNotExist:
+            return False
+        if not model_field.concrete or model_field.is_relation:
+            return False
+    return True
+
+
+def compile_to_dict(serializer_class):
+    # 출력 순서와 이름은 DRF와 같게 (Meta.fields 순서), 값이 None 이면 변환하지 않고 None
+    namespace = {}
+    items = []
+    for i, field in enumerate(readable_fields(serializer_class)):
+        attr = field.source_attrs[0]
+        value = f'obj.{attr}'
+        if type(field).to_representation in IDENTITY_REPRESENTATIONS:
+            items.append(f'{field.field_name!r}: {value}')
+        else:
+            namespace[f'_repr_{i}'] = field.to_representation
+            items.append(f'{field.field_name!r}: None if {value} is None else _repr_{i}({value})')
+    source = 'def to_dict(obj):\n    return {' + ', '.join(items) + '}\n'
+    exec(compile(source, f'<compiled {serializer_class.__name__}>', 'exec'), namespace)
+    to_dict = namespace['to_dict']
+    to_dict.source = source
+    return to_dict
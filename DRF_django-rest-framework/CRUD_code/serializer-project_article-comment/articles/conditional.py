@@ -0,0 +1,90 @@
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.views.decorators.http import condition
+
+from .models import Article, Comment
+
+
+# updated_at(auto_now)을 이용한 조건부 GET (ETag / Last-Modified)
+# 응답 본문을 직렬화하지 않고 집계 쿼리 한번으로 검증값(validator)만 계산해서
+# 클라이언트가 보낸 If-None-Match / If-Modified-Since 와 같으면 본문 없이 304를 응답
+#   - ETag : 행 수까지 포함하기 때문에 삭제도 반영됨 (If-None-Match가 있으면 장고는 이것만 비교)
+#   - Last-Modified : 가장 최근 updated_at (삭제는 시간이 남지 않으므로 ETag보다 느슨한 검증)
+
+
+def conditional_get(validators):
+    # validators(request, *args, **kwargs) -> (etag, last_modified)
+    # GET / HEAD 요청에만 적용하고, 수정/삭제 요청은 그대로 뷰로 전달
+    def decorator(view):
+        def get_validators(request, *args, **kwargs):
+            # etag_func와 last_modified_func가 같은 집계 쿼리를 두번 실행하지 않도록 요청 객체에 저장
+            if not hasattr(request, '_conditional_validators'):
+                request._conditional_validators = validators(request, *args, **kwargs)
+            return request._conditional_validators
+
+        conditional_view = condition(
+            etag_func=lambda request, *args, **kwargs: get_validators(request, *args, **kwargs)[0],
+            last_modified_func=lambda request, *args, **kwargs: get_validators(request, *args, **kwargs)[1],
+        )(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method in ('GET', 'HEAD'):
+                return conditional_view(request, *args, **kwargs)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def make_etag(*parts):
+    return hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def latest(*values):
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def article_detail_validators(request, article_pk):
+    # 상세 응답에는 댓글 목록과 댓글 개수가 포함되므로 댓글의 수정 시간과 개수도 같이 반영
+    stats = Article.objects.filter(pk=article_pk).aggregate(
+        updated_at=Max('updated_at'),
+        comments_updated_at=Max('comments__updated_at'),
+        comments=Count('comments'),
+    )
+    if stats['updated_at'] is None:
+        # 없는 게시글이면 검증하지 않고 뷰에서 404를 응답하도록 넘김
+        return None, None
+    return (
+        make_etag('article', article_pk, stats['updated_at'], stats['comments_updated_at'], stats['comments']),
+        latest(stats['updated_at'], stats['comments_updated_at']),
+    )
+
+
+def comment_detail_validators(request, comment_pk):
+    # 댓글 응답에는 게시글 제목이 포함되므로 게시글의 수정 시간도 같이 반영
+    row = Comment.objects.filter(pk=comment_pk).values_list('updated_at', 'article__updated_at').first()
+    if row is None:
+        return None, None
+    return make_etag('comment', comment_pk, *row), latest(*row)
+
+
+def article_list_validators(request):
+    stats = Article.objects.aggregate(updated_at=Max('updated_at'), count=Count('pk'))
+    # 같은 데이터라도 cursor, page_size 에 따라 응답이 다르므로 쿼리스트링도 ETag에 포함
+    return (
+        make_etag('articles', request.get_full_path(), stats['updated_at'], stats['count']),
+        stats['updated_at'],
+    )
+
+
+def comment_list_validators(request):
+    stats = Comment.objects.aggregate(updated_at=Max('updated_at'), count=Count('pk'))
+    # 댓글 목록에도 게시글 제목이 포함되므로 게시글 쪽 최근 수정 시간도 반영
+    articles_updated_at = Article.objects.aggregate(updated_at=Max('updated_at'))['updated_at']
+    return (
+        make_etag('comments', request.get_full_path(), stats['updated_at'], stats['count'], articles_updated_at),
+        latest(stats['updated_at'], articles_updated_at),
+    )
@@ -0,0 +1,102 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+
+# 시리얼라이저의 필드 구성을 보고 select_related / prefetch_related 할 관계를 계산하는 함수
+# 예) CommentSerilizer는 article 필드를 중첩 시리얼라이저로 쓰기 때문에 select_related('article')
+#     ArticleSerializer는 comments 필드를 many=True로 쓰기 때문에 prefetch_related('comments')
+def plan_related(serializer, model, prefix='', in_prefetch=False):
+    select_related = []
+    prefetch_related = []
+
+    for field in serializer.fields.values():
+        if field.source == '*':
+            continue
+
+        if isinstance(field, serializers.ListSerializer):
+            child, many = field.child, True
+        elif isinstance(field, serializers.ManyRelatedField):
+            child, many = field.child_relation, True
+        else:
+            child, many = field, False
+
+        # 중첩 시리얼라이저이거나 pk가 아닌 값을 보여주는 관계 필드만 추가 쿼리가 생김
+        is_nested = isinstance(child, serializers.BaseSerializer)
+        is_related = isinstance(child, serializers.RelatedField) and not (
+            isinstance(child, serializers.PrimaryKeyRelatedField) and not many
+        )
+        if not (is_nested or is_related):
+            continue
+
+        # source='article.title' 같은 점 표기법은 ORM의 article__title 표기법으로 변환
+        path = field.source.split('.')
+        model_field = _resolve_relation(model, path)
+        if model_field is None:
+            continue
+
+        lookup = prefix + '__'.join(path)
+        # 역참조(1:N)와 M:N은 prefetch, 정참조(N:1, 1:1)는 join으로 한번에 가져오는 select_related
+        # prefetch 아래에 달린 관계는 select_related로 이어붙일 수 없으므로 prefetch로 처리
+        if many or model_field.one_to_many or model_field.many_to_many or in_prefetch:
+            prefetch_related.append(lookup)
+            nested_in_prefetch = True
+        else:
+            select_related.append(lookup)
+            nested_in_prefetch = False
+
+        if is_nested:
+            nested_select, nested_prefetch = plan_related(
+                child, model_field.related_model, lookup + '__', nested_in_prefetch,
+            )
+            select_related.extend(nested_select)
+            prefetch_related.extend(nested_prefetch)
+
+    return select_related, prefetch_related
+
+
+def _resolve_relation(model, path):
+    model_field = None
+    for name in path:
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # 모델 필드가 아니라 property나 메서드를 source로 쓰는 경우는 계획할 수 없음
+            return None
+        if not model_field.is_relation:
+            return None
+        model = model_field.related_model
+    return model_field
+
+
+class EagerLoadingMixin:
+    # 시리얼라이저 클래스마다 한번만 계산해두고 재사용
+    _eager_loading_plan = None
+
+    @classmethod
+    def get_eager_loading_plan(cls):
+        if cls.__dict__.get('_eager_loading_plan') is None:
+            cls._eager_loading_plan = plan_related(cls(), cls.Meta.model)
+        return cls._eager_loading_plan
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        select_related, prefetch_related = cls.get_eager_loading_plan()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        # many=True로 아직 평가되지 않은 queryset을 넘기면 알아서 관계를 미리 불러오도록 처리
+        if args and _is_lazy_queryset(args[0]):
+            args = (cls.setup_eager_loading(args[0]),) + args[1:]
+        elif _is_lazy_queryset(kwargs.get('instance')):
+            kwargs['instance'] = cls.setup_eager_loading(kwargs['instance'])
+        return super().many_init(*args, **kwargs)
+
+
+def _is_lazy_queryset(value):
+    return isinstance(value, QuerySet) and value._result_cache is None
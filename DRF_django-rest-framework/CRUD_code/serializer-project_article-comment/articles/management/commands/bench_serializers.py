@@ -0,0 +1,62 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework import serializers
+
+from articles.models import Article, Comment
+from articles.serializers import ArticleListSerializer, ArticleSerializer
+
+
+# CompiledModelSerializer(컴파일된 직렬화) 와 일반 DRF ModelSerializer 의 목록 직렬화 속도 비교
+#   python manage.py bench_serializers --objects 100000
+# DB 없이 메모리에 만든 객체 목록을 many=True 로 직렬화하고, 두 결과가 같은지도 확인
+class Command(BaseCommand):
+    help = 'Benchmark compiled serializers against plain DRF ModelSerializers on large in-memory lists.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--objects', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, **options):
+        count = options['objects']
+        now = timezone.now()
+        articles = [
+            Article(id=i, title=f'title {i}', content=f'content {i}', created_at=now, updated_at=now)
+            for i in range(1, count + 1)
+        ]
+        comments = [
+            Comment(id=i, article_id=i, content=f'comment {i}', created_at=now, updated_at=now)
+            for i in range(1, count + 1)
+        ]
+        cases = [
+            ('ArticleListSerializer', ArticleListSerializer, articles),
+            ('CommentDetialSerializer', ArticleSerializer.CommentDetialSerializer, comments),
+        ]
+
+        self.stdout.write(f'{"serializer":<26}{"plain obj/s":>14}{"compiled obj/s":>16}{"speedup":>10}')
+        for label, compiled_class, objects in cases:
+            plain_class = plain_serializer(compiled_class)
+            if plain_class(objects[:100], many=True).data != compiled_class(objects[:100], many=True).data:
+                raise CommandError(f'{label}: compiled output differs from DRF output.')
+            plain = self.measure(plain_class, objects, options['repeat'])
+            compiled = self.measure(compiled_class, objects, options['repeat'])
+            self.stdout.write(
+                f'{label:<26}{count / plain:>14,.0f}{count / compiled:>16,.0f}{plain / compiled:>9.1f}x'
+            )
+        self.stdout.write('(median of the repeated runs)')
+
+    def measure(self, serializer_class, objects, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            serializer_class(objects, many=True).data
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
+
+
+def plain_serializer(serializer_class):
+    # 같은 Meta(model, fields)를 가진 일반 DRF ModelSerializer
+    meta = type('Meta', (), {'model': serializer_class.Meta.model, 'fields': serializer_class.Meta.fields})
+    return type(f'Plain{serializer_class.__name__}', (serializers.ModelSerializer,), {'Meta': meta})
@@ -0,0 +1,204 @@
+import gzip
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers.python import Deserializer as PythonDeserializer
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.signals import post_save, pre_save
+
+from articles.models import Article, Comment
+
+
+# loaddata 보다 빠르게 대용량 fixture를 넣는 명령어
+#   python manage.py bulkloaddata articles.json comments.json --batch-size 5000
+# - 파일 전체를 json.load 하지 않고 조금씩 읽으면서 객체 단위로 파싱
+# - 모델별로 모아서 bulk_create (한 행씩 save() 하지 않음)
+# - 외래키가 가리키는 모델(Article)을 참조하는 모델(Comment)보다 항상 먼저 insert
+# - 기본적으로 loaddata의 raw 저장처럼 시그널과 auto_now / auto_now_add 를 건너뜀 (fixture의 시간값 그대로 저장)
+# - loaddata 처럼 이미 있는 pk의 행은 fixture 값으로 덮어씀 (bulk_create(update_conflicts=True), INSERT ... ON CONFLICT DO UPDATE)
+#   ON CONFLICT 를 지원하지 않는 DB면 일반 bulk_create 로 넣기 때문에 이미 있는 pk가 있으면 IntegrityError 로 전체가 롤백됨
+#   (그때는 빈 테이블에 넣거나 loaddata 사용)
+class Command(BaseCommand):
+    help = 'Stream-parse JSON fixtures and insert them with bulk_create.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('args', metavar='fixture', nargs='+', help='Fixture file paths or names inside <app>/fixtures/.')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--read-size', type=int, default=1 << 20, help='Bytes read from the file at a time.')
+        parser.add_argument('--signals', action='store_true', help='Send pre_save/post_save (raw=True) for every row.')
+        parser.add_argument('--auto-now', action='store_true', help='Let auto_now/auto_now_add fields overwrite fixture values.')
+        parser.add_argument('--progress-every', type=int, default=100000, help='Print progress every N rows (0 to disable).')
+
+    def handle(self, *fixtures, **options):
+        self.using = options['database']
+        self.batch_size = options['batch_size']
+        self.send_signals = options['signals']
+        self.keep_auto_now = options['auto_now']
+        self.progress_every = options['progress_every']
+
+        self.buffers = {}
+        self.loaded = {}
+        self.total = 0
+        self.started = time.perf_counter()
+        self.last_progress = 0
+
+        paths = [self.find_fixture(name) for name in fixtures]
+        connection = connections[self.using]
+
+        with transaction.atomic(using=self.using):
+            for path in paths:
+                for row in iter_fixture_objects(path, options['read_size']):
+                    self.add_row(row)
+            for model in self.dependency_order(self.buffers):
+                self.flush(model)
+
+            models = list(self.loaded)
+            # sqlite / postgres 는 외래키 검사를 트랜잭션 끝까지 미뤄두기 때문에 커밋 전에 한번에 검사
+            connection.check_constraints(table_names=[model._meta.db_table for model in models])
+            # pk를 직접 넣었기 때문에 auto increment 시퀀스를 다시 맞춰줌 (postgres 등)
+            sequence_sql = connection.ops.sequence_reset_sql(no_style(), models)
+            if sequence_sql:
+                with connection.cursor() as cursor:
+                    for sql in sequence_sql:
+                        cursor.execute(sql)
+            # bulk_create는 comment_create 뷰를 거치지 않으므로 게시글의 댓글 개수 컬럼을 다시 계산
+            if Article in self.loaded or Comment in self.loaded:
+                Article.objects.using(self.using).sync_comment_count()
+
+        elapsed = time.perf_counter() - self.started
+        for model, count in self.loaded.items():
+            self.stdout.write(f'{model._meta.label}: {count} rows')
+        self.stdout.write(self.style.SUCCESS(
+            f'Installed {self.total} rows in {elapsed:.2f}s ({self.total / max(elapsed, 1e-9):,.0f} rows/sec)'
+        ))
+
+    def find_fixture(self, name):
+        path = Path(name)
+        if path.is_file():
+            return path
+        for app_config in apps.get_app_configs():
+            candidate = Path(app_config.path) / 'fixtures' / name
+            if candidate.is_file():
+                return candidate
+        raise CommandError(f"No fixture named '{name}' found.")
+
+    def add_row(self, row):
+        try:
+            model = apps.get_model(row['model'])
+        except (KeyError, LookupError) as exc:
+            raise CommandError(f'Invalid fixture row {row!r}: {exc}')
+        buffer = self.buffers.setdefault(model, [])
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            # 이 모델이 참조하는 모델에 쌓인 행이 있으면 그것부터 먼저 insert
+            for dependency in self.dependency_order(self.buffers, model):
+                self.flush(dependency)
+
+    def flush(self, model):
+        rows = self.buffers.get(model)
+        if not rows:
+            return
+        self.buffers[model] = []
+        # fixture의 값(문자열 날짜, 외래키 pk 등)을 모델 필드 타입으로 변환하는 건 장고 deserializer에 맡김
+        objects = [
+            deserialized.object
+            for deserialized in PythonDeserializer(rows, using=self.using, ignorenonexistent=True)
+        ]
+        if self.send_signals:
+            for obj in objects:
+                pre_save.send(sender=model, instance=obj, raw=True, using=self.using, update_fields=None)
+        with self.auto_now_disabled(model):
+            model._base_manager.using(self.using).bulk_create(
+                objects, batch_size=self.batch_size, **self.conflict_options(model),
+            )
+        if self.send_signals:
+            for obj in objects:
+                post_save.send(sender=model, instance=obj, created=True, raw=True, using=self.using, update_fields=None)
+
+        self.loaded[model] = self.loaded.get(model, 0) + len(objects)
+        self.total += len(objects)
+        if self.progress_every and self.total - self.last_progress >= self.progress_every:
+            self.last_progress = self.total
+            elapsed = time.perf_counter() - self.started
+            self.stdout.write(f'  {self.total} rows ({self.total / max(elapsed, 1e-9):,.0f} rows/sec)')
+
+    def conflict_options(self, model):
+        if not connections[self.using].features.supports_update_conflicts_with_target:
+            return {}
+        pk = model._meta.pk
+        fields = [field.name for field in model._meta.concrete_fields if not field.primary_key]
+        if not fields:
+            return {'ignore_conflicts': True}
+        return {'update_conflicts': True, 'unique_fields': [pk.name], 'update_fields': fields}
+
+    @contextmanager
+    def auto_now_disabled(self, model):
+        # bulk_create도 insert 할 때 auto_now 필드를 현재 시간으로 덮어쓰기 때문에 잠시 꺼둠
+        fields = []
+        if not self.keep_auto_now:
+            for field in model._meta.concrete_fields:
+                if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                    fields.append((field, field.auto_now, field.auto_now_add))
+                    field.auto_now = field.auto_now_add = False
+        try:
+            yield
+        finally:
+            for field, auto_now, auto_now_add in fields:
+                field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+    def dependency_order(self, models, target=None):
+        # 외래키로 참조되는 모델이 앞에 오도록 정렬 (Article -> Comment)
+        ordered = []
+
+        def visit(model, seen):
+            if model in ordered or model in seen:
+                return
+            seen.add(model)
+            for field in model._meta.concrete_fields:
+                if not (field.is_relation and (field.many_to_one or field.one_to_one)):
+                    continue
+                related = field.related_model
+                if related is not model and related in models:
+                    visit(related, seen)
+            ordered.append(model)
+
+        for model in ([target] if target is not None else list(models)):
+            visit(model, set())
+        return ordered
+
+
+def iter_fixture_objects(path, read_size):
+    # [ {...}, {...}, ... ] 형태의 fixture를 read_size 만큼씩 읽으면서 객체를 하나씩 돌려줌
+    opener = gzip.open if str(path).endswith('.gz') else open
+    decoder = json.JSONDecoder()
+    with opener(path, 'rt', encoding='utf-8') as stream:
+        buffer = stream.read(read_size).lstrip()
+        if not buffer.startswith('['):
+            raise CommandError(f'{path} is not a JSON array fixture.')
+        pos = 1
+        eof = False
+        while True:
+            # 객체 사이의 공백과 쉼표 건너뛰기
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+            try:
+                obj, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # 객체가 버퍼 끝에서 잘린 경우 다음 조각을 이어 붙여서 다시 시도
+                if eof:
+                    raise CommandError(f'{path} is not valid JSON near offset {pos}.')
+                chunk = stream.read(read_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            yield obj
+            pos = end
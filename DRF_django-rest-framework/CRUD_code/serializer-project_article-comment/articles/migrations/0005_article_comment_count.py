@@ -0,0 +1,35 @@
+# Generated by Django 4.2.20 on 2026-10-18 13:56
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+# 이미 저장된 게시글들의 comment_count를 실제 댓글 수로 채우기
+def fill_comment_count(apps, schema_editor):
+    Article = apps.get_model('articles', 'Article')
+    Comment = apps.get_model('articles', 'Comment')
+    counts = (
+        Comment.objects.filter(article=OuterRef('pk'))
+        .order_by()
+        .values('article')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    Article.objects.update(comment_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0004_article_comment_created_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_comment_count, migrations.RunPython.noop),
+    ]
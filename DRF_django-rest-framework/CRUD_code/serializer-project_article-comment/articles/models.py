@@ -1,4 +1,32 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+
+class ArticleQuerySet(models.QuerySet):
+    # 게시글마다 댓글 개수를 num_of_comments 라는 이름으로 붙여주는 메서드
+    # ARTICLES_DENORMALIZED_COMMENT_COUNT가 True면 JOIN + GROUP BY 없이 comment_count 컬럼을 그대로 사용
+    def with_comment_count(self):
+        if getattr(settings, 'ARTICLES_DENORMALIZED_COMMENT_COUNT', False):
+            return self.annotate(num_of_comments=F('comment_count'))
+        return self.annotate(num_of_comments=Count('comments'))
+
+    # 댓글 생성/삭제 시 comment_count 컬럼을 read 없이 DB에서 바로 더하고 빼기
+    # 컬럼이 실제 댓글 수보다 작게 어긋나 있어도 (bulk 작업 등) 0 아래로 내려가서 PositiveIntegerField 제약에 걸리지 않게 0에서 멈춤
+    def add_comment_count(self, delta):
+        return self.update(comment_count=Greatest(F('comment_count') + delta, 0))
+
+    # comment_count 컬럼을 실제 댓글 수로 다시 맞추기 (bulk 작업 이후 등)
+    def sync_comment_count(self):
+        counts = (
+            Comment.objects.filter(article=OuterRef('pk'))
+            .order_by()
+            .values('article')
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+        return self.update(comment_count=Coalesce(Subquery(counts), 0))
 
 
 # Create your models here.
@@ -7,6 +35,16 @@ class Article(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # 댓글 개수를 미리 저장해두는 컬럼 (comment_create, comment_detail DELETE에서 같이 갱신)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = ArticleQuerySet.as_manager()
+
+    class Meta:
+        # cursor 페이지네이션이 (created_at, id) 순서로 조회하기 때문에 같은 순서의 인덱스를 만들어둠
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='article_created_id_idx'),
+        ]
 
 
 class Comment(models.Model):
@@ -14,3 +52,8 @@ class Comment(models.Model):
     content = models.CharField(max_length=200)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='comment_created_id_idx'),
+        ]
@@ -0,0 +1,123 @@
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# (created_at, id) 기준의 keyset(cursor) 페이지네이션
+# offset 방식은 페이지가 뒤로 갈수록 앞의 행들을 전부 건너뛰어야 해서 느려지지만
+# keyset 방식은 "마지막으로 본 행보다 뒤에 있는 행"만 조건으로 찾기 때문에 몇 번째 페이지든 같은 속도
+class KeysetCursorPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    # 최신 글이 먼저 오도록 정렬, created_at이 같은 행은 id로 순서를 확정
+    # 새 글이 계속 추가되어도 앞쪽에 붙기 때문에 이미 넘긴 페이지의 행이 다시 나오거나 빠지지 않음
+    ordering = ('-created_at', '-id')
+
+    invalid_cursor_message = '잘못된 cursor 값입니다.'
+
+    def __init__(self):
+        options = getattr(settings, 'ARTICLES_PAGINATION', {})
+        self.page_size = options.get('PAGE_SIZE', 20)
+        self.max_page_size = options.get('MAX_PAGE_SIZE', 100)
+
+    def get_page_size(self, request):
+        page_size = request.query_params.get(self.page_size_query_param)
+        if page_size is None:
+            return self.page_size
+        try:
+            page_size = int(page_size)
+        except ValueError:
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        # 클라이언트가 아무리 크게 요청해도 MAX_PAGE_SIZE를 넘지 않게 제한
+        return min(page_size, self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        # PAGE_SIZE를 None으로 두고 page_size 파라미터도 없으면 페이지네이션을 하지 않음
+        if not self.page_size:
+            return None
+
+        self.request = request
+        self.cursor = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(self.get_keyset_filter(self.cursor))
+
+        # 한 개 더 가져와서 다음 페이지가 있는지 확인 (count 쿼리 없이)
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_keyset_filter(self, cursor):
+        created_at, pk = cursor
+        first, second = self.ordering
+        # 내림차순이면 "더 작은 값", 오름차순이면 "더 큰 값"이 다음 페이지
+        first_lookup = 'lt' if first.startswith('-') else 'gt'
+        second_lookup = 'lt' if second.startswith('-') else 'gt'
+        first, second = first.lstrip('-'), second.lstrip('-')
+        return (
+            Q(**{f'{first}__{first_lookup}': created_at})
+            | Q(**{first: created_at, f'{second}__{second_lookup}': pk})
+        )
+
+    def encode_cursor(self, instance):
+        # 클라이언트는 cursor 내용을 알 필요가 없도록 base64로 감싸서 전달
+        payload = json.dumps([instance.created_at.isoformat(), instance.pk])
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            created_at, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_first_link(self):
+        if self.cursor is None:
+            return None
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'first': self.get_first_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'first': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
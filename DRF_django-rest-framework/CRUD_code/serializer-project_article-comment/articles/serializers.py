@@ -1,20 +1,25 @@
+from django.utils import timezone
 from rest_framework import serializers 
+from rest_framework.settings import api_settings
 from .models import Article, Comment
+from .eager_loading import EagerLoadingMixin
+from .compiled import CompiledModelSerializer
+from drf.instrumentation import TimedSerializerMixin
 
 
 # 게시글의 일부 필드를 직렬화 하는 클래스
-class ArticleListSerializer(serializers.ModelSerializer):
+class ArticleListSerializer(TimedSerializerMixin, CompiledModelSerializer):
     class Meta:
         model = Article
         fields = ('id', 'title', 'content',)
 
 
 # 게시글의 전체 필드를 직렬화 하는 클래스
-class ArticleSerializer(serializers.ModelSerializer):
+class ArticleSerializer(TimedSerializerMixin, EagerLoadingMixin, serializers.ModelSerializer):
 
 
     # comment_set에 활용할 댓글 데이터를 가공하는 도구
-    class CommentDetialSerializer(serializers.ModelSerializer):
+    class CommentDetialSerializer(CompiledModelSerializer):
          class Meta:
               model = Comment
               fields = ('id', 'content',)
@@ -27,19 +32,108 @@ class ArticleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Article
-        fields = '__all__'
+        # 댓글 개수는 num_of_comments로 응답하기 때문에 저장용 컬럼은 응답에서 제외
+        exclude = ('comment_count',)
 
     # SerializerMethodField의 값을 채울 함수
     def get_num_of_comments(self,obj):
-         # 뷰에서 annotate 안쓰고 여기서 그냥 바로 계산해서 리턴되게 할 수도 있음
-
          # 여기서 obj는 득정 게시글 인스턴스 (3번 게시글이면 3번객체를 가져오게 하는)
-         # view함수에서 annotate 해서 생긴 새로운 속성 결과를 사용할수 있게 
-         return obj.num_of_comments
+         # view함수에서 Article.objects.with_comment_count()로 annotate 해서 생긴 속성을 우선 사용
+         num_of_comments = getattr(obj, 'num_of_comments', None)
+         if num_of_comments is not None:
+              return num_of_comments
+         # annotate 없이 들어온 경우 (방금 생성한 게시글 등)
+         # prefetch된 댓글이 있으면 추가 쿼리 없이 개수를 세고, 없으면 저장된 컬럼 사용
+         prefetched = getattr(obj, '_prefetched_objects_cache', {})
+         if 'comments' in prefetched:
+              return len(prefetched['comments'])
+         return obj.comment_count
+
+
+# 댓글 여러 개를 한번에 생성/수정하는 리스트 시리얼라이저 (CommentSerilizer(many=True)일 때 사용됨)
+# 한 개씩 save() 하지 않고 bulk_create / bulk_update 로 batch_size 단위로 묶어서 저장
+class CommentBulkListSerializer(serializers.ListSerializer):
+        # JSON 배열만 받음 (폼 데이터는 ListSerializer가 빈 목록으로 바꿔버리므로 여기서 400)
+        def to_internal_value(self, data):
+             if not isinstance(data, list):
+                  message = self.error_messages['not_a_list'].format(input_type=type(data).__name__)
+                  raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]}, code='not_a_list')
+             return super().to_internal_value(data)
+
+        # 수정할 때는 self.instance가 {pk: 댓글} 딕셔너리, 각 항목의 id로 수정 대상 댓글을 찾음
+        def run_child_validation(self, data):
+             if self.instance is None:
+                  return super().run_child_validation(data)
+
+             pk = get_item_pk(data)
+             comment = self.instance.get(pk) if pk is not None else None
+             if comment is None:
+                  raise serializers.ValidationError({'id': ['이 게시글에 해당 id의 댓글이 없습니다.']})
+             self.child.instance = comment
+             self.child.initial_data = data
+             validated = super().run_child_validation(data)
+             validated['id'] = pk
+             return validated
+
+        def validate(self, attrs):
+             if self.instance is not None:
+                  ids = [item['id'] for item in attrs]
+                  if len(ids) != len(set(ids)):
+                       raise serializers.ValidationError('같은 id의 댓글이 중복되어 있습니다.')
+             return attrs
+
+        def create(self, validated_data):
+             comments = [Comment(**attrs) for attrs in validated_data]
+             return Comment.objects.bulk_create(comments, batch_size=self.context.get('batch_size'))
+
+        def update(self, instance, validated_data):
+             comments = []
+             fields = {'updated_at'}
+             # bulk_update는 auto_now를 처리하지 않기 때문에 수정 시간을 직접 넣어줌
+             now = timezone.now()
+             for attrs in validated_data:
+                  comment = instance[attrs.pop('id')]
+                  for field, value in attrs.items():
+                       setattr(comment, field, value)
+                       fields.add(field)
+                  comment.updated_at = now
+                  comments.append(comment)
+             Comment.objects.bulk_update(comments, sorted(fields), batch_size=self.context.get('batch_size'))
+             return comments
+
+
+# 수정할 항목의 id ("3" 같은 문자열도 다른 PK 필드처럼 정수로 바꿈), 올바른 id가 아니면 None
+def get_item_pk(data):
+     if not isinstance(data, dict):
+          return None
+     try:
+          return serializers.IntegerField().run_validation(data.get('id'))
+     except serializers.ValidationError:
+          return None
+
+
+# 댓글 삭제할 id 목록을 검사하는 시리얼라이저 ({"ids": [1, 2, 3]})
+class CommentBulkDeleteSerializer(serializers.Serializer):
+        ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+        def validate_ids(self, ids):
+             existing = set(
+                  self.context['article'].comments.filter(pk__in=ids).values_list('pk', flat=True)
+             )
+             # 어떤 항목이 문제인지 알 수 있도록 항목의 순서(index)별로 에러를 돌려줌
+             errors = {
+                  index: ['이 게시글에 해당 id의 댓글이 없습니다.']
+                  for index, pk in enumerate(ids) if pk not in existing
+             }
+             if errors:
+                  raise serializers.ValidationError(errors)
+             return ids
 
 
 # 댓글 
-class CommentSerilizer(serializers.ModelSerializer):
+# EagerLoadingMixin이 중첩된 ArticleTitleSerializer를 보고 select_related('article')를 자동으로 걸어줌
+# (댓글마다 게시글을 따로 조회하는 N+1 문제 방지)
+class CommentSerilizer(TimedSerializerMixin, EagerLoadingMixin, serializers.ModelSerializer):
         # 외래키  필드 article의 데이터를 재구성하기 위한 도구 
         class ArticleTitleSerializer(serializers.ModelSerializer):
              class Meta:
@@ -52,6 +146,7 @@ class CommentSerilizer(serializers.ModelSerializer):
         class Meta:
             model = Comment
             fields = '__all__'
+            list_serializer_class = CommentBulkListSerializer
             # 외래키를 유효성 검사에서 목록에서 빼야함
             # 그런데 응답 데이터를 포함되어있어햐마
             # 읽기전용 필등로 설정
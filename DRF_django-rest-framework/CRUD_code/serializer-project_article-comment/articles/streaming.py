@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# 대용량 내보내기(export)용 스트리밍 응답
+# serializer(many=True).data 는 전체 dict 리스트와 전체 JSON 문자열을 메모리에 다 만든 뒤에야 응답을 보내지만
+# 여기서는 queryset을 chunk 단위로 읽고, chunk 단위로 직렬화해서 바로바로 흘려보내기 때문에
+# 테이블이 아무리 커도 메모리 사용량은 chunk 하나 크기로 일정함
+
+EXPORT_MODES = ('json', 'ndjson')
+
+
+def get_chunk_size(request):
+    options = getattr(settings, 'ARTICLES_EXPORT', {})
+    default = options.get('CHUNK_SIZE', 2000)
+    max_chunk_size = options.get('MAX_CHUNK_SIZE', 10000)
+    try:
+        chunk_size = int(request.query_params.get('chunk_size', default))
+    except ValueError:
+        chunk_size = default
+    return max(1, min(chunk_size, max_chunk_size))
+
+
+def iter_chunks(queryset, chunk_size):
+    chunk = []
+    # iterator()는 결과를 queryset 캐시에 쌓아두지 않고 chunk_size 만큼씩 DB에서 가져옴
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(obj)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_serialized(queryset, serializer_class, chunk_size):
+    encoder = JSONEncoder(ensure_ascii=False)
+    for chunk in iter_chunks(queryset, chunk_size):
+        data = serializer_class(chunk, many=True).data
+        yield [encoder.encode(item) for item in data]
+
+
+# [ {...}, {...}, ... ] 형태의 JSON 배열
+def stream_json_array(queryset, serializer_class, chunk_size):
+    yield b'['
+    first = True
+    for items in iter_serialized(queryset, serializer_class, chunk_size):
+        body = ','.join(items).encode()
+        yield body if first else b',' + body
+        first = False
+    yield b']'
+
+
+# 한 줄에 JSON 객체 하나씩 (newline delimited JSON)
+def stream_ndjson(queryset, serializer_class, chunk_size):
+    for items in iter_serialized(queryset, serializer_class, chunk_size):
+        yield ('\n'.join(items) + '\n').encode()
+
+
+def streaming_export_response(request, queryset, serializer_class, filename):
+    mode = request.query_params.get('mode', 'json')
+    if mode not in EXPORT_MODES:
+        mode = 'json'
+    chunk_size = get_chunk_size(request)
+
+    # 중첩 시리얼라이저가 필요로 하는 관계는 chunk마다 한번에 가져오도록 미리 설정
+    if hasattr(serializer_class, 'setup_eager_loading'):
+        queryset = serializer_class.setup_eager_loading(queryset)
+    queryset = queryset.order_by('pk')
+
+    if mode == 'ndjson':
+        content = stream_ndjson(queryset, serializer_class, chunk_size)
+        content_type = 'application/x-ndjson'
+    else:
+        content = stream_json_array(queryset, serializer_class, chunk_size)
+        content_type = 'application/json'
+
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{mode}"'
+    return response
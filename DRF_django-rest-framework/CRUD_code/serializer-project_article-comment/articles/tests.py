@@ -1,3 +1,557 @@
-from django.test import TestCase
+import base64
+import io
+import json
+import re
+import shutil
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection, router
+from django.db.models import Count
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import serializers
+
+from drf.instrumentation import InstrumentationMiddleware
+from drf.routers import PrimaryStickinessMiddleware
+
+from . import cache
+from .compiled import CompiledModelSerializer
+from .management.commands.bench_serializers import plain_serializer
+from .models import Article, Comment
+from .serializers import ArticleListSerializer, ArticleSerializer, CommentSerilizer
+
+
+# 댓글 목록 API가 댓글 수와 상관없이 사용할 수 있는 최대 쿼리 수
+# (ETag 계산용 집계 2번 + 게시글을 join한 댓글 조회 1번)
+COMMENT_LIST_QUERY_BUDGET = 3
+
+
+# 테스트마다 비어있는 파일 캐시를 사용 (locmem은 테스트끼리 캐시가 남아있을 수 있음)
+class FileCacheTestCase(TestCase):
+    def setUp(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        override = self.settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'articles': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location},
+        })
+        override.enable()
+        self.addCleanup(override.disable)
+
+
+class CommentListQueryTest(FileCacheTestCase):
+    def create_comments(self, count):
+        for i in range(count):
+            article = Article.objects.create(title=f'title{i}', content='content')
+            Comment.objects.create(article=article, content=f'comment{i}')
+
+    def assertWithinQueryBudget(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(
+            len(queries), COMMENT_LIST_QUERY_BUDGET,
+            '\n'.join(query['sql'] for query in queries),
+        )
+        return response
+
+    def test_eager_loading_plan(self):
+        self.assertEqual(CommentSerilizer.get_eager_loading_plan(), (['article'], []))
+
+    def test_query_count_does_not_grow_with_comments(self):
+        self.create_comments(1)
+        self.assertWithinQueryBudget('/api/v1/comments/')
+
+        self.create_comments(30)
+        response = self.assertWithinQueryBudget('/api/v1/comments/?page_size=50')
+        self.assertEqual(len(response.json()['results']), 31)
+        self.assertIn('title', response.json()['results'][0]['article'])
+
+
+class KeysetPaginationTest(FileCacheTestCase):
+    def create_articles(self, count):
+        return [Article.objects.create(title=f'title{i}', content='content') for i in range(count)]
+
+    def walk(self, url):
+        # next 링크를 따라가면서 모든 페이지의 id를 순서대로 모음
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [item['id'] for item in response.json()['results']]
+            url = response.json()['next']
+        return ids
+
+    def test_tied_created_at_is_ordered_by_id(self):
+        articles = self.create_articles(7)
+        # 앞의 5개는 created_at이 같음 (같은 시각에 여러 개가 저장된 경우)
+        tied = timezone.now()
+        Article.objects.filter(pk__in=[article.pk for article in articles[:5]]).update(created_at=tied)
+        Article.objects.filter(pk=articles[5].pk).update(created_at=tied + timezone.timedelta(seconds=1))
+        Article.objects.filter(pk=articles[6].pk).update(created_at=tied + timezone.timedelta(seconds=2))
+
+        ids = self.walk('/api/v1/articles/?page_size=2')
+        expected = [articles[6].pk, articles[5].pk] + sorted((article.pk for article in articles[:5]), reverse=True)
+        self.assertEqual(ids, expected)
+
+    @override_settings(ARTICLES_PAGINATION={'PAGE_SIZE': 3, 'MAX_PAGE_SIZE': 5})
+    def test_page_size_is_capped(self):
+        self.create_articles(8)
+        response = self.client.get('/api/v1/articles/?page_size=1000')
+        self.assertEqual(len(response.json()['results']), 5)
+        self.assertIn('page_size=5', response.json()['next'])
+        # 숫자가 아니거나 0 이하면 PAGE_SIZE
+        for page_size in ('abc', '0', '-1'):
+            response = self.client.get(f'/api/v1/articles/?page_size={page_size}')
+            self.assertEqual(len(response.json()['results']), 3)
+
+    def test_tampered_cursor_returns_404(self):
+        self.create_articles(3)
+        payloads = [
+            'not json', '["not a date", 1]', '["2020-01-01T00:00:00Z", "x"]', '["2020-13-01T00:00:00Z", 1]',
+            '[1, 2]', '{"a": 1}', '["2020-01-01T00:00:00Z", 1, 2]', '["2020-01-01T00:00:00Z", null]',
+        ]
+        cursors = ['%%%', 'bm90IGJhc2U2NA'] + [
+            base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=') for payload in payloads
+        ]
+        for cursor in cursors:
+            for url in ('/api/v1/articles/', '/api/v1/comments/'):
+                with self.subTest(cursor=cursor, url=url):
+                    self.assertEqual(self.client.get(url, {'cursor': cursor}).status_code, 404)
+
+
+class ArticleDetailQueryTest(FileCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.article = Article.objects.create(title='title', content='content')
+
+    def test_detail_query_count_is_fixed(self):
+        for i in range(5):
+            self.client.post(f'/api/v1/articles/{self.article.pk}/comments/', {'content': f'comment{i}'})
+        # ETag 집계 1번, 게시글 + 댓글 개수(annotate) 1번, prefetch 댓글 1번
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/v1/articles/{self.article.pk}/')
+        self.assertEqual(response.json()['num_of_comments'], 5)
+        self.assertEqual(len(response.json()['comments']), 5)
+
+    def test_comment_count_column_follows_create_and_delete(self):
+        response = self.client.post(f'/api/v1/articles/{self.article.pk}/comments/', {'content': 'comment'})
+        self.client.post(f'/api/v1/articles/{self.article.pk}/comments/', {'content': 'comment'})
+        self.client.delete(f"/api/v1/comments/{response.json()['id']}/")
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 1)
+
+        with self.settings(ARTICLES_DENORMALIZED_COMMENT_COUNT=True):
+            response = self.client.get(f'/api/v1/articles/{self.article.pk}/')
+        self.assertEqual(response.json()['num_of_comments'], 1)
+
+    def test_comment_count_does_not_go_below_zero(self):
+        response = self.client.post(f'/api/v1/articles/{self.article.pk}/comments/', {'content': 'comment'})
+        # 컬럼이 실제 댓글 수와 어긋나 있어도 (bulk 작업 등) 삭제할 때 0 아래로 내려가지 않음
+        Article.objects.filter(pk=self.article.pk).update(comment_count=0)
+        self.assertEqual(self.client.delete(f"/api/v1/comments/{response.json()['id']}/").status_code, 204)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 0)
+
+        Article.objects.filter(pk=self.article.pk).add_comment_count(-5)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 0)
+
+    def test_missing_article_returns_404(self):
+        response = self.client.get('/api/v1/articles/999/')
+        self.assertEqual(response.status_code, 404)
+
+
+class ArticleDetailCacheTest(FileCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.article = Article.objects.create(title='title', content='content')
+        self.url = f'/api/v1/articles/{self.article.pk}/'
+
+    def test_second_get_is_served_from_cache(self):
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+        # ETag 계산용 집계 쿼리만 실행
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.json()['title'], 'title')
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_article_update_invalidates(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(self.url, {'title': 'changed'}, content_type='application/json')
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['title'], 'changed')
+
+    def test_comment_changes_invalidate(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            comment = self.client.post(f'{self.url}comments/', {'content': 'comment'}).json()
+        self.assertEqual(self.client.get(self.url).json()['num_of_comments'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(f"/api/v1/comments/{comment['id']}/", {'content': 'changed'}, content_type='application/json')
+        self.assertEqual(self.client.get(self.url).json()['comments'][0]['content'], 'changed')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/v1/comments/{comment['id']}/")
+        self.assertEqual(self.client.get(self.url).json()['num_of_comments'], 0)
+
+    def test_delete_invalidates(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(self.url)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class CommentBulkTest(FileCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.article = Article.objects.create(title='title', content='content')
+        self.url = f'/api/v1/articles/{self.article.pk}/comments/bulk/'
+
+    def bulk(self, method, data, url=None):
+        return getattr(self.client, method)(url or self.url, json.dumps(data), content_type='application/json')
+
+    def create_comments(self, count):
+        response = self.bulk('post', [{'content': f'comment{i}'} for i in range(count)])
+        self.assertEqual(response.status_code, 201)
+        return [item['id'] for item in response.json()]
+
+    def test_create_in_batches(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.create_comments(5)
+        inserts = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.bulk('post', [{'content': f'more{i}'} for i in range(5)], f'{self.url}?batch_size=2')
+        self.assertEqual(response.status_code, 201)
+        inserts = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 3)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 10)
+
+    def test_per_item_errors(self):
+        response = self.bulk('post', [{'content': 'ok'}, {}, {'content': 'ok'}, {'content': ''}])
+        self.assertEqual(response.status_code, 400)
+        # 항목 순서대로 에러 (올바른 항목은 빈 객체), 하나라도 틀리면 아무것도 저장하지 않음
+        errors = response.json()
+        self.assertEqual(len(errors), 4)
+        self.assertEqual(errors[0], {})
+        self.assertIn('content', errors[1])
+        self.assertIn('content', errors[3])
+        self.assertFalse(Comment.objects.exists())
+
+    def test_rejects_empty_and_non_list_bodies(self):
+        self.assertEqual(self.bulk('post', []).status_code, 400)
+        self.assertEqual(self.bulk('put', []).status_code, 400)
+        self.assertEqual(self.bulk('post', {'content': 'comment'}).status_code, 400)
+        # 폼 데이터는 빈 목록으로 바뀌지 않고 그대로 거절
+        response = self.client.post(self.url, {'content': 'comment'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('non_field_errors', response.json())
+        self.assertFalse(Comment.objects.exists())
+
+    def test_update_accepts_string_ids(self):
+        ids = self.create_comments(2)
+        response = self.bulk('put', [{'id': str(ids[0]), 'content': 'first'}, {'id': ids[1], 'content': 'second'}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(Comment.objects.order_by('pk').values_list('content', flat=True)), ['first', 'second'],
+        )
+
+    def test_update_errors(self):
+        ids = self.create_comments(2)
+        other = Article.objects.create(title='other', content='content')
+        foreign = Comment.objects.create(article=other, content='other')
+
+        response = self.bulk('patch', [{'id': ids[0], 'content': 'a'}, {'id': ids[0], 'content': 'b'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('non_field_errors', response.json())
+
+        # 다른 게시글의 댓글 / 없는 id / 잘못된 id는 항목별 에러
+        response = self.bulk('patch', [
+            {'id': ids[0], 'content': 'a'}, {'id': foreign.pk, 'content': 'b'}, {'id': 'x', 'content': 'c'}, {'content': 'd'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertEqual(errors[0], {})
+        self.assertTrue(all('id' in error for error in errors[1:]))
+        self.assertEqual(Comment.objects.get(pk=ids[0]).content, 'comment0')
+
+    def test_delete(self):
+        ids = self.create_comments(5)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.bulk('delete', {'ids': ids[:3]}, f'{self.url}?batch_size=2')
+        self.assertEqual(response.status_code, 204)
+        deletes = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 2)
+        self.assertEqual(list(Comment.objects.values_list('pk', flat=True).order_by('pk')), ids[3:])
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 2)
+
+        response = self.bulk('delete', {'ids': [ids[3], 999]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()['ids']), ['1'])
+        self.assertEqual(Comment.objects.count(), 2)
+
+
+class BulkLoadDataTest(TestCase):
+    def load(self):
+        call_command('bulkloaddata', 'articles.json', 'comments.json', '--batch-size', '7', stdout=io.StringIO())
+
+    def assert_comment_counts(self):
+        for article in Article.objects.annotate(actual=Count('comments')):
+            self.assertEqual(article.comment_count, article.actual)
+
+    def test_fixtures_are_loaded_with_comment_count(self):
+        self.load()
+        self.assertEqual(Article.objects.count(), 20)
+        self.assertEqual(Comment.objects.count(), 20)
+        self.assert_comment_counts()
+        # auto_now / auto_now_add 대신 fixture의 시간값 그대로
+        self.assertEqual(Article.objects.get(pk=1).created_at.year, 1995)
+
+    def test_existing_rows_are_overwritten(self):
+        article = Article.objects.create(pk=1, title='old', content='old')
+        Comment.objects.create(pk=1, article=article, content='old')
+        self.load()
+        # 한번 더 넣어도 IntegrityError 없이 fixture 값으로 덮어씀
+        self.load()
+        self.assertEqual(Article.objects.count(), 20)
+        self.assertEqual(Comment.objects.count(), 20)
+        self.assertNotEqual(Article.objects.get(pk=1).title, 'old')
+        self.assertEqual(Comment.objects.get(pk=1).article_id, 20)
+        self.assert_comment_counts()
+
+
+class StreamingExportTest(FileCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(5):
+            article = Article.objects.create(title=f'title{i}', content=f'내용 {i}')
+            for j in range(3):
+                Comment.objects.create(article=article, content=f'comment{i}-{j}')
+
+    def export(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def expected(self, queryset, serializer_class):
+        # 스트리밍 없이 serializer(many=True).data 로 만든 응답과 같아야 함
+        return json.loads(json.dumps(serializer_class(queryset.order_by('pk'), many=True).data))
+
+    def test_streamed_json_matches_serializer(self):
+        cases = [
+            ('/api/v1/articles/export/', Article.objects.all(), ArticleListSerializer),
+            ('/api/v1/comments/export/', Comment.objects.all(), CommentSerilizer),
+        ]
+        for url, queryset, serializer_class in cases:
+            expected = self.expected(queryset, serializer_class)
+            # chunk 경계가 결과에 영향을 주지 않아야 함
+            for chunk_size in (1, 4, 1000):
+                with self.subTest(url=url, chunk_size=chunk_size):
+                    self.assertEqual(json.loads(self.export(f'{url}?chunk_size={chunk_size}')), expected)
+                    lines = self.export(f'{url}?mode=ndjson&chunk_size={chunk_size}').splitlines()
+                    self.assertEqual([json.loads(line) for line in lines], expected)
+
+    def test_empty_export(self):
+        Comment.objects.all().delete()
+        self.assertEqual(json.loads(self.export('/api/v1/comments/export/')), [])
+        self.assertEqual(self.export('/api/v1/comments/export/?mode=ndjson'), '')
+
+    def test_streamed_queries_are_logged(self):
+        with self.assertLogs('instrumentation', 'INFO') as logs:
+            response = self.client.get('/api/v1/articles/export/?chunk_size=2')
+            # 헤더를 보낼 때는 본문을 만들기 전이라 아직 기록하지 않음
+            self.assertEqual(logs.records, [])
+            before = int(re.search(r'desc="(\d+) queries"', response['Server-Timing']).group(1))
+            with CaptureQueriesContext(connection) as queries:
+                b''.join(response.streaming_content)
+        self.assertGreater(len(queries), 0)
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['path'], '/api/v1/articles/export/')
+        self.assertEqual(record['queries'], before + len(queries))
+
+    def test_query_count_does_not_grow_with_rows(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.export('/api/v1/comments/export/?chunk_size=2')
+            return len(queries)
+
+        before = count_queries()
+        article = Article.objects.create(title='more', content='content')
+        Comment.objects.bulk_create(Comment(article=article, content=f'more{i}') for i in range(40))
+        # 게시글은 select_related 로 같이 읽기 때문에 댓글 / chunk 수와 상관없음
+        self.assertEqual(count_queries(), before)
+        self.assertLessEqual(before, 1)
+
+
+class ConditionalGetTest(FileCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.article = Article.objects.create(title='title', content='content')
+        self.url = f'/api/v1/articles/{self.article.pk}/'
+
+    def test_matching_etag_returns_304(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_new_comment_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.post(f'{self.url}comments/', {'content': 'comment'})
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_validators(self):
+        response = self.client.get('/api/v1/comments/')
+        self.assertTrue(response.has_header('ETag'))
+        response = self.client.get('/api/v1/articles/')
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(
+            self.client.get('/api/v1/articles/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304,
+        )
+
+
+def compiled_serializer_with_method_field():
+    class Serializer(CompiledModelSerializer):
+        title_length = serializers.SerializerMethodField()
+
+        class Meta:
+            model = Article
+            fields = ('id', 'title_length')
+
+        def get_title_length(self, obj):
+            return len(obj.title)
+    return Serializer
+
+
+class CompiledSerializerTest(TestCase):
+    def test_compiled_output_matches_drf(self):
+        article = Article.objects.create(title='title', content='content')
+        Comment.objects.create(article=article, content='comment')
+        for serializer_class, queryset in (
+            (ArticleListSerializer, Article.objects.all()),
+            (ArticleSerializer.CommentDetialSerializer, Comment.objects.all()),
+        ):
+            self.assertIsNotNone(serializer_class.compiled_to_dict)
+            self.assertEqual(
+                serializer_class(queryset, many=True).data,
+                plain_serializer(serializer_class)(queryset, many=True).data,
+            )
+        # 중첩된 many=True 필드(comments)도 컴파일된 함수로 직렬화
+        self.assertEqual(ArticleSerializer(article).data['comments'], [{'id': article.comments.get().id, 'content': 'comment'}])
+
+    def test_serializer_with_method_field_is_not_compiled(self):
+        self.assertIsNone(compiled_serializer_with_method_field().compiled_to_dict)
+
+
+class InstrumentationTest(FileCacheTestCase):
+    def test_server_timing_header(self):
+        Article.objects.create(title='title', content='content')
+        response = self.client.get('/api/v1/articles/')
+        timing = response['Server-Timing']
+        for metric in ('db;dur=', 'serialize;dur=', 'render;dur=', 'total;dur='):
+            self.assertIn(metric, timing)
+        self.assertIn('desc="2 queries"', timing)
+
+    def test_duplicated_query_is_logged(self):
+        article = Article.objects.create(title='title', content='content')
+        for i in range(3):
+            Comment.objects.create(article=article, content=f'comment{i}')
+        # 댓글마다 게시글을 따로 조회하는 N+1 시리얼라이저
+        NPlusOneSerializer = type('NPlusOne', (serializers.Serializer,), {'title': serializers.CharField(source='article.title')})
+        with self.settings(INSTRUMENTATION={'DUPLICATE_QUERY_THRESHOLD': 3}):
+            with self.assertLogs('instrumentation', 'WARNING') as logs:
+                InstrumentationMiddleware(
+                    lambda request: HttpResponse(str(NPlusOneSerializer(Comment.objects.all(), many=True).data))
+                )(RequestFactory().get('/comments/'))
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['count'], 3)
+        self.assertIn('articles_article', record['duplicate_query'])
+
+
+# DB에 연결하지 않고 router 가 고르는 DB 별칭만 확인 (TestCase 는 테스트 전체가 트랜잭션 안이라서 읽기가 항상 primary)
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'], DATABASE_ROUTING={'STICKY_SECONDS': 5, 'COOKIE_NAME': 'db_primary_until'})
+class ReplicaRouterTest(SimpleTestCase):
+    def route(self, request, write=False):
+        # 미들웨어를 거친 요청 안에서 읽기에 쓰인 DB 목록 (write=True면 쓰기 후에 한번 더 읽음)
+        used = []
+
+        def view(request):
+            used.append(router.db_for_read(Article))
+            if write:
+                self.assertEqual(router.db_for_write(Article), 'default')
+                used.append(router.db_for_read(Article))
+            return HttpResponse()
+
+        response = PrimaryStickinessMiddleware(view)(request)
+        return used, response
+
+    def test_reads_stick_to_primary_after_a_write(self):
+        used, response = self.route(RequestFactory().get('/api/v1/articles/'), write=True)
+        self.assertIn(used[0], ['replica1', 'replica2'])
+        self.assertEqual(used[1], 'default')
+        cookie = response.cookies['db_primary_until']
+        self.assertEqual(cookie['max-age'], 5)
+
+        # 쿠키의 시간이 지나기 전에는 다음 요청의 읽기도 primary
+        request = RequestFactory().get('/api/v1/articles/')
+        request.COOKIES['db_primary_until'] = cookie.value
+        used, response = self.route(request)
+        self.assertEqual(used, ['default'])
+        self.assertNotIn('db_primary_until', response.cookies)
+
+        request.COOKIES['db_primary_until'] = str(time.time() - 1)
+        used, _ = self.route(request)
+        self.assertIn(used[0], ['replica1', 'replica2'])
+
+    def test_unsafe_methods_read_from_primary(self):
+        used, response = self.route(RequestFactory().put('/api/v1/articles/1/'))
+        self.assertEqual(used, ['default'])
+        # 쓰기를 하지 않았으면 쿠키를 붙이지 않음
+        self.assertNotIn('db_primary_until', response.cookies)
+
+    def test_replica_is_pinned_per_request(self):
+        used = []
+
+        def view(request):
+            used.append({router.db_for_read(Article) for _ in range(5)})
+            return HttpResponse()
+
+        with mock.patch('drf.routers.random.choice', side_effect=['replica1', 'replica2']):
+            PrimaryStickinessMiddleware(view)(RequestFactory().get('/api/v1/articles/'))
+            PrimaryStickinessMiddleware(view)(RequestFactory().get('/api/v1/articles/'))
+        self.assertEqual(used, [{'replica1'}, {'replica2'}])
+
+    @override_settings(
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'replica-router-test'}},
+        ARTICLES_DETAIL_CACHE={'ALIAS': 'default'},
+    )
+    def test_cache_is_filled_from_primary(self):
+        used = []
+
+        def view(request):
+            used.append(router.db_for_read(Article))
+            data, hit = cache.get_article_detail(1, lambda: router.db_for_read(Article))
+            used.append(data)
+            used.append(router.db_for_read(Article))
+            return HttpResponse()
+
+        PrimaryStickinessMiddleware(view)(RequestFactory().get('/api/v1/articles/1/'))
+        self.assertEqual(used[1], 'default')
+        # 캐시를 채운 뒤의 읽기는 다시 replica
+        self.assertIn(used[0], ['replica1', 'replica2'])
+        self.assertEqual(used[2], used[0])
@@ -5,8 +5,12 @@ from articles import views
 urlpatterns = [
     path('articles/', views.article_list),
     path('articles/<int:article_pk>/', views.article_detail),
+    path('articles/cache-stats/', views.article_cache_stats),
     path('comments/', views.comment_list),
     path('comments/<int:comment_pk>/', views.comment_detail),
     path('articles/<int:article_pk>/comments/', views.comment_create),
+    path('articles/<int:article_pk>/comments/bulk/', views.comment_bulk),
+    path('articles/export/', views.article_export),
+    path('comments/export/', views.comment_export),
 
 ]
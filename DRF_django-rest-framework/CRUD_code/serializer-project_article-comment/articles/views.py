@@ -1,17 +1,41 @@
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from rest_framework import status
+from django.conf import settings
+from django.db import transaction
+from django.shortcuts import get_object_or_404
 
 from .models import Article, Comment
-from .serializers import ArticleListSerializer, ArticleSerializer,CommentSerilizer
-from django.db.models import Count
+from .serializers import ArticleListSerializer, ArticleSerializer,CommentSerilizer, CommentBulkDeleteSerializer, get_item_pk
+from .pagination import KeysetCursorPagination
+from .streaming import streaming_export_response
+from . import cache
+from .conditional import (
+    conditional_get, article_detail_validators, article_list_validators,
+    comment_detail_validators, comment_list_validators,
+)
 
 # Create your views here.
+
+# 게시글 상세/수정/삭제/생성 응답이 모두 같이 쓰는 queryset
+# 댓글 개수는 annotate로, 댓글 목록은 prefetch로 가져오기 때문에 댓글이 몇 개든 쿼리 수가 고정됨
+def article_queryset():
+    return ArticleSerializer.setup_eager_loading(Article.objects.with_comment_count())
+
+
+# 조건부 GET: 클라이언트가 가진 응답이 최신이면 직렬화 없이 304 응답
+@conditional_get(article_list_validators)
 @api_view(['GET', 'POST'])
 def article_list(request):
     if request.method == 'GET':
         # 전체 게시글 데이터 조회
         articles = Article.objects.all()
+        # 전체를 한번에 보내지 않고 cursor 기준으로 한 페이지씩 잘라서 응답
+        paginator = KeysetCursorPagination()
+        page = paginator.paginate_queryset(articles, request)
+        if page is not None:
+            serializer = ArticleListSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
         # articles는 django에서는 쓸 수 있는 queryset 데이터 타입이기 때문에
         # 우리가 만든 모델시리얼라이저로 변환 진행
         serializer = ArticleListSerializer(articles, many=True)
@@ -33,22 +57,26 @@ def article_list(request):
 
 
 
+@conditional_get(article_detail_validators)
 @api_view(['GET', 'DELETE', 'PUT'])
 def article_detail(request, article_pk):
-    # 단일 게시글 데이터 조회
-    article = Article.objects.get(pk=article_pk)
+    if request.method == 'GET':
+        # 캐시에 직렬화된 응답이 있으면 DB 조회 없이 바로 응답
+        def build():
+            article = get_object_or_404(article_queryset(), pk=article_pk)
+            # ArticleSerializer 클래스로 직렬화를 진행
+            return ArticleSerializer(article).data
+
+        data, hit = cache.get_article_detail(article_pk, build)
+        return Response(data, headers={'X-Cache': 'HIT' if hit else 'MISS'})
+
     # 단일 게시글 조회 + 그 단일 게시글에 작성된 댓글의 개수도 계산하라고 db에 요청
-    article = Article.objects.annotate(num_of_comments=Count('comments')).get(pk=article_pk)
     # 기존의 article에는 없었지만 잠시 결과에만 포함된 데이터(실제 db 컬럼이 변한건 아님)
-    print(article.num_of_comments)
+    article = get_object_or_404(article_queryset(), pk=article_pk)
 
-    if request.method == 'GET':
-        # ArticleSerializer 클래스로 직렬화를 진행
-        serializer = ArticleSerializer(article)
-        return Response(serializer.data)
-    
-    elif request.method == 'DELETE':
+    if request.method == 'DELETE':
         article.delete()
+        cache.invalidate_article(article_pk)
         return Response(status=status.HTTP_204_NO_CONTENT)
     
     elif request.method == 'PUT':
@@ -57,24 +85,38 @@ def article_detail(request, article_pk):
         # serializer = ArticleSerializer(instance=article, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            cache.invalidate_article(article_pk)
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+## 게시글 상세 캐시의 적중/실패 횟수
+@api_view(['GET'])
+def article_cache_stats(request):
+    return Response(cache.stats())
 
+
+@conditional_get(comment_list_validators)
 @api_view(['GET'])
 def comment_list(request):
     # 댓글 전체 조회
-    comments = Comment.objects.all()
+    # 중첩 시리얼라이저가 필요로 하는 게시글을 join으로 한번에 가져옴
+    comments = CommentSerilizer.setup_eager_loading(Comment.objects.all())
+    paginator = KeysetCursorPagination()
+    page = paginator.paginate_queryset(comments, request)
+    if page is not None:
+        serializer = CommentSerilizer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     # 댓글 데이터를 가공
     serializer = CommentSerilizer(comments, many=True)
     return Response(serializer.data)
 
 
 ## 상세 페이지 
+@conditional_get(comment_detail_validators)
 @api_view(['GET','PUT','DELETE'])
 def comment_detail(request,comment_pk):
-    comment = Comment.objects.get(pk=comment_pk)
+    comment = get_object_or_404(Comment, pk=comment_pk)
 
     if request.method == 'GET':
         # 조회한 단일 댓글 데이터를 가공
@@ -86,23 +128,111 @@ def comment_detail(request,comment_pk):
         serializer = CommentSerilizer(comment,data=request.data)
         if serializer.is_valid(raise_exception=True):
             serializer.save()
+            # 게시글 상세 응답에 댓글 내용이 포함되어 있으므로 해당 게시글의 캐시도 무효화
+            cache.invalidate_article(comment.article_id)
             return Response(serializer.data)
 
     elif request.method == 'DELETE':
-        comment.delete()
+        # 댓글 삭제와 게시글의 댓글 개수 감소를 하나의 트랜잭션으로 처리
+        with transaction.atomic():
+            comment.delete()
+            Article.objects.filter(pk=comment.article_id).add_comment_count(-1)
+            cache.invalidate_article(comment.article_id)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 @api_view(['POST'])
 def comment_create(request,article_pk):
     # 단일한 아티크를 가져오고고
-    article = Article.objects.get(pk=article_pk)
+    article = get_object_or_404(Article, pk=article_pk)
     # 사용자가 입력한 댓글을 json으로 변환하고고
     serialzier = CommentSerilizer(data=request.data)
 
     # 잘못된 입력값이면 자동으로 400을 리턴하게 하는게 'raise_exception=True'
     if serialzier.is_valid(raise_exception=True):
-        # commit=False로 하는게 아니라 save 메서드의 이자로 작성 (그냥 장고에서 정한거임)
-        serialzier.save(article=article) 
+        with transaction.atomic():
+            # commit=False로 하는게 아니라 save 메서드의 이자로 작성 (그냥 장고에서 정한거임)
+            serialzier.save(article=article) 
+            # 게시글의 댓글 개수 컬럼도 같이 1 증가
+            Article.objects.filter(pk=article.pk).add_comment_count(1)
+            cache.invalidate_article(article.pk)
         return Response(serialzier.data, status=status.HTTP_201_CREATED)
-        
\ No newline at end of file
+
+
+## 댓글 여러 개를 한번에 생성(POST) / 수정(PUT, PATCH) / 삭제(DELETE)
+# POST   : [{"content": "..."}, ...]
+# PUT    : [{"id": 1, "content": "..."}, ...]
+# DELETE : {"ids": [1, 2, 3]}
+# POST / PUT / PATCH 는 비어있지 않은 JSON 배열만 받음 (빈 배열, 객체, 폼 데이터는 400)
+# 전체가 하나의 트랜잭션이라 하나라도 잘못된 항목이 있으면 아무것도 저장하지 않고, 항목별 에러를 순서대로 돌려줌
+@api_view(['POST', 'PUT', 'PATCH', 'DELETE'])
+def comment_bulk(request, article_pk):
+    article = get_object_or_404(Article, pk=article_pk)
+    options = getattr(settings, 'ARTICLES_BULK', {})
+    max_items = options.get('MAX_ITEMS', 5000)
+    context = {'article': article, 'batch_size': get_bulk_batch_size(request, options)}
+
+    if request.method == 'POST':
+        serializer = CommentSerilizer(
+            data=request.data, many=True, allow_empty=False, max_length=max_items, context=context,
+        )
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            comments = serializer.save(article=article)
+            Article.objects.filter(pk=article.pk).add_comment_count(len(comments))
+            cache.invalidate_article(article.pk)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    elif request.method in ('PUT', 'PATCH'):
+        # 수정 대상 댓글들을 쿼리 한번으로 가져옴 ({pk: 댓글})
+        ids = []
+        if isinstance(request.data, list):
+            ids = [get_item_pk(item) for item in request.data]
+        comments = article.comments.in_bulk([pk for pk in ids if pk is not None])
+        serializer = CommentSerilizer(
+            comments, data=request.data, many=True, allow_empty=False, max_length=max_items,
+            partial=request.method == 'PATCH', context=context,
+        )
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            serializer.save()
+            cache.invalidate_article(article.pk)
+        return Response(serializer.data)
+
+    elif request.method == 'DELETE':
+        serializer = CommentBulkDeleteSerializer(data=request.data, context=context)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        if len(ids) > max_items:
+            return Response({'ids': [f'한번에 {max_items}개까지 삭제할 수 있습니다.']}, status=status.HTTP_400_BAD_REQUEST)
+        batch_size = context['batch_size']
+        with transaction.atomic():
+            deleted = 0
+            for start in range(0, len(ids), batch_size):
+                deleted += article.comments.filter(pk__in=ids[start:start + batch_size]).delete()[0]
+            Article.objects.filter(pk=article.pk).add_comment_count(-deleted)
+            cache.invalidate_article(article.pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def get_bulk_batch_size(request, options):
+    default = options.get('BATCH_SIZE', 500)
+    try:
+        batch_size = int(request.query_params.get('batch_size', default))
+    except ValueError:
+        batch_size = default
+    return max(1, min(batch_size, options.get('MAX_BATCH_SIZE', 1000)))
+
+
+## 전체 데이터 내보내기 (스트리밍)
+# ?mode=json (기본, JSON 배열) 또는 ?mode=ndjson, ?chunk_size=로 한번에 읽을 행 수 지정
+@api_view(['GET'])
+def article_export(request):
+    return streaming_export_response(request, Article.objects.all(), ArticleListSerializer, 'articles')
+
+
+@api_view(['GET'])
+def comment_export(request):
+    return streaming_export_response(request, Comment.objects.all(), CommentSerilizer, 'comments')
@@ -0,0 +1,248 @@
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework import serializers
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+
+
+# 요청마다 SQL 쿼리 수, DB 시간, 직렬화 시간, 렌더링 시간을 재서
+#   - Server-Timing 응답 헤더 (브라우저 개발자도구 Network 탭 > Timing 에서 확인 가능)
+#   - 'instrumentation' 로거에 JSON 한 줄
+# 로 남기는 미들웨어와 DRF 쪽 측정 도구
+# 스트리밍 응답은 본문을 다 보낸 뒤에 본문을 만드는 동안 실행된 쿼리까지 포함해서 로거에 남김
+# 같은 SQL(파라미터만 다른 쿼리)이 DUPLICATE_QUERY_THRESHOLD 번 이상 실행되면 그 중 가장 오래 걸린 쿼리를 경고로 남김
+# (목록 API에서 관계를 행마다 따로 조회하는 N+1 문제를 운영 환경에서도 찾을 수 있게)
+
+logger = logging.getLogger('instrumentation')
+
+# 지금 처리 중인 요청의 측정값 (미들웨어 밖에서 호출되면 None이고 아무것도 재지 않음)
+current_timings = ContextVar('current_timings', default=None)
+
+
+def get_options():
+    return getattr(settings, 'INSTRUMENTATION', {})
+
+
+class RequestTimings:
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.phases = {}
+        self.active = set()
+        # SQL -> [실행 횟수, 총 시간]
+        self.statements = {}
+
+    # connection.execute_wrapper 로 등록하는 함수 (모든 쿼리가 이 함수를 거쳐서 실행됨)
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.db += elapsed
+            stats = self.statements.setdefault(sql, [0, 0.0])
+            stats[0] += 1
+            stats[1] += elapsed
+
+    def add(self, name, elapsed):
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def worst_duplicate(self, threshold):
+        # threshold 번 이상 반복된 SQL 중 총 시간이 가장 긴 것 (sql, 횟수, 총 시간)
+        repeated = [
+            (total, count, sql) for sql, (count, total) in self.statements.items() if count >= threshold
+        ]
+        if not repeated:
+            return None
+        total, count, sql = max(repeated)
+        return sql, count, total
+
+
+@contextmanager
+def timed(name):
+    timings = current_timings.get()
+    # 같은 구간 안에서 다시 호출되면 (예: BrowsableAPIRenderer 안의 JSONRenderer) 두번 더하지 않음
+    if timings is None or name in timings.active:
+        yield
+        return
+    timings.active.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.active.discard(name)
+        timings.add(name, time.perf_counter() - started)
+
+
+class InstrumentationMiddleware:
+    # async 뷰(artists/async_views.py)를 ASGI 로 실행할 때 이 미들웨어 때문에 동기로 바뀌지 않도록 둘다 지원
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not get_options().get('ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings.record_query))
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        started = time.perf_counter()
+        # async 요청의 DB 쿼리는 sync_to_async 스레드(요청마다 하나)에서 실행되므로 그 스레드의 연결에 등록
+        # (thread_sensitive=False 로 다른 스레드에서 실행한 쿼리는 세지 않음)
+        await sync_to_async(add_query_wrappers)(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(remove_query_wrappers)(timings)
+            current_timings.reset(token)
+        return self.finish(request, response, timings, time.perf_counter() - started)
+
+    def finish(self, request, response, timings, total):
+        if get_options().get('SERVER_TIMING', True):
+            response['Server-Timing'] = server_timing(timings, total)
+        # 파일 응답(FileResponse)은 본문을 보낼 때 쿼리를 실행하지 않고, 감싸면 서버의 파일 전송(wsgi.file_wrapper)을 못 쓰므로 제외
+        if response.streaming and getattr(response, 'file_to_stream', None) is None:
+            # 스트리밍 응답(articles/streaming.py 의 export 등)은 본문을 보내는 동안에도 쿼리를 실행하므로
+            # 본문을 다 보낸 뒤에 그 쿼리까지 더해서 기록 (헤더는 먼저 나가므로 Server-Timing 에는 본문 전까지만 들어감)
+            response.streaming_content = measure_stream(response.streaming_content, request, response, timings, total)
+        else:
+            log_request(request, response, timings, total)
+        return response
+
+
+def measure_stream(content, request, response, timings, total):
+    started = time.perf_counter()
+    iterator = iter(content)
+    try:
+        while True:
+            # 본문은 미들웨어가 끝난 뒤 서버가(ASGI 면 다른 스레드에서) 읽으므로 chunk 를 만들 때마다 그 스레드의 연결에 등록
+            token = current_timings.set(timings)
+            try:
+                with ExitStack() as stack:
+                    for connection in connections.all():
+                        stack.enter_context(connection.execute_wrapper(timings.record_query))
+                    chunk = next(iterator, None)
+            finally:
+                current_timings.reset(token)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        # 끝까지 보내지 못하고 닫혀도(클라이언트가 연결을 끊는 등) 그때까지 실행된 쿼리를 기록
+        log_request(request, response, timings, total + time.perf_counter() - started)
+
+
+def add_query_wrappers(timings):
+    for connection in connections.all():
+        connection.execute_wrappers.append(timings.record_query)
+
+
+def remove_query_wrappers(timings):
+    for connection in connections.all():
+        if timings.record_query in connection.execute_wrappers:
+            connection.execute_wrappers.remove(timings.record_query)
+
+
+def server_timing(timings, total):
+    metrics = [f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries"']
+    for name, elapsed in timings.phases.items():
+        metrics.append(f'{name};dur={elapsed * 1000:.2f}')
+    metrics.append(f'total;dur={total * 1000:.2f}')
+    return ', '.join(metrics)
+
+
+def log_request(request, response, timings, total):
+    record = {
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'queries': timings.queries,
+        'db_ms': round(timings.db * 1000, 2),
+        **{f'{name}_ms': round(elapsed * 1000, 2) for name, elapsed in timings.phases.items()},
+        'total_ms': round(total * 1000, 2),
+    }
+    logger.info(json.dumps(record))
+
+    threshold = get_options().get('DUPLICATE_QUERY_THRESHOLD')
+    duplicate = timings.worst_duplicate(threshold) if threshold else None
+    if duplicate is not None:
+        sql, count, elapsed = duplicate
+        logger.warning(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'duplicate_query': sql,
+            'count': count,
+            'db_ms': round(elapsed * 1000, 2),
+        }))
+
+
+# DRF 직렬화 시간 측정
+# serializer.data 를 읽는 동안 걸린 시간을 serialize 로 기록 (직렬화 중에 실행된 지연 로딩 쿼리 시간도 포함)
+# many=True 로 만들어지는 ListSerializer 도 같은 방식으로 재도록 Meta.list_serializer_class 를 감쌈
+class TimedDataMixin:
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
+
+_timed_list_classes = {}
+
+
+def timed_list_class(list_serializer_class):
+    if issubclass(list_serializer_class, TimedDataMixin):
+        return list_serializer_class
+    if list_serializer_class not in _timed_list_classes:
+        _timed_list_classes[list_serializer_class] = type(
+            f'Timed{list_serializer_class.__name__}', (TimedDataMixin, list_serializer_class), {},
+        )
+    return _timed_list_classes[list_serializer_class]
+
+
+class TimedSerializerMixin(TimedDataMixin):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        meta = getattr(cls, 'Meta', None)
+        if meta is not None:
+            meta.list_serializer_class = timed_list_class(getattr(meta, 'list_serializer_class', serializers.ListSerializer))
+
+
+# DRF 렌더링 시간 측정 (settings.REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] 에 등록)
+class TimedRendererMixin:
+    def render(self, *args, **kwargs):
+        with timed('render'):
+            return super().render(*args, **kwargs)
+
+
+class TimedJSONRenderer(TimedRendererMixin, JSONRenderer):
+    pass
+
+
+class TimedBrowsableAPIRenderer(TimedRendererMixin, BrowsableAPIRenderer):
+    pass
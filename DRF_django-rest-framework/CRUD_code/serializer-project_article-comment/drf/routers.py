@@ -0,0 +1,163 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+# 읽기는 복제본(replica) DB로, 쓰기는 primary(default) DB로 보내는 DB router 와 미들웨어
+#   - settings.DATABASE_REPLICAS 의 별칭 중 하나를 골라서 읽음 (비어 있으면 router 가 아무것도 정하지 않으므로 모두 default)
+#     - 요청마다 replica 하나를 골라서 그 요청의 읽기는 모두 같은 replica 에서 (쿼리마다 고르면 replica 마다 따라온 시점이 달라서
+#       한 응답 안에서 게시글과 댓글 수처럼 서로 다른 시점의 데이터가 섞일 수 있음)
+#   - replica 는 primary 보다 늦게 반영되므로(replication lag) 방금 쓴 데이터를 다시 읽을 때는 primary 에서 읽음 (read-your-writes)
+#     - 요청 안에서 쓰기를 했거나 POST / PUT / PATCH / DELETE 요청이면 그 요청의 읽기는 primary
+#       (수정 / 삭제 전에 조회하는 객체나 version 비교도 최신 데이터로 해야 하므로)
+#     - 쓰기를 한 요청의 응답에 쿠키(COOKIE_NAME)를 붙여서 STICKY_SECONDS 초 동안은 같은 클라이언트의 읽기도 primary
+#     - primary 의 트랜잭션(transaction.atomic) 안에서는 읽기도 primary (커밋 전 데이터를 읽어야 하므로)
+#   - 요청 밖(관리 명령, shell)에서도 한번 쓰면 그 뒤의 읽기는 primary
+#   - 캐시를 채우는 읽기는 read_from_primary() 안에서 primary 에서 (replica 의 늦은 데이터가 캐시에 들어가면
+#     무효화가 이미 끝난 뒤라서 캐시가 만료될 때까지 예전 데이터를 응답함)
+# 쿠키는 읽기를 primary 로 보내기만 하므로 클라이언트가 값을 바꿔도 데이터가 달라지지는 않음
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+def get_options():
+    return getattr(settings, 'DATABASE_ROUTING', {})
+
+
+def get_replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+class RoutingState:
+    def __init__(self, use_primary=False):
+        # True면 읽기도 primary 에서
+        self.use_primary = use_primary
+        # 이번 요청에서 쓰기를 했는지 (쿠키를 붙일지)
+        self.wrote = False
+        # 이번 요청의 읽기에 쓰는 replica (첫 읽기 때 고름)
+        self.replica = None
+
+
+# 지금 처리 중인 요청의 상태 (요청 밖이면 첫 쓰기 때 만들어짐)
+# sync_to_async 로 실행되는 코드에서도 같은 객체를 보도록 값을 바꾸지 않고 객체의 속성만 바꿈
+current_state = ContextVar('database_routing_state', default=None)
+
+
+def get_state():
+    state = current_state.get()
+    if state is None:
+        state = RoutingState()
+        current_state.set(state)
+    return state
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = get_replicas()
+        if not replicas:
+            return None
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            # 이미 읽어온 객체의 관계(article.comment_set 등)는 그 객체를 읽은 DB에서 읽음
+            return instance._state.db
+        state = get_state()
+        if state.use_primary or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if state.replica not in replicas:
+            state.replica = random.choice(replicas)
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        if not get_replicas():
+            return None
+        state = get_state()
+        state.use_primary = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replica 는 primary 와 같은 데이터이므로 어느 DB에서 읽은 객체끼리도 관계를 맺을 수 있음
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replica 는 primary 를 복제해서 만들기 때문에 migrate 하지 않음
+        if db in get_replicas():
+            return False
+        return None
+
+
+@contextmanager
+def read_from_primary():
+    # 이 블록 안의 읽기는 primary 에서 (블록 안에서 쓰기를 했으면 블록이 끝난 뒤에도 primary)
+    state = get_state()
+    use_primary = state.use_primary
+    state.use_primary = True
+    try:
+        yield
+    finally:
+        state.use_primary = use_primary or state.wrote
+
+
+class PrimaryStickinessMiddleware:
+    # async 뷰를 ASGI 로 실행할 때 이 미들웨어 때문에 동기로 바뀌지 않도록 둘다 지원
+    # (async 뷰의 ORM 호출은 sync_to_async 가 contextvar 를 복사해서 실행하므로 같은 RoutingState 객체를 봄)
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not get_replicas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = start_request(request)
+        token = current_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_state.reset(token)
+        return finish_request(state, response)
+
+    async def __acall__(self, request):
+        state = start_request(request)
+        token = current_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_state.reset(token)
+        return finish_request(state, response)
+
+
+def start_request(request):
+    cookie_name = get_options().get('COOKIE_NAME', 'db_primary_until')
+    return RoutingState(use_primary=request.method not in SAFE_METHODS or is_sticky(request, cookie_name))
+
+
+def finish_request(state, response):
+    if state.wrote:
+        options = get_options()
+        seconds = options.get('STICKY_SECONDS', 5)
+        response.set_cookie(
+            options.get('COOKIE_NAME', 'db_primary_until'), f'{time.time() + seconds:.3f}',
+            max_age=seconds, httponly=True, samesite='Lax',
+        )
+    return response
+
+
+def is_sticky(request, cookie_name):
+    try:
+        return float(request.COOKIES.get(cookie_name, 0)) > time.time()
+    except ValueError:
+        return False
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +47,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # 요청별 쿼리 수 / DB 시간 / 직렬화 / 렌더링 시간 측정 (가장 바깥에서 전체 시간을 재도록 맨 앞에 둠)
+    "drf.instrumentation.InstrumentationMiddleware",
+    # 쓰기를 한 요청 / 클라이언트의 읽기를 primary DB로 보냄 (drf/routers.py, replica 가 없으면 사용 안함)
+    "drf.routers.PrimaryStickinessMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -78,13 +84,61 @@ WSGI_APPLICATION = "drf.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# 서버 실행 방식 (wsgi / asgi), asgi.py 가 환경변수 DJANGO_SERVER_MODE=asgi 로 설정함
+    # ASGI 에서는 sync 코드(ORM)가 요청마다 다른 스레드에서 실행되어 그 스레드의 연결이 요청이 끝나도 닫히지 않고 쌓이므로
+    # (Django ticket #33497) CONN_MAX_AGE 를 0 으로 두어 요청이 끝날 때 연결을 닫음
+SERVER_MODE = os.environ.get("DJANGO_SERVER_MODE", "wsgi")
+
+# drf/sqlite/base.py : 연결을 만들 때 PRAGMA 를 실행하는 SQLite backend
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "drf.sqlite",
         "NAME": BASE_DIR / "db.sqlite3",
+        # 요청이 끝나도 연결을 닫지 않고 CONN_MAX_AGE 초 동안 재사용 (요청마다 연결 + PRAGMA 실행을 반복하지 않음)
+        # (runserver 는 요청마다 스레드를 새로 만들어서 재사용되지 않음)
+        # ASGI 로 실행할 때는 재사용하지 않음 (SERVER_MODE 참고)
+        "CONN_MAX_AGE": 0 if SERVER_MODE == "asgi" else 600,
+        # 재사용하기 전에 연결이 아직 쓸 수 있는지 확인
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            # busy timeout (초)
+            "timeout": 20,
+            "transaction_mode": "IMMEDIATE",
+            "pragmas": {
+                "journal_mode": "WAL",
+                "synchronous": "NORMAL",
+                # 256MB
+                "mmap_size": 268435456,
+                # 음수면 KiB 단위 (약 20MB)
+                "cache_size": -20000,
+                "temp_store": "MEMORY",
+            },
+        },
     }
 }
 
+# 읽기 전용 복제본(replica) DB 별칭 목록 (drf/routers.py 가 읽기를 이 중 하나로 보냄)
+    # 환경변수 DATABASE_REPLICAS=<개수> 로 지정하면 db.replica1.sqlite3, db.replica2.sqlite3 ... 를 replica 로 사용
+    # (로컬 확인용, manage.py sync_replicas 로 default 를 복사해서 만듦)
+    # 테스트에서는 replica 테스트 DB를 따로 만들지 않고 default 테스트 DB를 같이 사용 (MIRROR)
+DATABASE_REPLICAS = [f"replica{i}" for i in range(1, int(os.environ.get("DATABASE_REPLICAS", "0")) + 1)]
+for alias in DATABASE_REPLICAS:
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "NAME": BASE_DIR / f"db.{alias}.sqlite3",
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["drf.routers.PrimaryReplicaRouter"]
+
+# 읽기 / 쓰기 DB 분리 설정
+    # STICKY_SECONDS : 쓰기를 한 뒤 이 시간(초) 동안은 같은 클라이언트의 읽기도 primary 에서 (replica 가 따라오는 시간보다 길게)
+    # COOKIE_NAME : 그 시간을 기록하는 쿠키 이름
+DATABASE_ROUTING = {
+    "STICKY_SECONDS": 5,
+    "COOKIE_NAME": "db_primary_until",
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -132,6 +186,88 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 REST_FRAMEWORK = {
     # YOUR SETTINGS
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # 렌더링 시간을 Server-Timing 헤더에 남기는 렌더러 (DRF 기본 렌더러와 같은 순서)
+    'DEFAULT_RENDERER_CLASSES': [
+        'drf.instrumentation.TimedJSONRenderer',
+        'drf.instrumentation.TimedBrowsableAPIRenderer',
+    ],
+}
+
+# 캐시 백엔드 설정 (기본은 프로세스 메모리에 저장하는 locmem)
+    # 여러 서버/프로세스가 캐시를 공유해야 하면 redis, memcached, 파일 캐시 등으로 BACKEND만 바꾸면 됨
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'articles': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'articles',
+    },
+}
+
+# 게시글 상세(article_detail) 응답 캐시 설정
+    # ALIAS : 사용할 CACHES의 별칭
+    # TIMEOUT : 캐시된 응답을 보관하는 시간(초)
+ARTICLES_DETAIL_CACHE = {
+    'ALIAS': 'articles',
+    'TIMEOUT': 300,
+}
+
+# 게시글/댓글 목록 cursor 페이지네이션 설정
+    # PAGE_SIZE : page_size 파라미터가 없을 때 한 페이지의 개수 (None이면 페이지네이션 안함)
+    # MAX_PAGE_SIZE : 클라이언트가 요청할 수 있는 최대 page_size
+ARTICLES_PAGINATION = {
+    'PAGE_SIZE': 20,
+    'MAX_PAGE_SIZE': 100,
+}
+
+# 게시글/댓글 전체 내보내기(export) 스트리밍 설정
+    # CHUNK_SIZE : DB에서 한번에 읽고 직렬화하는 행 수
+    # MAX_CHUNK_SIZE : chunk_size 파라미터로 요청할 수 있는 최대값
+ARTICLES_EXPORT = {
+    'CHUNK_SIZE': 2000,
+    'MAX_CHUNK_SIZE': 10000,
+}
+
+# 댓글 일괄 생성/수정/삭제 설정
+    # BATCH_SIZE : bulk_create / bulk_update 한번에 묶어서 보내는 행 수 (?batch_size= 로 변경 가능)
+    # MAX_BATCH_SIZE : batch_size 파라미터의 최대값
+    # MAX_ITEMS : 요청 하나에 담을 수 있는 최대 항목 수
+ARTICLES_BULK = {
+    'BATCH_SIZE': 500,
+    'MAX_BATCH_SIZE': 1000,
+    'MAX_ITEMS': 5000,
+}
+
+# True면 댓글 개수를 매번 COUNT 하지 않고 Article.comment_count 컬럼에서 읽음
+ARTICLES_DENORMALIZED_COMMENT_COUNT = False
+
+# 요청별 측정(drf/instrumentation.py) 설정
+    # ENABLED : False면 미들웨어를 사용하지 않음
+    # SERVER_TIMING : Server-Timing 응답 헤더를 붙일지 여부
+    # DUPLICATE_QUERY_THRESHOLD : 같은 SQL이 이 횟수 이상 실행되면 경고 로그 (None이면 검사 안함)
+INSTRUMENTATION = {
+    'ENABLED': True,
+    'SERVER_TIMING': True,
+    'DUPLICATE_QUERY_THRESHOLD': 10,
+}
+
+# 요청마다 남기는 측정 로그(JSON 한 줄)를 콘솔로 출력
+    # 로그 레벨은 환경변수 INSTRUMENTATION_LOG_LEVEL 로 변경 (WARNING이면 중복 쿼리 경고만 출력)
+    # manage.py test 로 실행할 때는 요청마다 찍히지 않도록 WARNING
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'instrumentation': {
+            'handlers': ['console'],
+            'level': os.environ.get('INSTRUMENTATION_LOG_LEVEL', 'WARNING' if 'test' in sys.argv else 'INFO'),
+            'propagate': False,
+        },
+    },
 }
 
 SPECTACULAR_SETTINGS = {
@@ -0,0 +1,170 @@
+# SQLite 설정(profile)별로 읽기와 쓰기가 섞인 부하에서 처리량을 비교
+#   python benchmarks/mixed.py --duration 10 --readers 8 --writers 4
+#   python benchmarks/mixed.py --target artists --profile default --profile tuned
+# 프로젝트 x profile 마다 이 파일을 하위 프로세스로 다시 실행함 (worker.py 와 같은 이유)
+#   default : 장고 기본 sqlite3 backend, 요청마다 연결을 새로 만듦 (CONN_MAX_AGE=0, rollback journal)
+#   tuned   : 각 프로젝트 settings.py 의 DATABASES 그대로 (<project>.sqlite backend, WAL + PRAGMA, CONN_MAX_AGE)
+# --duration 초 동안
+#   - 읽기 스레드 --readers 개가 상세 페이지(API)를 GET
+#   - 쓰기 스레드 --writers 개가 새 글 / 아티스트를 POST
+# 처리량(req/s), 지연시간(p50 / p99), 실패한 요청 수("database is locked" 등)를 출력
+import argparse
+import json
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from itertools import count
+from pathlib import Path
+
+from worker import TARGETS, percentile, seed_artists, seed_drf, seed_templates, setup_django
+
+BENCH_DIR = Path(__file__).resolve().parent
+
+PROFILES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': False,
+        'OPTIONS': {},
+    },
+    'tuned': None,
+}
+
+
+def operations(target, seeded, rng):
+    # (읽기 요청을 보내는 함수, 쓰기 요청을 보내는 함수) - 둘 다 client 를 받아서 응답을 돌려줌
+    names = count()
+    if target == 'drf':
+        ids = seeded['article_ids']
+        return (
+            lambda client: client.get(f'/api/v1/articles/{rng.choice(ids)}/'),
+            lambda client: client.post('/api/v1/articles/', {'title': f'new {next(names)}', 'content': 'content'}),
+        )
+    if target == 'artists':
+        ids = seeded['artist_ids']
+        return (
+            lambda client: client.get(f'/api/v1/detail/{rng.choice(ids)}/'),
+            lambda client: client.post('/api/v1/artists_create/', {
+                'name': f'new-{next(names):07d}', 'agency': 'agency', 'debut_data': '2020-01-01', 'is_group': False,
+            }),
+        )
+    from django.urls import reverse
+
+    ids = seeded['article_ids']
+    return (
+        lambda client: client.get(reverse('articles:detail', args=[rng.choice(ids)])),
+        lambda client: client.post(reverse('articles:create'), {'title': f'new {next(names)}', 'content': 'content'}),
+    )
+
+
+def drive(read, write, readers, writers, duration):
+    from django.db import close_old_connections, connections
+    from django.test import Client
+
+    # 종류별 [지연시간 목록, 실패 수]
+    results = {'read': [[], 0], 'write': [[], 0]}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(kind, request):
+        client = Client(raise_request_exception=False)
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = request(client)
+                # 테스트 클라이언트는 요청이 끝나도 DB 연결을 닫지 않으므로 WSGI 서버처럼 직접 호출
+                # (CONN_MAX_AGE=0 이면 닫고, 아니면 CONN_MAX_AGE 동안 재사용)
+                close_old_connections()
+                elapsed = time.perf_counter() - started
+                with lock:
+                    if response.status_code >= 400:
+                        results[kind][1] += 1
+                    else:
+                        results[kind][0].append(elapsed)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker, args=('read', read)) for _ in range(readers)]
+    threads += [threading.Thread(target=worker, args=('write', write)) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        kind: {
+            'throughput_rps': round(len(latencies) / duration, 2),
+            'p50_ms': round((percentile(latencies, 50) or 0) * 1000, 3),
+            'p99_ms': round((percentile(latencies, 99) or 0) * 1000, 3),
+            'errors': errors,
+        }
+        for kind, (latencies, errors) in results.items()
+    }
+
+
+def run_child(options):
+    target, profile = options.target[0], options.profile[0]
+    rng = random.Random(options.seed)
+    workdir = tempfile.mkdtemp(prefix='bench-')
+    # 스레드마다 따로 연결하도록 파일 DB 사용 (setup_django)
+    old_name = setup_django(target, None, workdir, PROFILES[profile])
+    from django.db import connection
+
+    try:
+        seed = {'drf': seed_drf, 'artists': seed_artists, 'templates': seed_templates}[target]
+        seeded = seed(options.scale, rng, 5000)
+        connection.close()
+        read, write = operations(target, seeded, rng)
+        results = drive(read, write, options.readers, options.writers, options.duration)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps(results))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare SQLite profiles under a mixed read/write load.')
+    parser.add_argument('--target', action='append', choices=sorted(TARGETS), help='Project to run (repeatable, default: all).')
+    parser.add_argument('--profile', action='append', choices=sorted(PROFILES), help='Database profile (repeatable, default: all).')
+    parser.add_argument('--scale', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+
+    if options.child:
+        run_child(options)
+        return 0
+
+    print(f"{'target':<11}{'profile':<9}{'reads/s':>9}{'read p50':>10}{'read p99':>10}{'writes/s':>10}{'write p50':>11}{'write p99':>11}{'errors':>8}")
+    for target in options.target or sorted(TARGETS):
+        for profile in options.profile or sorted(PROFILES):
+            command = [
+                sys.executable, str(BENCH_DIR / 'mixed.py'), '--child',
+                '--target', target, '--profile', profile,
+                '--scale', str(options.scale),
+                '--duration', str(options.duration),
+                '--readers', str(options.readers),
+                '--writers', str(options.writers),
+                '--seed', str(options.seed),
+            ]
+            output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+            results = json.loads(output.strip().splitlines()[-1])
+            read, write = results['read'], results['write']
+            print(
+                f"{target:<11}{profile:<9}{read['throughput_rps']:>9.1f}{read['p50_ms']:>10.2f}{read['p99_ms']:>10.2f}"
+                f"{write['throughput_rps']:>10.1f}{write['p50_ms']:>11.2f}{write['p99_ms']:>11.2f}"
+                f"{read['errors'] + write['errors']:>8}",
+                flush=True,
+            )
+    print('(latencies in ms)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import hashlib
+import math
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from .hashers import HashingBusy
+
+
+# 비밀번호 해시를 계산하는 요청(로그인 / 회원가입 / 비밀번호 변경)의 POST 요청 수를 제한하는 데코레이터
+#   - IP별, 아이디별로 PERIOD(초) 동안 LIMIT 번까지 허용 (캐시에 구간별 횟수를 저장하는 고정 윈도우 방식)
+#     넘으면 해시를 계산하지 않고 바로 429 + Retry-After 로 응답
+#   - 해시 계산 풀이 가득 차면 (accounts/hashers.py 의 HashingBusy) 503 + Retry-After 로 응답
+# 한 IP나 한 아이디로 몰리는 요청이 해시 계산 풀을 다 써서 다른 요청을 굶기지 않게 함
+# (IP 는 REMOTE_ADDR 을 사용, 프록시 뒤에서 실행하면 프록시가 REMOTE_ADDR 을 실제 클라이언트 주소로 넘겨야 함)
+
+KEY = 'accounts:admission:{scope}:{kind}:{value}:{window}'
+
+
+def get_options():
+  return getattr(settings, 'ACCOUNTS_ADMISSION', {})
+
+
+def too_many_requests(retry_after, status=429):
+  response = HttpResponse('요청이 너무 많습니다. 잠시 후 다시 시도하세요.', status=status)
+  response['Retry-After'] = str(retry_after)
+  return response
+
+
+def get_username(request):
+  if request.user.is_authenticated:
+    return request.user.get_username()
+  return request.POST.get('username', '')
+
+
+def hit(scope, kind, value, limit, period):
+  # 이번 구간의 횟수를 1 늘리고, 제한을 넘었으면 다음 구간까지 남은 시간(초)을 돌려줌
+  now = time.time()
+  window = int(now // period)
+  # 캐시 키에 넣을 수 없는 문자(공백 등)가 있을 수 있으므로 해시로 바꿔서 사용
+  digest = hashlib.sha256(value.encode()).hexdigest()[:32]
+  key = KEY.format(scope=scope, kind=kind, value=digest, window=window)
+  cache.add(key, 0, timeout=period)
+  try:
+    count = cache.incr(key)
+  except ValueError:
+    return None
+  if count > limit:
+    return max(1, math.ceil((window + 1) * period - now))
+  return None
+
+
+def check_admission(request, scope):
+  limits = get_options().get('LIMITS', {}).get(scope, {})
+  candidates = [
+    ('ip', request.META.get('REMOTE_ADDR', ''), limits.get('PER_IP')),
+    ('username', get_username(request).lower(), limits.get('PER_USERNAME')),
+  ]
+  for kind, value, limit in candidates:
+    if not value or not limit:
+      continue
+    retry_after = hit(scope, kind, value, *limit)
+    if retry_after is not None:
+      return too_many_requests(retry_after)
+  return None
+
+
+def busy():
+  return too_many_requests(get_options().get('BUSY_RETRY_AFTER', 1), status=503)
+
+
+# @admission_control('login') : 동기 뷰, async 뷰 모두 사용 가능
+def admission_control(scope):
+  def decorator(view):
+    if iscoroutinefunction(view):
+      @wraps(view)
+      async def wrapper(request, *args, **kwargs):
+        if request.method == 'POST':
+          rejected = await sync_to_async(check_admission)(request, scope)
+          if rejected is not None:
+            return rejected
+        try:
+          return await view(request, *args, **kwargs)
+        except HashingBusy:
+          return busy()
+    else:
+      @wraps(view)
+      def wrapper(request, *args, **kwargs):
+        if request.method == 'POST':
+          rejected = check_admission(request, scope)
+          if rejected is not None:
+            return rejected
+        try:
+          return view(request, *args, **kwargs)
+        except HashingBusy:
+          return busy()
+    return wrapper
+  return decorator
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class AcoountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import post_delete, post_save
+
+        from . import checks  # noqa: F401 (설정 검사 등록)
+        from .user_cache import user_changed
+
+        # 사용자가 어디서 바뀌든 (뷰, 관리자 페이지, shell) 캐시에 보관한 사용자를 버림
+        User = get_user_model()
+        post_save.connect(user_changed, sender=User, dispatch_uid='accounts.user_cache.saved')
+        post_delete.connect(user_changed, sender=User, dispatch_uid='accounts.user_cache.deleted')
@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import login as auth_login
+from django.contrib.auth.forms import AuthenticationForm
+from django.db import connections
+from django.shortcuts import redirect, render
+
+from .admission import admission_control
+from .hashers import get_options as get_hashing_options
+from .forms import CustomUserCreationForm
+
+
+# 로그인 / 회원가입의 async 버전 (settings.ACCOUNTS_ASYNC_AUTH 가 켜져 있으면 accounts/urls.py 가 이 뷰를 사용)
+# ASGI 로 실행하면 동기 뷰는 요청마다 하나의 스레드(thread_sensitive)에서 실행되어 해시를 기다리는 동안 그 스레드가 묶이는데
+# async 뷰는 해시 계산을 기다리는 부분만 별도의 스레드(thread_sensitive=False)로 넘기고 이벤트 루프는 다른 요청을 처리함
+# (해시 계산 자체는 accounts/hashers.py 의 프로세스 풀에서 실행)
+# 해시를 기다리는 스레드는 전용 스레드 풀을 사용 (이벤트 루프의 기본 스레드 풀은 장고도 요청 처리에 사용하므로 같이 쓰면 다른 요청이 밀림)
+
+_executor = None
+
+
+def get_executor():
+  global _executor
+  if _executor is None:
+    options = get_hashing_options()
+    # 해시 계산 풀에 동시에 들어갈 수 있는 수만큼만 있으면 됨 (넘는 요청은 HashingBusy)
+    _executor = ThreadPoolExecutor(
+      max_workers=max(1, options.get('WORKERS', 2) + options.get('QUEUE_SIZE', 8)),
+      thread_name_prefix='hashing',
+    )
+  return _executor
+
+
+def close_connections_after(func):
+  # thread_sensitive=False 스레드는 요청이 끝나도 DB 연결이 정리되지 않으므로 직접 닫음
+  def wrapper(*args, **kwargs):
+    try:
+      return func(*args, **kwargs)
+    finally:
+      connections.close_all()
+  return wrapper
+
+
+def run_hashing(func, *args, **kwargs):
+  return sync_to_async(close_connections_after(func), thread_sensitive=False, executor=get_executor())(*args, **kwargs)
+
+
+def is_authenticated(request):
+  return request.user.is_authenticated
+
+
+@admission_control('login')
+async def login(request):
+  if await sync_to_async(is_authenticated)(request):
+    return redirect('articles:index')
+
+  if request.method == 'POST':
+    form = AuthenticationForm(request, request.POST)
+    # authenticate() 안에서 비밀번호를 확인 (해시 계산)
+    if await run_hashing(form.is_valid):
+      await sync_to_async(auth_login)(request, form.get_user())
+      return redirect('articles:index')
+  else:
+    form = AuthenticationForm()
+
+  context = {
+    'form' : form,
+  }
+  return await sync_to_async(render)(request, 'accounts/login.html', context)
+
+
+@admission_control('signup')
+async def signup(request):
+  if await sync_to_async(is_authenticated)(request):
+    return redirect('articles:index')
+
+  if request.method == 'POST':
+    form = CustomUserCreationForm(request.POST)
+    if await sync_to_async(form.is_valid)():
+      # commit=False : set_password (해시 계산)만 하고 저장은 아래에서
+      user = await run_hashing(form.save, commit=False)
+      await sync_to_async(save_and_login)(request, user)
+      return redirect('articles:index')
+  else:
+    form = CustomUserCreationForm()
+
+  context = {
+    'form' : form,
+  }
+  return await sync_to_async(render)(request, 'accounts/signup.html', context)
+
+
+def save_and_login(request, user):
+  user.save()
+  auth_login(request, user)
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.checks import Tags, Warning, register
+
+from . import user_cache
+
+
+# manage.py check / runserver / migrate 때 실행되는 설정 검사
+
+
+@register(Tags.caches)
+def check_user_cache(app_configs, **kwargs):
+  # 버전 키를 프로세스끼리 공유하지 못하면 다른 프로세스에서 바꾼 사용자 정보를 알 수 없으므로 사용자 캐시를 쓰지 않음
+  options = user_cache.get_options()
+  if options.get('ENABLED', True) and not user_cache.is_shared(user_cache.get_version_cache()):
+    alias = options.get('CACHE', 'shared')
+    return [Warning(
+      f"ACCOUNTS_USER_CACHE is enabled but CACHES['{alias}'] is not shared between processes, "
+      'so the user cache is not used.',
+      hint='Use a shared cache backend (redis, memcached, database or file based cache) '
+      "or set ACCOUNTS_USER_CACHE['ENABLED'] = False.",
+      id='accounts.W001',
+    )]
+  return []
+
+
+@register(Tags.caches)
+def check_session_cache(app_configs, **kwargs):
+  # 다른 프로세스에서 로그아웃한 세션이 이 프로세스의 캐시에 남지 않도록 세션 캐시도 공유해야 함
+  if settings.SESSION_ENGINE == 'accounts.session_store' and not user_cache.is_shared(caches[settings.SESSION_CACHE_ALIAS]):
+    return [Warning(
+      f"CACHES['{settings.SESSION_CACHE_ALIAS}'] (SESSION_CACHE_ALIAS) is not shared between processes, "
+      'so accounts.session_store reads every session from the database.',
+      hint='Use a shared cache backend (redis, memcached, database or file based cache) for SESSION_CACHE_ALIAS.',
+      id='accounts.W002',
+    )]
+  return []
@@ -0,0 +1,99 @@
+import base64
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.utils.encoding import force_bytes
+
+
+# 비밀번호 해시(PBKDF2) 계산을 요청 처리 스레드가 아니라 프로세스 풀에서 실행하는 hasher (settings.PASSWORD_HASHERS 의 첫번째)
+# PBKDF2 는 한번에 수백 ms 동안 CPU를 쓰므로 로그인 요청이 몰리면 모든 워커가 해시 계산에 묶이는데
+#   - 계산은 WORKERS 개의 프로세스에서만 실행 (동시에 쓰는 CPU 코어 수가 정해짐)
+#   - 작업 프로세스는 우선순위를 낮춰서(NICE) 실행하므로 CPU가 부족해도 다른 요청 처리가 먼저 실행됨
+#   - 실행 중 + 대기 중인 계산이 WORKERS + QUEUE_SIZE 개를 넘으면 기다리지 않고 HashingBusy 를 발생 (accounts/admission.py 가 503 으로 응답)
+# 알고리즘 이름(pbkdf2_sha256)과 결과는 장고의 PBKDF2PasswordHasher 와 같아서 기존 비밀번호도 그대로 확인됨
+# (같은 이름의 hasher 가 둘 있으면 뒤의 것이 사용되므로 PASSWORD_HASHERS 에 장고의 PBKDF2PasswordHasher 는 넣지 않음)
+
+
+class HashingBusy(Exception):
+  pass
+
+
+def get_options():
+  return getattr(settings, 'ACCOUNTS_HASHING', {})
+
+
+_lock = threading.Lock()
+_pool = None
+_slots = None
+
+
+def get_pool():
+  global _pool, _slots
+  with _lock:
+    if _pool is None:
+      options = get_options()
+      workers = options.get('WORKERS', 2)
+      # fork 는 스레드가 있는 프로세스에서 안전하지 않으므로 spawn 으로 새 프로세스를 시작
+      _pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=lower_priority,
+        initargs=(options.get('NICE', 10),),
+      )
+      _slots = threading.BoundedSemaphore(workers + options.get('QUEUE_SIZE', 8))
+    return _pool, _slots
+
+
+# 작업 프로세스가 시작할 때 실행 (spawn 으로 시작하므로 모듈 수준 함수여야 함)
+# os.nice 가 없는 플랫폼(Windows 등)에서는 우선순위를 바꾸지 않고 그대로 실행
+def lower_priority(nice):
+  if hasattr(os, 'nice'):
+    os.nice(nice)
+
+
+def reset_pool():
+  global _pool, _slots
+  with _lock:
+    if _pool is not None:
+      _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = _slots = None
+
+
+def submit(fn, *args):
+  pool, slots = get_pool()
+  if not slots.acquire(blocking=False):
+    raise HashingBusy
+  try:
+    future = pool.submit(fn, *args)
+  except BaseException:
+    slots.release()
+    raise
+  future.add_done_callback(lambda _: slots.release())
+  return future
+
+
+def run_in_pool(fn, *args):
+  if not get_options().get('WORKERS', 2):
+    return fn(*args)
+  try:
+    return submit(fn, *args).result()
+  except BrokenProcessPool:
+    # 작업 프로세스가 죽었으면 풀을 새로 만들고 이번 계산은 여기서 실행
+    reset_pool()
+    return fn(*args)
+
+
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+  def encode(self, password, salt, iterations=None):
+    self._check_encode_args(password, salt)
+    iterations = iterations or self.iterations
+    # hashlib.pbkdf2_hmac 은 pickle 할 수 있는 내장 함수라서 그대로 작업 프로세스에 넘김
+    hash = run_in_pool(hashlib.pbkdf2_hmac, self.digest().name, force_bytes(password), force_bytes(salt), iterations)
+    hash = base64.b64encode(hash).decode('ascii').strip()
+    return '%s$%d$%s$%s' % (self.algorithm, iterations, salt, hash)
@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import include, path
+
+from accounts import async_views, hashers
+
+PASSWORD = 'bench-password-1234!'
+
+
+# async 로그인 / 회원가입 뷰를 연결한 URLConf (ACCOUNTS_ASYNC_AUTH=1 과 같은 구성)
+class AsyncURLConf:
+  urlpatterns = [
+    path('accounts/', include(([
+      path('login/', async_views.login, name='login'),
+      path('signup/', async_views.signup, name='signup'),
+    ], 'accounts'))),
+    path('articles/', include('articles.urls')),
+  ]
+
+
+# (이름, 핸들러, ACCOUNTS_HASHING, 요청 제한 사용 여부)
+#   inline          : 요청 스레드에서 바로 해시 계산 (장고 기본과 같음)
+#   pool            : 해시 계산을 프로세스 풀에서 실행
+#   pool+admission  : + IP별 / 아이디별 요청 제한 (settings.ACCOUNTS_ADMISSION)
+#   async           : + async 로그인 뷰 (ASGI)
+SCENARIOS = [
+  ('inline', 'wsgi', {'WORKERS': 0}, False),
+  ('pool', 'wsgi', None, False),
+  ('pool+admission', 'wsgi', None, True),
+  ('async', 'asgi', None, True),
+]
+
+
+# 로그인 요청이 몰릴 때(login storm) 로그인 처리량과 상관없는 페이지(/articles/)의 지연시간을 비교
+#   python manage.py bench_logins --duration 10 --login-concurrency 16
+# 테스트 DB(임시)에 사용자를 만들고 --duration 초 동안
+#   - 로그인 스레드(코루틴) --login-concurrency 개가 계속 로그인 (맞는 비밀번호)
+#   - 페이지 스레드(코루틴) --page-concurrency 개가 계속 /articles/ 를 요청
+# 모든 요청은 같은 IP(127.0.0.1)에서 보내므로 요청 제한을 켜면 로그인 대부분이 429 로 바로 거절됨
+class Command(BaseCommand):
+  help = 'Measure login throughput and unrelated page tail latency during a login storm.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--login-concurrency', type=int, default=8)
+    parser.add_argument('--page-concurrency', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument(
+      '--scenario', action='append', choices=[name for name, _, _, _ in SCENARIOS],
+      help='Run only the given scenario (repeatable).',
+    )
+
+  def handle(self, **options):
+    # 요청마다 남는 측정 로그(project/instrumentation.py)는 출력하지 않음
+    logging.getLogger('instrumentation').setLevel(logging.ERROR)
+    self.random = random.Random(options['seed'])
+    selected = options['scenario'] or [name for name, _, _, _ in SCENARIOS]
+    old_name = connection.settings_dict['NAME']
+    workdir = tempfile.mkdtemp()
+    if connection.vendor == 'sqlite':
+      # 메모리 DB(shared cache)는 스레드끼리 테이블 잠금 오류가 나므로 임시 파일 DB를 사용
+      connection.settings_dict['TEST']['NAME'] = os.path.join(workdir, 'bench.sqlite3')
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+      self.usernames = self.seed(options['users'])
+      results = []
+      for name, handler, hashing, admission in SCENARIOS:
+        if name not in selected:
+          continue
+        overrides = {
+          'ALLOWED_HOSTS': ['testserver'],
+          'ACCOUNTS_HASHING': hashing or settings.ACCOUNTS_HASHING,
+          'ACCOUNTS_ADMISSION': settings.ACCOUNTS_ADMISSION if admission else {'LIMITS': {}},
+        }
+        if handler == 'asgi':
+          overrides['ROOT_URLCONF'] = AsyncURLConf
+        with override_settings(**overrides):
+          # 설정이 바뀌었으므로 해시 계산 풀과 요청 제한 횟수를 새로 시작
+          hashers.reset_pool()
+          cache.clear()
+          run = self.run_wsgi if handler == 'wsgi' else self.run_asgi
+          results.append((name, *run(options)))
+      hashers.reset_pool()
+      self.report(results, options['duration'])
+    finally:
+      connection.creation.destroy_test_db(old_name, verbosity=0)
+      shutil.rmtree(workdir, ignore_errors=True)
+
+  def seed(self, users):
+    # 사용자마다 해시를 계산하면 오래 걸리므로 같은 비밀번호 해시를 같이 사용
+    password = make_password(PASSWORD)
+    User = get_user_model()
+    User.objects.bulk_create([User(username=f'bench-{i:04d}', password=password) for i in range(users)])
+    return [f'bench-{i:04d}' for i in range(users)]
+
+  def login_data(self):
+    return {'username': self.random.choice(self.usernames), 'password': PASSWORD}
+
+  def run_wsgi(self, options):
+    logins = []
+    pages = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + options['duration']
+
+    def login_worker():
+      try:
+        while time.perf_counter() < deadline:
+          # 로그인하면 세션이 남으므로 매번 새 클라이언트 사용
+          client = Client(raise_request_exception=False)
+          with lock:
+            data = self.login_data()
+          started = time.perf_counter()
+          response = client.post('/accounts/login/', data)
+          with lock:
+            logins.append((response.status_code, time.perf_counter() - started))
+      finally:
+        connections.close_all()
+
+    def page_worker():
+      client = Client(raise_request_exception=False)
+      try:
+        while time.perf_counter() < deadline:
+          started = time.perf_counter()
+          client.get('/articles/')
+          with lock:
+            pages.append(time.perf_counter() - started)
+      finally:
+        connections.close_all()
+
+    threads = [threading.Thread(target=login_worker) for _ in range(options['login_concurrency'])]
+    threads += [threading.Thread(target=page_worker) for _ in range(options['page_concurrency'])]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    return logins, pages
+
+  def run_asgi(self, options):
+    return async_to_sync(self.arun_asgi)(options)
+
+  async def arun_asgi(self, options):
+    logins = []
+    pages = []
+    deadline = time.perf_counter() + options['duration']
+
+    async def login_worker():
+      while time.perf_counter() < deadline:
+        client = AsyncClient(raise_request_exception=False)
+        started = time.perf_counter()
+        response = await client.post('/accounts/login/', self.login_data())
+        logins.append((response.status_code, time.perf_counter() - started))
+
+    async def page_worker():
+      client = AsyncClient(raise_request_exception=False)
+      while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.get('/articles/')
+        pages.append(time.perf_counter() - started)
+
+    await asyncio.gather(
+      *(login_worker() for _ in range(options['login_concurrency'])),
+      *(page_worker() for _ in range(options['page_concurrency'])),
+    )
+    return logins, pages
+
+  def report(self, results, duration):
+    self.stdout.write(
+      f"{'scenario':<16} {'logins/s':>9} {'429':>6} {'503':>6} {'login p99':>10} "
+      f"{'pages/s':>9} {'page p50':>9} {'page p99':>9}"
+    )
+    for name, logins, pages in results:
+      succeeded = sum(1 for status, _ in logins if status == 302)
+      self.stdout.write(
+        f'{name:<16} {succeeded / duration:>9.1f} '
+        f'{sum(1 for status, _ in logins if status == 429):>6} {sum(1 for status, _ in logins if status == 503):>6} '
+        f'{percentile([elapsed for _, elapsed in logins], 99) * 1000:>10.1f} '
+        f'{len(pages) / duration:>9.1f} {percentile(pages, 50) * 1000:>9.2f} {percentile(pages, 99) * 1000:>9.2f}'
+      )
+    self.stdout.write('(latencies in ms)')
+
+
+def percentile(values, pct):
+  if not values:
+    return 0.0
+  values = sorted(values)
+  return values[min(len(values) - 1, int(len(values) * pct / 100))]
@@ -0,0 +1,77 @@
+import logging
+import tempfile
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+# (이름, SESSION_ENGINE)
+ENGINES = [
+  ('db', 'django.contrib.sessions.backends.db'),
+  ('cached_db', 'django.contrib.sessions.backends.cached_db'),
+  ('accounts', 'accounts.session_store'),
+]
+
+
+# 세션 엔진별로 로그인한 사용자의 페이지 요청 1번에 django_session 테이블 쿼리가 몇번 실행되는지 비교
+#   python manage.py bench_sessions --requests 500
+# 테스트 DB(임시)에 사용자를 만들고 로그인한 뒤 같은 페이지들을 반복해서 요청
+# SESSION_SAVE_EVERY_REQUEST 를 켠 경우 / 끈 경우를 모두 측정
+# 캐시는 settings 와 같은 파일 캐시를 쓰되 실제 캐시 디렉터리를 건드리지 않도록 임시 디렉터리 사용
+class Command(BaseCommand):
+  help = 'Count django_session queries per authenticated page view for each session engine.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--path', action='append', help='Page to request (repeatable, default: /accounts/ and /articles/).')
+
+  def handle(self, **options):
+    paths = options['path'] or ['/accounts/', '/articles/']
+    # 요청마다 남는 측정 로그(project/instrumentation.py)는 출력하지 않음
+    logging.getLogger('instrumentation').setLevel(logging.WARNING)
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    directory = tempfile.TemporaryDirectory()
+    file_cache = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory.name}
+    shared_cache = override_settings(CACHES={'default': file_cache, 'shared': file_cache})
+    shared_cache.enable()
+    try:
+      user = get_user_model().objects.create_user('bench', password='bench-password')
+      self.stdout.write(f'{"engine":<12}{"save every":>12}{"reads/view":>12}{"writes/view":>13}{"queries/view":>14}{"ms/view":>10}')
+      for save_every_request in (False, True):
+        for name, engine in ENGINES:
+          with override_settings(SESSION_ENGINE=engine, SESSION_SAVE_EVERY_REQUEST=save_every_request, ALLOWED_HOSTS=['testserver']):
+            reads, writes, queries, elapsed = self.run(user, paths, options['requests'])
+          views = options['requests']
+          self.stdout.write(
+            f'{name:<12}{str(save_every_request):>12}{reads / views:>12.3f}{writes / views:>13.3f}'
+            f'{queries / views:>14.2f}{elapsed / views * 1000:>10.3f}'
+          )
+    finally:
+      shared_cache.disable()
+      directory.cleanup()
+      connection.creation.destroy_test_db(old_name, verbosity=0)
+
+  def run(self, user, paths, requests):
+    cache.clear()
+    client = Client()
+    client.force_login(user)
+    counts = {'reads': 0, 'writes': 0, 'queries': 0}
+
+    def count(execute, sql, params, many, context):
+      counts['queries'] += 1
+      if 'django_session' in sql:
+        counts['reads' if sql.lstrip().upper().startswith('SELECT') else 'writes'] += 1
+      return execute(sql, params, many, context)
+
+    # 로그인 직후 첫 요청(캐시 채우기)은 빼고 측정
+    client.get(paths[0])
+    started = time.perf_counter()
+    with connection.execute_wrapper(count):
+      for i in range(requests):
+        client.get(paths[i % len(paths)])
+    return counts['reads'], counts['writes'], counts['queries'], time.perf_counter() - started
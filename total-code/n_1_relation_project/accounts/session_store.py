@@ -0,0 +1,107 @@
+from django.conf import settings
+from django.contrib.sessions.backends.base import UpdateError
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.cache.backends.dummy import DummyCache
+from django.utils import timezone
+
+from .user_cache import is_shared
+
+
+# 캐시 + DB 세션 엔진 (settings.SESSION_ENGINE = 'accounts.session_store')
+# 장고의 cached_db 엔진처럼 세션을 캐시에서 읽고 DB(django_session)에도 저장하는데, DB 쓰기를 줄이도록
+#   - 세션을 읽을 때의 내용을 기억해두고 저장할 때 내용이 같으면 DB에 쓰지 않음
+#   - 내용은 그대로이고 만료 시간만 늘어나는 경우 (SESSION_SAVE_EVERY_REQUEST = True 로 sliding expiry 를 켰을 때)
+#     저장된 만료 시간보다 EXPIRY_BUMP_INTERVAL 이상 늘어날 때만 expire_date 컬럼 하나만 UPDATE
+#     (그 사이의 요청은 만료 시간을 늘리지 않으므로 실제 만료는 최대 EXPIRY_BUMP_INTERVAL 만큼 빨라질 수 있음)
+#   - clearsessions 는 만료된 세션을 CLEAR_EXPIRED_BATCH_SIZE 개씩 나눠서 지움 (한번의 큰 DELETE로 테이블을 오래 잠그지 않게)
+# 캐시에는 (세션 데이터, DB에 저장된 만료 시간) 을 저장 (cached_db 와 형식이 달라서 키 앞부분도 다르게 사용)
+# 캐시(SESSION_CACHE_ALIAS)는 redis / memcached 처럼 프로세스끼리 공유하는 캐시여야 함
+#   locmem / dummy 면 다른 프로세스에서 로그아웃해도 이 프로세스의 캐시에 세션이 남으므로 캐시를 쓰지 않고 DB에서만 읽음
+#   (manage.py check 의 accounts.W002 경고)
+
+# 캐시를 쓰지 않을 때 사용 (get 은 항상 None, set / delete 는 아무것도 안 함)
+NO_CACHE = DummyCache('accounts.session_store', {})
+
+
+def get_options():
+  return getattr(settings, 'ACCOUNTS_SESSIONS', {})
+
+
+class SessionStore(CachedDBStore):
+  cache_key_prefix = 'accounts.session_store'
+
+  def __init__(self, session_key=None):
+    super().__init__(session_key)
+    if not is_shared(self._cache):
+      self._cache = NO_CACHE
+    # 읽어온 세션 내용(직렬화한 값)과 DB의 만료 시간 (새 세션이면 None)
+    self._loaded_data = None
+    self._stored_expiry = None
+
+  def snapshot(self, data):
+    return self.serializer().dumps(data)
+
+  def load(self):
+    try:
+      cached = self._cache.get(self.cache_key)
+    except Exception:
+      # 캐시 키가 올바르지 않으면 (memcached 등) 세션을 새로 시작 (cached_db 와 같음)
+      cached = None
+
+    if cached is None:
+      s = self._get_session_from_db()
+      if s is None:
+        return {}
+      data, expiry = self.decode(s.session_data), s.expire_date
+      self.cache_session(data, expiry)
+    else:
+      data, expiry = cached
+    self._loaded_data = self.snapshot(data)
+    self._stored_expiry = expiry
+    return data
+
+  def cache_session(self, data, expiry):
+    self._cache.set(self.cache_key, (data, expiry), self.get_expiry_age(expiry=expiry))
+
+  def save(self, must_create=False):
+    if self.session_key is None:
+      return self.create()
+    if must_create or self._loaded_data is None:
+      return self.save_session(must_create)
+
+    data = self._get_session()
+    if self.snapshot(data) != self._loaded_data:
+      return self.save_session(must_create)
+
+    # 내용이 같으면 만료 시간만 확인
+    expiry = self.get_expiry_date()
+    interval = get_options().get('EXPIRY_BUMP_INTERVAL', 60 * 60)
+    if (expiry - self._stored_expiry).total_seconds() < interval:
+      return
+    updated = self.model.objects.filter(session_key=self.session_key).update(expire_date=expiry)
+    if not updated:
+      # 그 사이 다른 요청에서 세션이 삭제됨 (로그아웃 등)
+      raise UpdateError
+    self._stored_expiry = expiry
+    self.cache_session(data, expiry)
+
+  def save_session(self, must_create):
+    # cached_db.save 와 같지만 캐시에 만료 시간을 같이 저장
+    DBStore.save(self, must_create)
+    data = self._get_session(no_load=True)
+    expiry = self.get_expiry_date()
+    self._loaded_data = self.snapshot(data)
+    self._stored_expiry = expiry
+    self.cache_session(data, expiry)
+
+  @classmethod
+  def clear_expired(cls):
+    batch_size = get_options().get('CLEAR_EXPIRED_BATCH_SIZE', 1000)
+    model = cls.get_model_class()
+    now = timezone.now()
+    while True:
+      keys = list(model.objects.filter(expire_date__lt=now).values_list('session_key', flat=True)[:batch_size])
+      if not keys:
+        return
+      model.objects.filter(session_key__in=keys).delete()
@@ -1,3 +1,232 @@
-from django.test import TestCase
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.contrib.sessions.models import Session
+from django.core.cache import cache, caches
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import include, path
+from django.utils import timezone
+
+from . import async_views, checks
+from .hashers import HashingBusy, PooledPBKDF2PasswordHasher, lower_priority
+from .session_store import SessionStore
+from .user_cache import user_cache
 
 # Create your tests here.
+class SharedCacheMixin:
+  # settings 와 같은 구성 (default 는 locmem, shared 는 테스트마다 빈 파일 캐시, 'local' 은 공유하지 않는 캐시 확인용)
+  def setUp(self):
+    directory = tempfile.TemporaryDirectory()
+    self.addCleanup(directory.cleanup)
+    shared = self.settings(CACHES={
+      'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+      'shared': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory.name},
+      'local': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'local'},
+    })
+    shared.enable()
+    self.addCleanup(shared.disable)
+
+
+class SessionStoreTest(SharedCacheMixin, TestCase):
+  def setUp(self):
+    super().setUp()
+    cache.clear()
+    user_cache.clear()
+    self.user = get_user_model().objects.create_user('user', password='old-password')
+    self.client.force_login(self.user)
+
+  def session_queries(self, queries):
+    return [query['sql'] for query in queries.captured_queries if 'django_session' in query['sql']]
+
+  def test_page_views_do_not_touch_session_table(self):
+    with self.assertNumQueries(1) as queries:
+      # 사용자 조회 1번, 세션은 캐시에서 읽고 바뀐게 없으니 저장하지 않음
+      self.client.get('/accounts/')
+    self.assertEqual(self.session_queries(queries), [])
+
+  def test_expiry_is_fixed_by_default(self):
+    expiry = Session.objects.get().expire_date
+    Session.objects.update(expire_date=expiry - timedelta(days=1))
+    caches['shared'].clear()
+    self.client.get('/accounts/')
+    # sliding expiry(SESSION_SAVE_EVERY_REQUEST)를 켜지 않으면 요청해도 만료 시간이 늘어나지 않음
+    self.assertEqual(Session.objects.get().expire_date, expiry - timedelta(days=1))
+
+  @override_settings(SESSION_SAVE_EVERY_REQUEST=True)
+  def test_expiry_bump_is_coalesced(self):
+    session = Session.objects.get()
+    # 저장된 만료 시간이 EXPIRY_BUMP_INTERVAL 보다 오래되면 expire_date 만 UPDATE
+    Session.objects.filter(pk=session.pk).update(expire_date=timezone.now() + timedelta(days=1))
+    caches['shared'].clear()
+    with self.assertNumQueries(3) as queries:
+      self.client.get('/accounts/')
+    statements = self.session_queries(queries)
+    self.assertTrue(statements[1].startswith('UPDATE'))
+    self.assertNotIn('session_data', statements[1])
+    self.assertGreater(Session.objects.get().expire_date, timezone.now() + timedelta(days=13))
+
+  def test_password_change_and_logout(self):
+    response = self.client.post('/accounts/password/', {
+      'old_password': 'old-password', 'new_password1': 'new-pass-1234!', 'new_password2': 'new-pass-1234!',
+    })
+    self.assertRedirects(response, '/accounts/', fetch_redirect_response=False)
+    # update_session_auth_hash 로 바뀐 세션이 저장되어 로그인이 유지됨
+    self.assertTrue(self.client.get('/accounts/').wsgi_request.user.is_authenticated)
+    self.client.get('/accounts/logout/')
+    self.assertFalse(Session.objects.exists())
+    self.assertFalse(self.client.get('/accounts/').wsgi_request.user.is_authenticated)
+
+  @override_settings(SESSION_CACHE_ALIAS='local')
+  def test_process_local_cache_is_not_used(self):
+    self.assertEqual([error.id for error in checks.check_session_cache(None)], ['accounts.W002'])
+    self.client.get('/accounts/')
+    # 다른 프로세스에서 로그아웃한 세션이 남지 않도록 세션은 매번 DB에서 읽음
+    # (사용자는 default 캐시의 사용자 캐시에서 가져옴)
+    with self.assertNumQueries(1) as queries:
+      self.client.get('/accounts/')
+    self.assertEqual(len(self.session_queries(queries)), 1)
+
+  def test_clear_expired_in_batches(self):
+    past = timezone.now() - timedelta(days=1)
+    for i in range(5):
+      Session.objects.create(session_key=f'expired{i:032d}', session_data='', expire_date=past)
+    with self.settings(ACCOUNTS_SESSIONS={'CLEAR_EXPIRED_BATCH_SIZE': 2}):
+      SessionStore.clear_expired()
+    self.assertEqual(Session.objects.count(), 1)
+
+
+class UserCacheTest(SharedCacheMixin, TestCase):
+  def setUp(self):
+    super().setUp()
+    cache.clear()
+    user_cache.clear()
+    self.user = get_user_model().objects.create_user('user', password='old-password')
+    self.client.force_login(self.user)
+
+  def test_user_is_loaded_once(self):
+    self.client.get('/accounts/')
+    with self.assertNumQueries(0):
+      response = self.client.get('/accounts/')
+    self.assertEqual(response.wsgi_request.user.username, 'user')
+
+  def test_user_edit_invalidates(self):
+    self.client.get('/accounts/')
+    with self.captureOnCommitCallbacks(execute=True):
+      self.client.post('/accounts/userEdit/', {'first_name': 'renamed', 'last_name': '', 'email': ''})
+    self.assertEqual(self.client.get('/accounts/').wsgi_request.user.first_name, 'renamed')
+
+  def test_password_changed_elsewhere_is_not_honored(self):
+    self.client.get('/accounts/')
+    other = self.client_class()
+    other.force_login(self.user)
+    # 다른 세션에서 비밀번호를 바꾸면 이 세션의 auth hash 는 더이상 맞지 않음
+    with self.captureOnCommitCallbacks(execute=True):
+      other.post('/accounts/password/', {
+        'old_password': 'old-password', 'new_password1': 'new-pass-1234!', 'new_password2': 'new-pass-1234!',
+      })
+    self.assertFalse(self.client.get('/accounts/').wsgi_request.user.is_authenticated)
+    self.assertTrue(other.get('/accounts/').wsgi_request.user.is_authenticated)
+
+  def test_signout_invalidates(self):
+    self.client.get('/accounts/')
+    with self.captureOnCommitCallbacks(execute=True):
+      self.client.get('/accounts/signout/')
+    self.assertFalse(self.client.get('/accounts/').wsgi_request.user.is_authenticated)
+
+  def test_changes_outside_views_invalidate(self):
+    # 관리자 페이지 / shell 에서 바꾼 것도 post_save / post_delete 로 반영
+    self.client.get('/accounts/')
+    with self.captureOnCommitCallbacks(execute=True):
+      self.user.is_active = False
+      self.user.save()
+    self.assertFalse(self.client.get('/accounts/').wsgi_request.user.is_authenticated)
+
+    other = get_user_model().objects.create_user('other', password='password')
+    self.client.force_login(other)
+    self.client.get('/accounts/')
+    with self.captureOnCommitCallbacks(execute=True):
+      other.delete()
+    self.assertFalse(self.client.get('/accounts/').wsgi_request.user.is_authenticated)
+
+  def test_process_local_cache_is_not_used(self):
+    with self.settings(ACCOUNTS_USER_CACHE={'CACHE': 'local'}):
+      self.assertEqual([error.id for error in checks.check_user_cache(None)], ['accounts.W001'])
+      self.client.get('/accounts/')
+      # 프로세스끼리 공유하지 않는 캐시면 장고 기본처럼 요청마다 사용자를 조회
+      with self.assertNumQueries(1):
+        self.client.get('/accounts/')
+    self.assertIsNone(caches['local'].get(f'accounts:user:{self.user.pk}:version'))
+    self.assertEqual(checks.check_user_cache(None), [])
+
+
+class HashingTest(TestCase):
+  def setUp(self):
+    cache.clear()
+
+  def test_pooled_hasher_matches_django(self):
+    hasher = PooledPBKDF2PasswordHasher()
+    self.assertEqual(hasher.encode('password', 'salt', 1000), PBKDF2PasswordHasher().encode('password', 'salt', 1000))
+    self.assertTrue(hasher.verify('password', hasher.encode('password', 'salt')))
+
+  def test_lower_priority_without_os_nice(self):
+    # os.nice 가 없는 플랫폼에서도 작업 프로세스가 시작됨
+    with mock.patch('accounts.hashers.os', spec=[]):
+      lower_priority(10)
+    with mock.patch('accounts.hashers.os.nice') as nice:
+      lower_priority(10)
+    nice.assert_called_once_with(10)
+
+  def test_busy_pool_returns_503(self):
+    with mock.patch('accounts.hashers.submit', side_effect=HashingBusy):
+      response = self.client.post('/accounts/login/', {'username': 'user', 'password': 'password'})
+    self.assertEqual(response.status_code, 503)
+    self.assertEqual(response['Retry-After'], '1')
+
+  @override_settings(ACCOUNTS_ADMISSION={'LIMITS': {'login': {'PER_IP': (100, 60), 'PER_USERNAME': (2, 60)}}})
+  def test_login_attempts_are_limited_per_username(self):
+    for _ in range(2):
+      response = self.client.post('/accounts/login/', {'username': 'user', 'password': 'wrong'})
+      self.assertEqual(response.status_code, 200)
+    # 같은 아이디는 제한, 다른 아이디는 그대로 처리
+    with mock.patch('accounts.hashers.run_in_pool') as run_in_pool:
+      response = self.client.post('/accounts/login/', {'username': 'USER', 'password': 'wrong'})
+    self.assertEqual(response.status_code, 429)
+    self.assertIn('Retry-After', response)
+    run_in_pool.assert_not_called()
+    self.assertEqual(self.client.post('/accounts/login/', {'username': 'other', 'password': 'wrong'}).status_code, 200)
+
+
+# async 로그인 / 회원가입 뷰만 연결한 URLConf
+class AsyncAuthURLConf:
+  urlpatterns = [
+    path('accounts/', include(([
+      path('login/', async_views.login, name='login'),
+      path('signup/', async_views.signup, name='signup'),
+    ], 'accounts'))),
+    path('articles/', include('articles.urls')),
+  ]
+
+
+# async 뷰는 해시 계산을 다른 스레드에서 실행하므로 (그 스레드의 DB 연결에서 보이도록) 테스트 데이터를 커밋
+@override_settings(ROOT_URLCONF=AsyncAuthURLConf)
+class AsyncAuthTest(TransactionTestCase):
+  def setUp(self):
+    cache.clear()
+    user_cache.clear()
+
+  async def test_signup_and_login(self):
+    response = await self.async_client.post('/accounts/signup/', {
+      'username': 'async-user', 'password1': 'pass-word-1234!', 'password2': 'pass-word-1234!',
+    })
+    self.assertEqual(response.status_code, 302)
+    user = await get_user_model().objects.aget(username='async-user')
+    self.assertTrue(user.password.startswith('pbkdf2_sha256$'))
+
+    client = self.async_client_class()
+    response = await client.post('/accounts/login/', {'username': 'async-user', 'password': 'wrong'})
+    self.assertEqual(response.status_code, 200)
+    response = await client.post('/accounts/login/', {'username': 'async-user', 'password': 'pass-word-1234!'})
+    self.assertEqual(response.status_code, 302)
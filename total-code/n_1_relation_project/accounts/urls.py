@@ -1,7 +1,9 @@
+from django.conf import settings
 from django.urls import path
 
 # views.py에서 함수들 가져옴 
 from . import views # 이 파일과 같은 디렉토리에 있는 views.py를 가져온다는거
+from . import async_views
 
 # 이 앱의 이름 공간 지정 ( url 이름 충돌 방지용 )
   # 활용
@@ -18,7 +20,7 @@ urlpatterns = [
     path('', views.index, name='index'),
 
     # 회원가입 url 
-    path('signup/', views.signup, name='signup'),
+    path('signup/', async_views.signup if getattr(settings, 'ACCOUNTS_ASYNC_AUTH', False) else views.signup, name='signup'),
     # 회원탈퇴 
     path('signout/', views.signout, name='signout'),
     # 회원정보 수정 
@@ -26,8 +28,8 @@ urlpatterns = [
     # 비밀번호 수정 
     path('password/', views.change_password, name='change_password'),
 
-    # 로그인 
-    path('login/', views.login, name='login'),
+    # 로그인 (ACCOUNTS_ASYNC_AUTH 가 켜져 있으면 async 뷰 사용)
+    path('login/', async_views.login if getattr(settings, 'ACCOUNTS_ASYNC_AUTH', False) else views.login, name='login'),
     # 로그아웃 
     path('logout/', views.logout, name='logout'),
 ]
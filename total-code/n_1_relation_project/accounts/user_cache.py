@@ -0,0 +1,150 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils.functional import SimpleLazyObject
+
+
+# 로그인한 사용자(request.user)를 프로세스 메모리에 잠깐 보관해서 요청마다 auth_user 를 조회하지 않게 하는 모듈
+#   - 키 : (user id, 인증 backend, 세션에 저장된 auth hash)
+#     비밀번호가 바뀌면 세션의 auth hash 도 바뀌므로 예전 키의 사용자는 다시 쓰이지 않음
+#   - TTL(초)이 지나면 DB에서 다시 읽음
+#   - 사용자가 저장 / 삭제되면 (post_save / post_delete 시그널, apps.py 에서 연결) 커밋 후에
+#     캐시(settings.CACHES)에 있는 사용자별 버전을 올려서 다른 프로세스의 메모리에 있는 사용자도 버리게 함
+#     (뷰, 관리자 페이지, shell 어디서 바꾸든 반영됨, 요청마다 버전을 확인하는 캐시 조회 1번은 남음)
+#     queryset.update() 처럼 시그널 없이 바꾸면 TTL 동안 늦게 반영될 수 있음
+#   - 버전을 저장하는 캐시가 프로세스끼리 공유되지 않으면 (locmem / dummy) 다른 프로세스의 변경을 알 수 없으므로
+#     사용하지 않고 장고 기본처럼 요청마다 조회함 (manage.py check 의 accounts.W001 경고)
+
+VERSION_KEY = 'accounts:user:{}:version'
+
+# 프로세스 메모리에만 저장하는 (다른 프로세스와 공유하지 않는) 캐시 backend
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def get_options():
+  return getattr(settings, 'ACCOUNTS_USER_CACHE', {})
+
+
+def get_version_cache():
+  return caches[get_options().get('CACHE', 'shared')]
+
+
+def is_shared(cache):
+  return not isinstance(cache, PROCESS_LOCAL_CACHES)
+
+
+def is_enabled():
+  return get_options().get('ENABLED', True) and is_shared(get_version_cache())
+
+
+class UserCache:
+  def __init__(self):
+    self.lock = threading.Lock()
+    # key -> (user, 버전, 만료 시각)
+    self.entries = OrderedDict()
+
+  def get(self, key, version):
+    with self.lock:
+      entry = self.entries.get(key)
+      if entry is None:
+        return None
+      user, cached_version, expires = entry
+      if cached_version != version or expires < time.monotonic():
+        del self.entries[key]
+        return None
+      self.entries.move_to_end(key)
+      return user
+
+  def set(self, key, user, version):
+    options = get_options()
+    with self.lock:
+      self.entries[key] = (user, version, time.monotonic() + options.get('TTL', 60))
+      self.entries.move_to_end(key)
+      # 오래 안 쓰인 것부터 버림
+      while len(self.entries) > options.get('MAX_ENTRIES', 1000):
+        self.entries.popitem(last=False)
+
+  def discard(self, user_id):
+    with self.lock:
+      for key in [key for key in self.entries if key[0] == user_id]:
+        del self.entries[key]
+
+  def clear(self):
+    with self.lock:
+      self.entries.clear()
+
+
+user_cache = UserCache()
+
+
+def get_user_version(user_id):
+  cache = get_version_cache()
+  key = VERSION_KEY.format(user_id)
+  version = cache.get(key)
+  if version is None:
+    # 버전 키가 캐시에서 밀려났을 때 0부터 다시 시작하면 예전 버전으로 보관한 사용자를 다시 쓸 수 있으므로 현재 시간(ms)으로 시작
+    cache.add(key, int(time.time() * 1000), timeout=None)
+    version = cache.get(key)
+  return version
+
+
+def user_changed(sender, instance, **kwargs):
+  invalidate_user(instance.pk)
+
+
+def invalidate_user(user_id):
+  # 트랜잭션이 커밋된 뒤에 버림 (커밋 전에 버리면 다른 요청이 바뀌기 전의 사용자를 다시 넣을 수 있음)
+  transaction.on_commit(lambda: bump_user_version(user_id))
+
+
+def bump_user_version(user_id):
+  user_cache.discard(str(user_id))
+  try:
+    get_version_cache().incr(VERSION_KEY.format(user_id))
+  except ValueError:
+    get_user_version(user_id)
+
+
+def get_user(request):
+  session = request.session
+  user_id = session.get(SESSION_KEY)
+  backend_path = session.get(BACKEND_SESSION_KEY)
+  if user_id is None or backend_path not in settings.AUTHENTICATION_BACKENDS or not is_enabled():
+    return auth.get_user(request)
+
+  user_id = str(user_id)
+  version = get_user_version(user_id)
+  key = (user_id, backend_path, session.get(HASH_SESSION_KEY))
+  user = user_cache.get(key, version)
+  if user is None:
+    # 세션 검증(auth hash 비교)까지 장고의 get_user 로 한 다음 통과한 사용자만 보관
+    user = auth.get_user(request)
+    if not user.is_authenticated:
+      return user
+    key = (user_id, backend_path, session.get(HASH_SESSION_KEY))
+    user_cache.set(key, user, version)
+  # 뷰에서 request.user 를 수정해도 (ModelForm instance 등) 보관한 객체는 바뀌지 않게 복사해서 사용
+  return copy.copy(user)
+
+
+# settings.MIDDLEWARE 의 AuthenticationMiddleware 대신 사용
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+  def process_request(self, request):
+    super().process_request(request)
+    request.user = SimpleLazyObject(lambda: get_cached_user(request))
+
+
+def get_cached_user(request):
+  if not hasattr(request, '_cached_user'):
+    request._cached_user = get_user(request)
+  return request._cached_user
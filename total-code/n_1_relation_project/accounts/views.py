@@ -15,6 +15,8 @@ from django.contrib.auth.decorators import login_required
 
 # 회원가입 커스텀 폼 
 from .forms import CustomUserCreationForm, CustomUserChangeForm
+# 비밀번호 해시를 계산하는 POST 요청의 IP별 / 아이디별 제한 (로그인 폭주로 워커가 모두 해시 계산에 묶이지 않게)
+from .admission import admission_control
 
 ## 로그인
 from django.contrib.auth.forms import AuthenticationForm # 로그인 폼 (장고 기본 제공)
@@ -70,6 +72,7 @@ def index(request):
 #   return render(request, 'articles/signup.html', context)
 
 ## 회원가입 : 커스텀모델을 사용하여 뷰함수 생성하기 
+@admission_control('signup')
 def signup(request):
   # 이미 들어온 사용자면 로그인/회원가입 로직을 수행할 수 없게하기기
   # is_authenticated
@@ -126,6 +129,7 @@ def userEdit(request):
 
 ## 비밀번호 수정
 @login_required
+@admission_control('change_password')
 def change_password(request):
   if request.method == 'POST':
     form = PasswordChangeForm(request.user, request.POST)
@@ -147,6 +151,7 @@ def change_password(request):
 
 #  로그인 로그아웃  #################-------------------------------로그인 로그아웃
 
+@admission_control('login')
 def login(request):
   # 이미 들어온 사용자면 로그인/회원가입 로직을 수행할 수 없게하기기
   if request.user.is_authenticated:
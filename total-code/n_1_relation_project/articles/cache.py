@@ -0,0 +1,55 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+
+# articles:index 템플릿의 게시글 목록 부분을 {% cache %} 태그로 저장해두는데
+# 캐시 키에 목록 버전 번호를 넣어두고, 게시글이 생성/수정/삭제되면 버전만 올려서 이전 목록을 한번에 무효화함
+#   articles:index:version -> 현재 버전 (템플릿의 {% cache %} 키에 들어감)
+# 렌더링한 목록은 default(프로세스마다 따로 있는 locmem) 캐시에 두지만 버전은 ARTICLES_INDEX['CACHE'] 에 둠
+#   버전은 모든 프로세스가 같은 값을 봐야 다른 프로세스에서 올린 버전으로 예전 목록을 버릴 수 있으므로
+#   프로세스끼리 공유하는 캐시여야 함 (locmem / dummy 면 manage.py check 가 articles.W001 경고)
+
+VERSION_KEY = 'articles:index:version'
+
+
+def get_options():
+  return getattr(settings, 'ARTICLES_INDEX', {})
+
+
+# 프로세스 메모리에만 저장하는 (다른 프로세스와 공유하지 않는) 캐시 backend
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def get_version_cache():
+  return caches[get_options().get('CACHE', 'shared')]
+
+
+def is_shared(cache):
+  return not isinstance(cache, PROCESS_LOCAL_CACHES)
+
+
+def get_index_version():
+  cache = get_version_cache()
+  version = cache.get(VERSION_KEY)
+  if version is None:
+    # 버전 키가 캐시에서 밀려났을 때 1부터 다시 시작하면 예전 목록을 다시 읽을 수 있으므로 현재 시간(ms)으로 시작
+    cache.add(VERSION_KEY, int(time.time() * 1000), timeout=None)
+    version = cache.get(VERSION_KEY)
+  return version
+
+
+def invalidate_index():
+  # 트랜잭션이 커밋된 뒤에 버전을 올림 (커밋 전에 올리면 다른 요청이 예전 목록을 다시 캐시할 수 있음)
+  transaction.on_commit(bump_index_version)
+
+
+def bump_index_version():
+  try:
+    get_version_cache().incr(VERSION_KEY)
+  except ValueError:
+    get_index_version()
@@ -0,0 +1,20 @@
+from django.core.checks import Tags, Warning, register
+
+from . import cache
+
+
+# manage.py check / runserver / migrate 때 실행되는 설정 검사
+
+
+@register(Tags.caches)
+def check_index_cache(app_configs, **kwargs):
+  # 목록 버전을 프로세스끼리 공유하지 못하면 게시글을 바꿔도 다른 프로세스는 CACHE_TIMEOUT 동안 예전 목록을 보여줌
+  if not cache.is_shared(cache.get_version_cache()):
+    alias = cache.get_options().get('CACHE', 'shared')
+    return [Warning(
+      f"ARTICLES_INDEX['CACHE'] (CACHES['{alias}']) is not shared between processes, "
+      'so other processes keep serving the old article list after a change.',
+      hint='Use a shared cache backend (redis, memcached, database or file based cache) for the index version.',
+      id='articles.W001',
+    )]
+  return []
@@ -12,3 +12,15 @@ class ArticleForm(forms.ModelForm):
             # exclude 속성을 통해 모델에서 포함하지 않을 필드를 지정할 수 있음
             # 장고에서 모델폼에 대한 추가정보나 속성을 작성하는 클래스 구조를 Meta클래스로 작성했을 뿐, 파이선의 이너클래스같은 문법적인 관점으로 접근하지 말것
         fields = '__all__'
+
+
+    # 업로드 핸들러(articles/uploads.py)가 크기 / 형식 제한으로 거절한 파일의 에러 메시지
+    def __init__(self, *args, upload_errors=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_errors = upload_errors or {}
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for field, message in self.upload_errors.items():
+            self.add_error(field if field in self.fields else None, message)
+        return cleaned_data
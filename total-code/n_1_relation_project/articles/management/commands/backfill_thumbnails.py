@@ -0,0 +1,40 @@
+from django.core.files.images import get_image_dimensions
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from articles.models import Article
+from articles.thumbnails import generate_thumbnails
+
+
+# 이미지 크기(image_width / image_height)와 썸네일이 없는 예전 게시글을 채우는 명령어
+#   python manage.py backfill_thumbnails
+#   python manage.py backfill_thumbnails --force  (썸네일 설정을 바꾼 뒤 전부 다시 만들 때)
+# 요청과 상관없이 이 프로세스에서 하나씩 만듦 (작업 스레드 풀을 사용하지 않음)
+class Command(BaseCommand):
+  help = 'Fill image dimensions and generate thumbnails for articles created before they existed.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--force', action='store_true', help='Regenerate thumbnails for every article with an image.')
+
+  def handle(self, **options):
+    articles = Article.objects.exclude(image='')
+    if not options['force']:
+      articles = articles.filter(Q(thumbnails={}) | Q(image_width__isnull=True) | Q(image_height__isnull=True))
+    done = failed = 0
+    for pk, name in articles.order_by('pk').values_list('pk', 'image').iterator():
+      if not default_storage.exists(name):
+        self.stderr.write(f'article {pk}: missing file {name}')
+        failed += 1
+        continue
+      try:
+        with default_storage.open(name, 'rb') as stream:
+          width, height = get_image_dimensions(stream)
+        Article.objects.filter(pk=pk, image=name).update(image_width=width, image_height=height)
+        generate_thumbnails(pk, name)
+      except Exception as error:
+        self.stderr.write(f'article {pk}: {error}')
+        failed += 1
+        continue
+      done += 1
+    self.stdout.write(f'{done} article(s) updated, {failed} failed')
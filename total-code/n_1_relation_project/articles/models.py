@@ -1,7 +1,19 @@
 from django.db import models
+from .uploads import store_upload
 
 # Create your models here.
 class Article(models.Model):
     title = models.CharField(max_length=50)
     content = models.TextField()
-    image = models.ImageField(blank=True,upload_to='images/', height_field=None, width_field=None, max_length=None)
\ No newline at end of file
+    # 이미지를 저장할 때 가로/세로 크기를 같이 저장 (템플릿의 <img width height> 에 사용해서 레이아웃이 밀리지 않게)
+    image = models.ImageField(blank=True,upload_to='images/', height_field='image_height', width_field='image_width', max_length=None)
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    # 썸네일 경로와 크기 (articles/thumbnails.py 가 백그라운드에서 채움)
+    #   {"200": {"width": 200, "height": 150, "jpeg": "images/thumbs/...", "webp": "images/thumbs/..."}, ...}
+    thumbnails = models.JSONField(default=dict, blank=True, editable=False)
+
+    def save(self, *args, **kwargs):
+        # 업로드 핸들러(articles/uploads.py)가 받아둔 이미지는 폼 검증을 통과해서 저장할 때 images/<sha256>.<확장자> 로 옮김
+        store_upload(self.image)
+        super().save(*args, **kwargs)
@@ -0,0 +1,43 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+register = template.Library()
+
+
+# {% article_image article 100 %}
+# 썸네일이 있으면 <picture> 로 WebP 와 JPEG/PNG 후보를 srcset 으로 넘겨서 브라우저가 화면 크기(sizes)에 맞는 파일만 받게 하고
+# 아직 만들어지지 않았으면 원본 이미지를 그대로 보여줌
+# 어느 경우든 원본 비율로 계산한 width / height 를 넣어서 이미지가 로드될 때 레이아웃이 밀리지 않게 함
+@register.simple_tag
+def article_image(article, width, alt=''):
+  if not article.image:
+    return ''
+  height = ''
+  if article.image_width and article.image_height:
+    height = max(1, round(article.image_height * width / article.image_width))
+
+  entries = sorted((article.thumbnails or {}).values(), key=lambda entry: entry['width'])
+  fallback = [(entry.get('jpeg') or entry.get('png'), entry['width']) for entry in entries]
+  fallback = [(name, w) for name, w in fallback if name]
+  if not fallback:
+    return format_html(
+      '<img src="{}" width="{}" height="{}" alt="{}" loading="lazy" decoding="async">',
+      article.image.url, width, height, alt,
+    )
+
+  sizes = f'{width}px'
+  webp = [(entry['webp'], entry['width']) for entry in entries if entry.get('webp')]
+  source = ''
+  if webp:
+    source = format_html('<source type="image/webp" srcset="{}" sizes="{}">', srcset(webp), sizes)
+  # src 는 화면에 보여줄 폭 이상인 것 중 가장 작은 썸네일
+  src = next((name for name, w in fallback if w >= width), fallback[-1][0])
+  return format_html(
+    '<picture>{}<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" loading="lazy" decoding="async"></picture>',
+    source, default_storage.url(src), srcset(fallback), sizes, width, height, alt,
+  )
+
+
+def srcset(candidates):
+  return ', '.join(f'{default_storage.url(name)} {w}w' for name, w in candidates)
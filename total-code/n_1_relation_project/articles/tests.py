@@ -1,3 +1,355 @@
-from django.test import TestCase
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import call_command
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from PIL import Image
+
+from project.assets import AssetMiddleware
+from project.sqlite.base import DatabaseWrapper
+
+from . import checks
+from .cache import get_index_version
+from .models import Article
+from .thumbnails import generate_thumbnails
 
 # Create your tests here.
+class FreshCacheMixin:
+  # 테스트마다 빈 캐시 사용 (locmem 은 테스트끼리 남아있고, shared 는 실제 캐시 디렉터리를 건드리지 않도록 임시 디렉터리)
+  def setUp(self):
+    directory = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+    fresh = override_settings(CACHES={
+      'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+      'shared': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory},
+    })
+    fresh.enable()
+    self.addCleanup(fresh.disable)
+    cache.clear()
+
+
+class InstrumentationTest(TestCase):
+  def test_server_timing_header(self):
+    Article.objects.create(title='title', content='content')
+    response = self.client.get('/articles/')
+    timing = response['Server-Timing']
+    for metric in ('db;dur=', 'template;dur=', 'total;dur='):
+      self.assertIn(metric, timing)
+    # 템플릿이 렌더링되었다는 테스트 클라이언트 정보도 그대로 남아있음
+    self.assertTemplateUsed(response, 'articles/index.html')
+
+
+class IndexTest(FreshCacheMixin, TestCase):
+  def setUp(self):
+    super().setUp()
+    for i in range(25):
+      Article.objects.create(title=f'title{i}', content=f'content{i}')
+
+  def test_anonymous_list_is_limited_in_sql_and_cached(self):
+    with self.assertNumQueries(1) as queries:
+      response = self.client.get('/articles/')
+    self.assertIn('LIMIT 3', queries.captured_queries[0]['sql'])
+    self.assertContains(response, 'title2')
+    self.assertNotContains(response, 'title3<')
+
+    # 두번째 요청은 캐시된 목록을 사용
+    with self.assertNumQueries(0):
+      self.client.get('/articles/')
+
+  def test_authenticated_list_is_paginated(self):
+    self.client.force_login(get_user_model().objects.create_user('user', password='password'))
+    response = self.client.get('/articles/?page=2')
+    self.assertContains(response, 'title24')
+    self.assertNotContains(response, 'title0<')
+    self.assertContains(response, '2 / 2')
+
+  def test_page_cache_key_uses_clamped_number(self):
+    self.client.force_login(get_user_model().objects.create_user('user', password='password'))
+    for page in ('2', '3', '999999', '-1', 'abc', '1'):
+      self.client.get('/articles/', {'page': page})
+    # 범위를 넘거나 숫자가 아닌 값은 마지막 / 첫 페이지와 같은 캐시를 사용 (페이지 수만큼만 저장)
+    version = get_index_version()
+    for number in (1, 2):
+      self.assertIsNotNone(cache.get(make_template_fragment_key('articles_index', [version, True, number])))
+    for number in (3, 999999, -1, 'abc'):
+      self.assertIsNone(cache.get(make_template_fragment_key('articles_index', [version, True, number])))
+    self.assertContains(self.client.get('/articles/', {'page': '999999'}), '2 / 2')
+
+  def test_version_is_shared_between_processes(self):
+    self.assertEqual(checks.check_index_cache(None), [])
+    # 다른 프로세스에서 버전을 올린 것처럼 공유 캐시의 값만 바꿔도 이 프로세스의 목록이 바뀜
+    self.client.get('/articles/')
+    Article.objects.filter(title='title0').update(title='renamed')
+    caches['shared'].incr('articles:index:version')
+    self.assertContains(self.client.get('/articles/'), 'renamed')
+    with self.settings(ARTICLES_INDEX={'CACHE': 'default'}):
+      self.assertEqual([error.id for error in checks.check_index_cache(None)], ['articles.W001'])
+
+  def test_create_edit_delete_invalidate(self):
+    self.client.get('/articles/')
+    article = Article.objects.order_by('pk').first()
+    with self.captureOnCommitCallbacks(execute=True):
+      self.client.post(f'/articles/{article.pk}/edit/', {'title': 'changed', 'content': 'content'})
+    self.assertContains(self.client.get('/articles/'), 'changed')
+
+    with self.captureOnCommitCallbacks(execute=True):
+      self.client.get(f'/articles/{article.pk}/delete/')
+    self.assertNotContains(self.client.get('/articles/'), 'changed')
+
+
+def make_image(size, name='photo.jpg', format='JPEG', color=(200, 100, 50)):
+  buffer = BytesIO()
+  Image.new('RGB', size, color).save(buffer, format=format)
+  return SimpleUploadedFile(name, buffer.getvalue(), content_type=f'image/{format.lower()}')
+
+
+class ThumbnailTest(FreshCacheMixin, TestCase):
+  def setUp(self):
+    super().setUp()
+    self.media_root = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+    settings = override_settings(
+      MEDIA_ROOT=self.media_root,
+      ARTICLES_THUMBNAILS={'WIDTHS': [100, 200, 400], 'WEBP': True, 'QUALITY': 80, 'ASYNC': False},
+    )
+    settings.enable()
+    self.addCleanup(settings.disable)
+
+  def test_create_generates_thumbnails_and_index_uses_srcset(self):
+    with self.captureOnCommitCallbacks(execute=True):
+      self.client.post('/articles/create/', {'title': 'title', 'content': 'content', 'image': make_image((300, 150))})
+    article = Article.objects.get()
+    self.assertEqual((article.image_width, article.image_height), (300, 150))
+    # 원본(300px)보다 큰 400은 만들지 않음
+    self.assertEqual(sorted(article.thumbnails), ['100', '200'])
+    self.assertEqual(article.thumbnails['100']['height'], 50)
+    for key in ('jpeg', 'webp'):
+      self.assertTrue(default_storage.exists(article.thumbnails['200'][key]))
+
+    response = self.client.get('/articles/')
+    self.assertContains(response, 'type="image/webp"')
+    self.assertContains(response, ' 200w')
+    self.assertContains(response, 'width="100" height="50"')
+
+  def test_edit_replaces_thumbnails(self):
+    with self.captureOnCommitCallbacks(execute=True):
+      self.client.post('/articles/create/', {'title': 'title', 'content': 'content', 'image': make_image((300, 150))})
+    article = Article.objects.get()
+    old_files = [article.thumbnails[width][key] for width in ('100', '200') for key in ('jpeg', 'webp')]
+    self.assertTrue(all(default_storage.exists(name) for name in old_files))
+    with self.captureOnCommitCallbacks(execute=True):
+      self.client.post(f'/articles/{article.pk}/edit/', {'title': 'title', 'content': 'content', 'image': make_image((150, 300), 'other.jpg')})
+    article.refresh_from_db()
+    self.assertEqual((article.image_width, article.image_height), (150, 300))
+    self.assertEqual(list(article.thumbnails), ['100'])
+    self.assertIn(f'{article.image.name[7:-4]}_100', article.thumbnails['100']['jpeg'])
+    # 예전 이미지의 썸네일 파일은 지워짐
+    self.assertFalse(any(default_storage.exists(name) for name in old_files))
+    self.assertTrue(default_storage.exists(article.thumbnails['100']['jpeg']))
+
+  def test_stale_thumbnails_are_not_kept(self):
+    # 변환 중에 이미지가 바뀐 경우 (이미 다른 이미지로 바뀐 게시글의 예전 이미지로 만든 썸네일)
+    with self.captureOnCommitCallbacks(execute=True):
+      self.client.post('/articles/create/', {'title': 'title', 'content': 'content', 'image': make_image((300, 150))})
+    article = Article.objects.get()
+    stale = default_storage.save('images/stale.jpg', make_image((300, 150)))
+    thumbnails = generate_thumbnails(article.pk, stale)
+    self.assertFalse(default_storage.exists(thumbnails['100']['jpeg']))
+    article.refresh_from_db()
+    self.assertTrue(default_storage.exists(article.thumbnails['100']['jpeg']))
+
+  def test_backfill_command(self):
+    # 썸네일 / 크기 없이 저장된 예전 게시글
+    name = default_storage.save('images/old.jpg', make_image((300, 150)))
+    Article.objects.bulk_create([Article(title='title', content='content', image=name)])
+    call_command('backfill_thumbnails', stdout=StringIO())
+    article = Article.objects.get()
+    self.assertEqual((article.image_width, article.image_height), (300, 150))
+    self.assertEqual(sorted(article.thumbnails), ['100', '200'])
+
+
+class AsyncThumbnailTest(FreshCacheMixin, TransactionTestCase):
+  def setUp(self):
+    super().setUp()
+    self.media_root = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+    settings = override_settings(
+      MEDIA_ROOT=self.media_root,
+      ARTICLES_THUMBNAILS={'WIDTHS': [100], 'WEBP': True, 'QUALITY': 80, 'ASYNC': True},
+    )
+    settings.enable()
+    self.addCleanup(settings.disable)
+
+  def test_index_cache_is_invalidated_when_thumbnails_are_ready(self):
+    # 작업 스레드가 하나인 풀에서 먼저 대기 작업을 실행해서 썸네일 생성을 목록을 캐시한 뒤로 미룸
+    executor = ThreadPoolExecutor(max_workers=1)
+    release = threading.Event()
+    executor.submit(release.wait)
+    with mock.patch('articles.thumbnails.get_executor', return_value=executor):
+      self.client.post('/articles/create/', {'title': 'title', 'content': 'content', 'image': make_image((300, 150))})
+      self.assertNotContains(self.client.get('/articles/'), 'type="image/webp"')
+      release.set()
+      executor.shutdown(wait=True)
+    self.assertContains(self.client.get('/articles/'), 'type="image/webp"')
+
+
+class UploadTest(FreshCacheMixin, TestCase):
+  def setUp(self):
+    super().setUp()
+    self.media_root = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+    settings = override_settings(
+      MEDIA_ROOT=self.media_root,
+      ARTICLES_THUMBNAILS={'WIDTHS': [], 'ASYNC': False},
+      ARTICLES_UPLOADS={'MAX_SIZE': 20 * 1024, 'CONTENT_TYPES': ['image/jpeg', 'image/png'], 'DIRECTORY': 'images/'},
+    )
+    settings.enable()
+    self.addCleanup(settings.disable)
+
+  def post(self, image):
+    return self.client.post('/articles/create/', {'title': 'title', 'content': 'content', 'image': image})
+
+  def stored_files(self):
+    return sorted(os.listdir(os.path.join(self.media_root, 'images')))
+
+  def test_same_content_is_stored_once(self):
+    self.post(make_image((40, 30), 'a.png', 'PNG'))
+    self.post(make_image((40, 30), 'b.png', 'PNG'))
+    first, second = Article.objects.order_by('pk')
+    self.assertEqual(first.image.name, second.image.name)
+    self.assertEqual((second.image_width, second.image_height), (40, 30))
+    # 저장된 파일은 하나, 임시 파일은 남지 않음
+    self.assertEqual(self.stored_files(), ['.incoming', first.image.name[7:]])
+    self.assertEqual(os.listdir(os.path.join(self.media_root, 'images', '.incoming')), [])
+    self.assertEqual(len(first.image.name), len('images/') + 64 + len('.png'))
+
+  def test_rejects_disguised_file(self):
+    fake = SimpleUploadedFile('photo.jpg', b'not an image at all', content_type='image/jpeg')
+    response = self.post(fake)
+    self.assertContains(response, '이미지 파일이 아닙니다.')
+    self.assertFalse(Article.objects.exists())
+
+  def test_rejects_type_and_size(self):
+    response = self.post(make_image((10, 10), 'a.gif', 'GIF'))
+    self.assertContains(response, '업로드할 수 없는 파일 형식입니다.')
+    big = SimpleUploadedFile('big.png', b'\x89PNG\r\n\x1a\n' + b'0' * 40 * 1024, content_type='image/png')
+    response = self.post(big)
+    self.assertContains(response, '파일 크기는')
+    self.assertFalse(Article.objects.exists())
+
+  def test_empty_file_is_reported_as_form_error(self):
+    for content in (b'', b'\x89PNG'):
+      response = self.post(SimpleUploadedFile('empty.png', content, content_type='image/png'))
+      self.assertContains(response, '이미지 파일이 아닙니다.')
+    self.assertFalse(Article.objects.exists())
+
+  def test_unsaved_uploads_are_not_kept(self):
+    # 폼 에러 (제목 없음)
+    response = self.client.post('/articles/create/', {'content': 'content', 'image': make_image((40, 30), 'a.png', 'PNG')})
+    self.assertEqual(response.status_code, 200)
+    # CSRF 토큰이 없는 요청
+    client = Client(enforce_csrf_checks=True)
+    response = client.post('/articles/create/', {'title': 'title', 'content': 'content', 'image': make_image((40, 30), 'b.png', 'PNG')})
+    self.assertEqual(response.status_code, 403)
+    # 업로드 핸들러를 쓰지 않는 뷰
+    response = client.post('/accounts/login/', {'username': 'a', 'image': make_image((40, 30), 'c.png', 'PNG')})
+    self.assertEqual(response.status_code, 403)
+
+    self.assertFalse(Article.objects.exists())
+    self.assertEqual(self.stored_files(), ['.incoming'])
+    self.assertEqual(os.listdir(os.path.join(self.media_root, 'images', '.incoming')), [])
+
+
+class AssetServingTest(TestCase):
+  def setUp(self):
+    self.root = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+    source = os.path.join(self.root, 'source')
+    os.makedirs(source)
+    with open(os.path.join(source, 'site.css'), 'w') as stream:
+      stream.write('body { color: black; }\n' * 100)
+    os.makedirs(os.path.join(self.root, 'media', 'images'))
+    with open(os.path.join(self.root, 'media', 'images', 'a' * 64 + '.png'), 'wb') as stream:
+      stream.write(b'png')
+    settings = override_settings(
+      STATICFILES_DIRS=[source],
+      STATIC_ROOT=os.path.join(self.root, 'static'),
+      MEDIA_ROOT=os.path.join(self.root, 'media'),
+      STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'project.assets.CompressedManifestStaticFilesStorage'},
+      },
+      ASSET_SERVING={'ENABLED': True},
+    )
+    settings.enable()
+    self.addCleanup(settings.disable)
+    call_command('collectstatic', interactive=False, verbosity=0)
+    self.middleware = AssetMiddleware(lambda request: HttpResponse(status=404))
+    self.factory = RequestFactory()
+
+  def test_hashed_static_file_is_precompressed_and_immutable(self):
+    url = staticfiles_storage.url('site.css')
+    self.assertRegex(url, r'/static/site\.[0-9a-f]{12}\.css$')
+    response = self.middleware(self.factory.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate'))
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(response['Content-Encoding'], 'gzip')
+    self.assertEqual(response['Content-Type'], 'text/css')
+    self.assertIn('immutable', response['Cache-Control'])
+    response.close()
+
+    response = self.middleware(self.factory.get(url, HTTP_IF_NONE_MATCH=response['ETag']))
+    self.assertEqual(response.status_code, 304)
+
+  def test_unhashed_static_and_media(self):
+    response = self.middleware(self.factory.get('/static/site.css'))
+    self.assertNotIn('Content-Encoding', response)
+    self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+    response.close()
+
+    response = self.middleware(self.factory.get('/media/images/' + 'a' * 64 + '.png'))
+    self.assertIn('immutable', response['Cache-Control'])
+    response.close()
+    # MEDIA_ROOT 밖의 파일은 내려주지 않음
+    self.assertEqual(self.middleware(self.factory.get('/media/../manage.py')).status_code, 404)
+
+
+class SQLiteBackendTest(TestCase):
+  def setUp(self):
+    # 테스트 DB는 메모리 DB라서 WAL 이 적용되지 않으므로 같은 설정으로 임시 파일 DB에 연결
+    root = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+    self.path = os.path.join(root, 'db.sqlite3')
+    self.db = DatabaseWrapper({**connection.settings_dict, 'NAME': self.path}, alias='sqlite-backend-test')
+    self.addCleanup(self.db.close)
+
+  def test_pragmas_are_set_on_new_connections(self):
+    with self.db.cursor() as cursor:
+      self.assertEqual(cursor.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+      # 1 = NORMAL
+      self.assertEqual(cursor.execute('PRAGMA synchronous').fetchone()[0], 1)
+      self.assertEqual(cursor.execute('PRAGMA cache_size').fetchone()[0], -20000)
+
+  def test_transactions_take_the_write_lock_when_they_begin(self):
+    self.db.ensure_connection()
+    self.db._start_transaction_under_autocommit()
+    other = sqlite3.connect(self.path, timeout=0)
+    self.addCleanup(other.close)
+    with self.assertRaisesMessage(sqlite3.OperationalError, 'database is locked'):
+      other.execute('BEGIN IMMEDIATE')
+    # 쓰는 중에도 읽을 수 있음 (WAL)
+    other.execute('SELECT * FROM sqlite_master').fetchall()
+    self.db.connection.rollback()
@@ -0,0 +1,131 @@
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from .cache import invalidate_index
+from .models import Article
+
+
+# 업로드된 Article.image 로 폭별 썸네일(JPEG/PNG + WebP)을 만드는 모듈
+# 목록 페이지가 원본 이미지를 100px로 줄여서 보여주면 페이지를 열 때마다 원본 전체를 내려받게 되므로
+# 저장할 때 작은 크기의 파일을 미리 만들어두고 템플릿에서 srcset 으로 알맞은 크기를 고르게 함
+#   - create / edit 에서 이미지가 바뀌면 트랜잭션 커밋 후 schedule_thumbnails 로 작업을 넘김
+#   - 이미지 변환은 요청을 처리하는 스레드가 아니라 ThreadPoolExecutor 의 작업 스레드에서 실행
+#   - 결과는 Article.thumbnails (JSONField) 에 저장, 변환 중에 이미지가 또 바뀌었으면 저장하지 않고 만든 파일도 지움
+#   - 이미지가 바뀌면 예전 썸네일 파일은 discard_thumbnails 로 트랜잭션 커밋 후에 지움
+#   - 저장하면 목록 캐시(articles/cache.py)를 무효화 (썸네일 없이 캐시된 목록이 CACHE_TIMEOUT 동안 남지 않게)
+# 썸네일이 없는 예전 게시글은 manage.py backfill_thumbnails 로 만듦
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_options():
+  return getattr(settings, 'ARTICLES_THUMBNAILS', {})
+
+
+def get_executor():
+  global _executor
+  if _executor is None:
+    _executor = ThreadPoolExecutor(max_workers=get_options().get('WORKERS', 2), thread_name_prefix='thumbnails')
+  return _executor
+
+
+def schedule_thumbnails(article):
+  if not article.image:
+    return
+  pk, name = article.pk, article.image.name
+  transaction.on_commit(lambda: submit(pk, name))
+
+
+def submit(pk, name):
+  # ASYNC가 False면 (테스트, 개발 환경) 요청 스레드에서 바로 만듦
+  if get_options().get('ASYNC', True):
+    get_executor().submit(run_in_worker, pk, name)
+  else:
+    generate_thumbnails(pk, name)
+
+
+def discard_thumbnails(thumbnails):
+  # 롤백되면 예전 썸네일을 계속 써야 하므로 커밋된 뒤에 지움
+  names = thumbnail_files(thumbnails)
+  if names:
+    transaction.on_commit(lambda: delete_files(names))
+
+
+def thumbnail_files(thumbnails):
+  return [name for entry in thumbnails.values() for key, name in entry.items() if key not in ('width', 'height')]
+
+
+def delete_files(names):
+  for name in names:
+    default_storage.delete(name)
+
+
+def run_in_worker(pk, name):
+  try:
+    generate_thumbnails(pk, name)
+  except Exception:
+    logger.exception('thumbnail generation failed for article %s (%s)', pk, name)
+  finally:
+    # 작업 스레드가 연 DB 연결 정리
+    close_old_connections()
+
+
+def thumbnail_name(name, width, extension):
+  stem = posixpath.splitext(posixpath.basename(name))[0]
+  return posixpath.join(posixpath.dirname(name), 'thumbs', f'{stem}_{width}.{extension}')
+
+
+def save_image(image, name, format, **params):
+  buffer = BytesIO()
+  image.save(buffer, format=format, **params)
+  # 같은 이름의 파일이 있으면 지우고 저장 (storage가 뒤에 임의 문자열을 붙이지 않게)
+  if default_storage.exists(name):
+    default_storage.delete(name)
+  return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def generate_thumbnails(pk, name):
+  options = get_options()
+  quality = options.get('QUALITY', 80)
+  with default_storage.open(name, 'rb') as stream:
+    original = Image.open(stream)
+    # 휴대폰 사진의 EXIF 회전 정보를 반영
+    original = ImageOps.exif_transpose(original)
+    original.load()
+
+  has_alpha = original.mode in ('RGBA', 'LA') or (original.mode == 'P' and 'transparency' in original.info)
+  original = original.convert('RGBA' if has_alpha else 'RGB')
+
+  thumbnails = {}
+  for width in sorted(options.get('WIDTHS', [100, 200, 400])):
+    # 원본보다 크게 늘리지는 않음
+    if width >= original.width:
+      continue
+    height = max(1, round(original.height * width / original.width))
+    resized = original.resize((width, height), Image.LANCZOS)
+    entry = {'width': width, 'height': height}
+    # 투명 배경이 있으면 PNG, 아니면 JPEG
+    if has_alpha:
+      entry['png'] = save_image(resized, thumbnail_name(name, width, 'png'), 'PNG', optimize=True)
+    else:
+      entry['jpeg'] = save_image(resized, thumbnail_name(name, width, 'jpg'), 'JPEG', quality=quality, optimize=True, progressive=True)
+    if options.get('WEBP', True):
+      entry['webp'] = save_image(resized, thumbnail_name(name, width, 'webp'), 'WEBP', quality=quality, method=4)
+    thumbnails[str(width)] = entry
+
+  # 그 사이 다른 이미지로 바뀌었으면 이번 결과는 버림
+  if Article.objects.filter(pk=pk, image=name).update(thumbnails=thumbnails):
+    invalidate_index()
+  else:
+    delete_files(thumbnail_files(thumbnails))
+  return thumbnails
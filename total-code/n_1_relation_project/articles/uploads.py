@@ -0,0 +1,218 @@
+import hashlib
+import os
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from functools import wraps
+
+from django.core.files.uploadedfile import SimpleUploadedFile, UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopFutureHandlers, StopUpload
+from django.template.defaultfilters import filesizeformat
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+
+# 업로드 파일을 MEDIA_ROOT 에 바로 쓰면서 sha256 을 계산하는 업로드 핸들러 (@hashing_uploads 를 붙인 뷰에서만 사용)
+# 기본 핸들러는 파일을 메모리나 /tmp 에 다 받아둔 다음 모델을 저장할 때 MEDIA_ROOT 로 한번 더 복사하는데
+#   - 청크가 들어올 때마다 MEDIA_ROOT 아래 임시 파일(images/.incoming/<uuid>.part)에 바로 쓰고 해시를 같이 계산
+#   - 폼 검증을 통과해서 Article 을 저장할 때만 images/<sha256>.<확장자> 로 이름을 바꿈 (같은 파일시스템이라 복사 없음)
+#     같은 해시의 파일이 이미 있으면 받은 파일은 지우고 기존 파일을 같이 사용 (중복 제거)
+#   - 저장되지 않은 파일(폼 에러, CSRF 실패 등)은 요청이 끝날 때 지움 (장고의 TemporaryUploadedFile 과 같음)
+# 크기 / 형식 제한은 요청 본문을 다 읽기 전에 검사해서 넘으면 바로 업로드를 멈춤
+#   - Content-Length 가 MAX_SIZE 보다 크면 파일 부분이 시작될 때 멈춤
+#   - Content-Type 헤더가 허용된 형식이 아니면 그 파일은 건너뜀
+#   - 파일 시그니처(매직 바이트)가 이미지가 아니면 건너뜀
+#   - 받은 크기가 MAX_SIZE 를 넘으면 그 자리에서 멈춤
+# 거절한 이유는 request.upload_errors 에 남겨두고 ArticleForm 이 폼 에러로 보여줌
+# (파일시스템 저장소가 아니면 파일은 다음 핸들러에게 넘기고 제한 검사만 함)
+
+# 파일 시그니처 -> (content type, 확장자)
+SIGNATURES = [
+  (b'\xff\xd8\xff', 'image/jpeg', 'jpg'),
+  (b'\x89PNG\r\n\x1a\n', 'image/png', 'png'),
+  (b'GIF87a', 'image/gif', 'gif'),
+  (b'GIF89a', 'image/gif', 'gif'),
+]
+SIGNATURE_LENGTH = 12
+
+
+def get_options():
+  return getattr(settings, 'ARTICLES_UPLOADS', {})
+
+
+def get_upload_errors(request):
+  return getattr(request, 'upload_errors', {})
+
+
+def sniff(head):
+  for signature, content_type, extension in SIGNATURES:
+    if head.startswith(signature):
+      return content_type, extension
+  # WebP : RIFF....WEBP
+  if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+    return 'image/webp', 'webp'
+  return None
+
+
+class IncomingUploadedFile(UploadedFile):
+  # 업로드 핸들러가 images/.incoming 에 받아둔 파일 (store() 를 호출해야 저장소에 남음)
+  def __init__(self, path, name, content_type, size, sha256, extension):
+    super().__init__(open(path, 'rb'), name, content_type, size)
+    self.path = path
+    self.sha256 = sha256
+    self.extension = extension
+    self.stored_name = None
+
+  def temporary_file_path(self):
+    # forms.ImageField 가 이 경로로 이미지를 검사함 (파일을 다시 읽어서 메모리에 올리지 않음)
+    return self.path
+
+  def store(self, directory):
+    # images/<sha256>.<확장자> 로 옮기고 저장소 안의 이름을 돌려줌
+    if self.stored_name is None:
+      stored_name = os.path.join(directory, f'{self.sha256}.{self.extension}')
+      if default_storage.exists(stored_name):
+        # 같은 내용의 파일이 이미 있음
+        remove(self.path)
+      else:
+        os.replace(self.path, default_storage.path(stored_name))
+      self.stored_name = stored_name
+    return self.stored_name
+
+  def close(self):
+    try:
+      super().close()
+    finally:
+      # 요청이 끝날 때(request.close) 저장되지 않은 파일은 지움
+      if self.stored_name is None:
+        remove(self.path)
+
+
+def store_upload(field_file):
+  # Article.save() 에서 호출 : 업로드 핸들러가 받아둔 파일이면 저장소로 옮기고 FieldFile 을 저장된 이름으로 바꿈
+  if field_file and not field_file._committed and isinstance(field_file.file, IncomingUploadedFile):
+    field_file.name = field_file.file.store(get_options().get('DIRECTORY', 'images/'))
+    field_file._committed = True
+
+
+def remove(path):
+  try:
+    os.remove(path)
+  except FileNotFoundError:
+    pass
+
+
+def hashing_uploads(view):
+  # 이 뷰의 업로드 파일만 HashingUploadHandler 로 받음
+  # 업로드 핸들러는 request.POST 를 읽기 전에 바꿔야 하므로 CSRF 검사(POST 를 읽음)는 핸들러를 바꾼 다음에 함
+  protected = csrf_protect(view)
+
+  @csrf_exempt
+  @wraps(view)
+  def wrapper(request, *args, **kwargs):
+    request.upload_handlers.insert(0, HashingUploadHandler(request))
+    return protected(request, *args, **kwargs)
+  return wrapper
+
+
+class HashingUploadHandler(FileUploadHandler):
+  def __init__(self, request=None):
+    super().__init__(request)
+    options = get_options()
+    self.max_size = options.get('MAX_SIZE', 10 * 1024 * 1024)
+    self.content_types = set(options.get('CONTENT_TYPES', ['image/jpeg', 'image/png', 'image/gif', 'image/webp']))
+    self.directory = options.get('DIRECTORY', 'images/')
+    self.request_too_large = False
+    self.partial_path = None
+
+  def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+    # 요청 전체 크기가 제한을 넘으면 파일 부분이 시작될 때 멈춤 (폼의 다른 필드는 읽을 수 있도록 여기서는 표시만)
+    self.request_too_large = content_length > self.max_size + 64 * 1024
+    # 파일시스템 저장소일 때만 MEDIA_ROOT 에 바로 씀
+    try:
+      default_storage.path(self.directory)
+      self.activated = True
+    except NotImplementedError:
+      self.activated = False
+
+  def record_error(self, message):
+    self.discard()
+    if self.request is not None:
+      if not hasattr(self.request, 'upload_errors'):
+        self.request.upload_errors = {}
+      self.request.upload_errors[self.field_name] = message
+
+  def reject(self, message, stop=False):
+    self.record_error(message)
+    if stop:
+      # 남은 요청 본문은 읽지 않음
+      raise StopUpload(connection_reset=True)
+    raise SkipFile
+
+  def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+    super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+    self.size = 0
+    self.head = b''
+    self.sniffed = None
+    self.sha256 = hashlib.sha256()
+    if self.request_too_large or (content_length or 0) > self.max_size:
+      self.reject(f'파일 크기는 {filesizeformat(self.max_size)} 이하여야 합니다.', stop=True)
+    if content_type not in self.content_types:
+      self.reject('업로드할 수 없는 파일 형식입니다.')
+    if self.activated:
+      incoming = default_storage.path(os.path.join(self.directory, '.incoming'))
+      os.makedirs(incoming, exist_ok=True)
+      self.partial_path = os.path.join(incoming, f'{uuid.uuid4().hex}.part')
+      self.file = open(self.partial_path, 'wb')
+      # 다음 핸들러(메모리 / 임시 파일)는 이 파일을 받지 않음
+      raise StopFutureHandlers
+
+  def receive_data_chunk(self, raw_data, start):
+    self.size += len(raw_data)
+    if self.size > self.max_size:
+      self.reject(f'파일 크기는 {filesizeformat(self.max_size)} 이하여야 합니다.', stop=True)
+    if self.sniffed is None:
+      self.head += raw_data[:SIGNATURE_LENGTH - len(self.head)]
+      if len(self.head) >= SIGNATURE_LENGTH:
+        self.check_signature()
+    if not self.activated:
+      return raw_data
+    self.sha256.update(raw_data)
+    self.file.write(raw_data)
+    return None
+
+  def is_image(self):
+    self.sniffed = sniff(self.head)
+    return self.sniffed is not None and self.sniffed[0] in self.content_types
+
+  def check_signature(self):
+    if not self.is_image():
+      self.reject('이미지 파일이 아닙니다.')
+
+  def file_complete(self, file_size):
+    if self.sniffed is None and not self.is_image():
+      # 시그니처 길이보다 작은 (빈) 파일
+      # 장고는 file_complete 에서 발생한 SkipFile 을 처리하지 않으므로 빈 파일을 돌려주고 폼 에러로 보여줌
+      self.record_error('이미지 파일이 아닙니다.')
+      return SimpleUploadedFile(self.file_name, b'', self.content_type)
+    if not self.activated:
+      return None
+    self.file.close()
+    content_type, extension = self.sniffed
+    path, self.partial_path = self.partial_path, None
+    return IncomingUploadedFile(path, self.file_name, content_type, file_size, self.sha256.hexdigest(), extension)
+
+  def discard(self):
+    if self.partial_path is None:
+      return
+    if hasattr(self, 'file'):
+      self.file.close()
+    remove(self.partial_path)
+    self.partial_path = None
+
+  def upload_interrupted(self):
+    self.discard()
+
+  def upload_complete(self):
+    # 중간에 끊긴 업로드의 임시 파일 정리
+    self.discard()
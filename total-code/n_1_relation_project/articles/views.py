@@ -1,15 +1,37 @@
+from django.core.paginator import Paginator
 from django.shortcuts import render, redirect
+from django.utils.functional import SimpleLazyObject
+from .cache import get_index_version, get_options, invalidate_index
 from .forms import ArticleForm
 from .models import Article
+from .thumbnails import discard_thumbnails, schedule_thumbnails
+from .uploads import get_upload_errors, hashing_uploads
 
 # Create your views here.
 def index(request):
-  articles = Article.objects.all()
+  options = get_options()
+  # 로그인하지 않은 사용자는 앞의 몇개만 보여주므로 LIMIT을 SQL에 넣어서 그만큼만 조회
+  # 로그인한 사용자는 전체 목록을 PAGE_SIZE 씩 나눠서 보여줌
+  # 목록 부분은 템플릿에서 {% cache %} 로 저장하므로 캐시에 있으면 아래 쿼리는 실행되지 않음 (SimpleLazyObject)
+  if request.user.is_authenticated:
+    paginator = Paginator(Article.objects.only('id', 'title', 'content').order_by('pk'), options.get('PAGE_SIZE', 20))
+    # get_page 는 숫자가 아니면 첫 페이지, 범위를 넘으면 마지막 페이지로 바꿔줌
+    # 템플릿의 캐시 키는 바뀐 번호(page_obj.number)를 쓰므로 ?page= 값을 아무리 바꿔도 페이지 수만큼만 저장됨
+    # (캐시에 있어도 번호를 확인하는 COUNT 쿼리 1번은 실행됨)
+    page_obj = SimpleLazyObject(lambda: paginator.get_page(request.GET.get('page')))
+    articles = SimpleLazyObject(lambda: page_obj.object_list)
+  else:
+    page_obj = None
+    articles = Article.objects.only('id', 'title', 'content', 'image', 'image_width', 'image_height', 'thumbnails').order_by('pk')[:options.get('ANONYMOUS_LIMIT', 3)]
   context = {
     'articles' : articles,
+    'page_obj' : page_obj,
+    'index_version' : get_index_version(),
+    'index_cache_timeout' : options.get('CACHE_TIMEOUT', 300),
   }
   return render(request, 'articles/index.html', context)
 
+
 def detail(request, pk):
   article = Article.objects.get(pk=pk)
   context = {
@@ -18,13 +40,18 @@ def detail(request, pk):
   return render(request, 'articles/detail.html', context)
 
 
+@hashing_uploads
 def create(request):
   if request.method == 'POST':
     # 모델폼의 2번째 인자로 요청받은 파일 데이터를 작성
       # 모델 폼의 상위 클래스인 BaseModelForm의 생성자 함수의 2번째 위치 인자로 파일을 받도록 설정돼있음 
-    form = ArticleForm(request.POST, request.FILES)
+    form = ArticleForm(request.POST, request.FILES, upload_errors=get_upload_errors(request))
     if form.is_valid():
-      form.save()
+      article = form.save()
+      # 썸네일은 커밋 후 백그라운드에서 생성
+      schedule_thumbnails(article)
+      # 목록 캐시 무효화
+      invalidate_index()
       return redirect('articles:index')
   else:
     form = ArticleForm()
@@ -44,6 +71,7 @@ def create(request):
 # 조건문은 http 요청을 기준으로 조건을 건거임
   # 단순히 보면 GET은 달라는거고 POST는 생성해달라는 거임 
 
+@hashing_uploads
 def edit(request,pk):
   article = Article.objects.get(pk=pk)
   # 어떻게 폼안에 내가 썼던게 들어가 있을까??
@@ -59,9 +87,19 @@ def edit(request,pk):
       # instance : 수정 대상이 되는 기존 객체
       # form.save() : article 객체에 새 데이터로 덮어쓰기 후 저장
       # 인스턴스없이 리케스트 포스트만 있으면 그냥 또 새로운 게시글 쓰는거임, 근데 인스턴스 덕에 덮어쓰기해서 수정이라는 게 되는 거임
-    form = ArticleForm(request.POST, instance=article)
+    # 이미지도 수정할 수 있도록 request.FILES 도 같이 넘김
+    form = ArticleForm(request.POST, request.FILES, instance=article, upload_errors=get_upload_errors(request))
     if form.is_valid():
-      form.save()
+      article = form.save(commit=False)
+      # 이미지가 바뀌었으면 예전 썸네일은 (파일도 커밋 후에) 지우고 새로 만듦
+      image_changed = 'image' in form.changed_data
+      if image_changed:
+        discard_thumbnails(article.thumbnails)
+        article.thumbnails = {}
+      article.save()
+      if image_changed:
+        schedule_thumbnails(article)
+      invalidate_index()
       return redirect('articles:detail', pk=pk)
   else:
     form = ArticleForm(instance=article)
@@ -79,4 +117,5 @@ def edit(request,pk):
 def delete(request,pk):
   article = Article.objects.get(pk=pk)
   article.delete()
+  invalidate_index()
   return redirect('articles:index')
\ No newline at end of file
@@ -0,0 +1,221 @@
+import gzip
+import mimetypes
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import quote, urlparse
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# 운영 환경에서 정적 파일(STATIC_ROOT)과 미디어 파일(MEDIA_ROOT)을 장고가 직접 내려주는 모드 (settings.ASSET_SERVING['ENABLED'])
+# 기존에는 static() url 패턴으로 매 요청이 세션 / 인증 / 템플릿을 거치는 뷰까지 가고 캐시 헤더도 없었는데
+#   - collectstatic 때 파일 이름에 내용 해시를 붙이고 (ManifestStaticFilesStorage) .gz / .br 파일을 미리 만들어둠
+#   - AssetMiddleware 가 MIDDLEWARE 맨 앞에서 /static/, /media/ 요청을 바로 응답 (뒤의 미들웨어와 url 매칭을 거치지 않음)
+#   - 해시가 붙은 파일은 내용이 바뀌면 이름도 바뀌므로 1년 동안 캐시 (immutable)
+#   - Accept-Encoding 에 맞춰서 미리 압축해둔 파일을 그대로 보냄 (요청마다 압축하지 않음)
+#   - 미디어는 FileResponse (WSGI 서버의 file_wrapper / sendfile) 또는 nginx 의 X-Accel-Redirect 로 보냄
+
+# 압축해서 이득이 있는 파일 (이미지 / 폰트 등은 이미 압축된 형식)
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.mjs', '.map', '.svg', '.txt', '.html', '.json', '.xml', '.ico', '.wasm'}
+COMPRESS_MIN_SIZE = 256
+
+# Accept-Encoding 값 -> 미리 압축한 파일 확장자 (앞에 있는 것을 먼저 사용)
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+# articles/uploads.py 가 저장한 파일 (이름이 sha256 이므로 내용이 바뀌지 않음)
+CONTENT_HASHED_MEDIA_RE = re.compile(r'(^|/)[0-9a-f]{64}\.[0-9a-z]+$')
+
+
+def get_options():
+    return getattr(settings, 'ASSET_SERVING', {})
+
+
+def url_path(url):
+    # 'static/' -> '/static/', 'https://cdn.example.com/static/' -> '/static/'
+    return '/' + urlparse(url).path.lstrip('/')
+
+
+def compress_file(path):
+    # path 옆에 path.gz (와 brotli 가 설치되어 있으면 path.br) 를 만듦, 원본보다 충분히 작지 않으면 만들지 않음
+    if os.path.splitext(path)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+        return
+    with open(path, 'rb') as stream:
+        data = stream.read()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return
+    variants = [('.gz', lambda: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', lambda: brotli.compress(data, quality=11)))
+    for extension, compress in variants:
+        compressed = compress()
+        if len(compressed) < len(data) * 0.95:
+            with open(path + extension, 'wb') as stream:
+                stream.write(compressed)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # collectstatic 후처리: 해시 이름을 붙인 다음 원래 이름 / 해시 이름 파일 모두 미리 압축
+    def post_process(self, paths, dry_run=False, **options):
+        processed_names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if not isinstance(processed, Exception):
+                processed_names.update(filter(None, (name, hashed_name)))
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name in processed_names:
+            compress_file(self.path(name))
+
+
+class Asset:
+    def __init__(self, path, immutable):
+        stat = os.stat(path)
+        self.path = path
+        self.size = stat.st_size
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        self.mtime = int(stat.st_mtime)
+        self.etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        self.immutable = immutable
+        # 'br' -> 'logo.css.br' (파일이 있는 것만)
+        self.encodings = {
+            encoding: path + extension
+            for encoding, extension in ENCODINGS
+            if os.path.isfile(path + extension)
+        }
+
+
+def accepted_encodings(request):
+    accepted = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        token, _, params = part.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(token.strip().lower())
+    return accepted
+
+
+def not_modified(request, asset):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        return if_none_match.strip() == '*' or asset.etag in [tag.strip() for tag in if_none_match.split(',')]
+    if_modified_since = request.META.get('HTTP_IF_MODIFIED_SINCE')
+    if if_modified_since:
+        try:
+            return int(parsedate_to_datetime(if_modified_since).timestamp()) >= asset.mtime
+        except (TypeError, ValueError, OverflowError):
+            return False
+    return False
+
+
+def serve_asset(request, asset, max_age):
+    if asset.immutable:
+        cache_control = f'public, max-age={max_age}, immutable'
+    else:
+        cache_control = f'public, max-age={max_age}'
+    headers = {
+        'Cache-Control': cache_control,
+        'ETag': asset.etag,
+        'Last-Modified': asset.last_modified,
+    }
+    if asset.encodings:
+        headers['Vary'] = 'Accept-Encoding'
+
+    if not_modified(request, asset):
+        response = HttpResponseNotModified()
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    path = asset.path
+    accepted = accepted_encodings(request)
+    for encoding, _ in ENCODINGS:
+        if encoding in asset.encodings and encoding in accepted:
+            path = asset.encodings[encoding]
+            headers['Content-Encoding'] = encoding
+            break
+    # FileResponse 는 WSGI 서버의 wsgi.file_wrapper 로 전달되어 (gunicorn 등) sendfile 로 전송됨
+    response = FileResponse(open(path, 'rb'), content_type=asset.content_type)
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+class AssetMiddleware:
+    def __init__(self, get_response):
+        options = get_options()
+        if not options.get('ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.static_prefix = url_path(settings.STATIC_URL)
+        self.media_prefix = url_path(settings.MEDIA_URL)
+        self.static_max_age = options.get('STATIC_MAX_AGE', 60 * 60 * 24 * 365)
+        self.unhashed_max_age = options.get('UNHASHED_MAX_AGE', 60)
+        self.media_max_age = options.get('MEDIA_MAX_AGE', 60 * 60)
+        self.media_accel_redirect = options.get('MEDIA_ACCEL_REDIRECT')
+        # 정적 파일은 배포 후에 바뀌지 않으므로 서버가 시작할 때 한번만 목록을 만들어둠 (요청마다 디스크를 찾지 않음)
+        self.static_assets = self.scan_static()
+
+    def scan_static(self):
+        root = settings.STATIC_ROOT
+        if not root or not os.path.isdir(root):
+            return {}
+        hashed_names = set()
+        if isinstance(staticfiles_storage, ManifestStaticFilesStorage):
+            hashed_names = set(staticfiles_storage.hashed_files.values())
+        assets = {}
+        for directory, _, files in os.walk(root):
+            for file_name in files:
+                if file_name.endswith(tuple(extension for _, extension in ENCODINGS)):
+                    continue
+                path = os.path.join(directory, file_name)
+                name = os.path.relpath(path, root).replace(os.sep, '/')
+                max_age = self.static_max_age if name in hashed_names else self.unhashed_max_age
+                assets[name] = (Asset(path, immutable=name in hashed_names), max_age)
+        return assets
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD'):
+            path = request.path_info
+            if path.startswith(self.static_prefix):
+                found = self.static_assets.get(path[len(self.static_prefix):])
+                if found is not None:
+                    return serve_asset(request, *found)
+            elif path.startswith(self.media_prefix):
+                response = self.serve_media(request, path[len(self.media_prefix):])
+                if response is not None:
+                    return response
+        return self.get_response(request)
+
+    def media_asset(self, name):
+        # 미디어 파일은 계속 추가 / 교체되므로 (썸네일) 요청마다 파일 정보를 읽음
+        try:
+            path = safe_join(settings.MEDIA_ROOT, name)
+        except (SuspiciousFileOperation, ValueError):
+            return None
+        if not os.path.isfile(path):
+            return None
+        return Asset(path, immutable=bool(CONTENT_HASHED_MEDIA_RE.search(name)))
+
+    def serve_media(self, request, name):
+        asset = self.media_asset(name)
+        if asset is None:
+            return None
+        max_age = self.static_max_age if asset.immutable else self.media_max_age
+        if self.media_accel_redirect:
+            # nginx 가 파일을 직접 보내도록 내부 경로만 알려줌 (location ... { internal; alias MEDIA_ROOT; })
+            response = HttpResponse(content_type=asset.content_type)
+            response['X-Accel-Redirect'] = self.media_accel_redirect.rstrip('/') + '/' + quote(name)
+            response['Cache-Control'] = f'public, max-age={max_age}' + (', immutable' if asset.immutable else '')
+            return response
+        return serve_asset(request, asset, max_age)
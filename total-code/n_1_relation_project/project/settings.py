@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,11 +48,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # ASSET_SERVING 이 켜져 있으면 /static/, /media/ 요청을 여기서 바로 응답 (꺼져 있으면 MiddlewareNotUsed 로 빠짐)
+    'project.assets.AssetMiddleware',
+    # 요청별 쿼리 수 / DB 시간 / 템플릿 렌더링 시간 측정 (가장 바깥에서 전체 시간을 재도록 맨 앞에 둠)
+    'project.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # AuthenticationMiddleware 와 같지만 로그인한 사용자를 잠깐 메모리에 보관 (accounts/user_cache.py)
+    'accounts.user_cache.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -63,7 +70,8 @@ ROOT_URLCONF = 'project.urls'
 # 전체 프로젝ㅌ의 템플릿은 자동 인식 안됨 --> 그래서 DIRS로 명시해줘야함 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates 와 같고 렌더링 시간만 Server-Timing 에 기록 (project/instrumentation.py)
+        'BACKEND': 'project.instrumentation.TimedDjangoTemplates',
         # 장고가 어디에서 템플릿을 찾을지 알려주는 역할 
         'DIRS': [BASE_DIR / 'templates' ],
         'APP_DIRS': True,
@@ -84,10 +92,36 @@ WSGI_APPLICATION = 'project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# 서버 실행 방식 (wsgi / asgi), asgi.py 가 환경변수 DJANGO_SERVER_MODE=asgi 로 설정함
+    # ASGI 에서는 sync 코드(ORM)가 요청마다 다른 스레드에서 실행되어 그 스레드의 연결이 요청이 끝나도 닫히지 않고 쌓이므로
+    # (Django ticket #33497) CONN_MAX_AGE 를 0 으로 두어 요청이 끝날 때 연결을 닫음
+SERVER_MODE = os.environ.get('DJANGO_SERVER_MODE', 'wsgi')
+
+# project/sqlite/base.py : 연결을 만들 때 PRAGMA 를 실행하는 SQLite backend
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'project.sqlite',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # 요청이 끝나도 연결을 닫지 않고 CONN_MAX_AGE 초 동안 재사용 (요청마다 연결 + PRAGMA 실행을 반복하지 않음)
+        # (runserver 는 요청마다 스레드를 새로 만들어서 재사용되지 않음)
+        # ASGI 로 실행할 때는 재사용하지 않음 (SERVER_MODE 참고)
+        'CONN_MAX_AGE': 0 if SERVER_MODE == 'asgi' else 600,
+        # 재사용하기 전에 연결이 아직 쓸 수 있는지 확인
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # busy timeout (초)
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                # 256MB
+                'mmap_size': 268435456,
+                # 음수면 KiB 단위 (약 20MB)
+                'cache_size': -20000,
+                'temp_store': 'MEMORY',
+            },
+        },
     }
 }
 
@@ -158,6 +192,38 @@ MEDIA_URL = 'media/'
 ##-----------------------------여기까지가 추가한 코드
 
 
+# 운영용 정적 / 미디어 파일 제공 (project/assets.py)
+    # ENABLED : 켜면 collectstatic 으로 STATIC_ROOT 에 해시 이름 + .gz/.br 파일을 만들고 AssetMiddleware 가 직접 응답
+        # 개발 중에는 꺼두고 runserver / static() 으로 제공 (켜면 먼저 python manage.py collectstatic 필요)
+    # STATIC_MAX_AGE : 해시가 붙은 정적 파일, sha256 이름의 업로드 파일의 캐시 시간(초)
+    # UNHASHED_MAX_AGE : 해시가 없는 이름(/static/logo.png)으로 요청한 정적 파일의 캐시 시간(초)
+    # MEDIA_MAX_AGE : 나머지 미디어 파일(썸네일 등)의 캐시 시간(초)
+    # MEDIA_ACCEL_REDIRECT : nginx 의 internal location 경로 (설정하면 미디어 파일은 nginx 가 X-Accel-Redirect 로 직접 보냄)
+ASSET_SERVING = {
+    'ENABLED': os.environ.get('ASSET_SERVING', '0') == '1',
+    'STATIC_MAX_AGE': 60 * 60 * 24 * 365,
+    'UNHASHED_MAX_AGE': 60,
+    'MEDIA_MAX_AGE': 60 * 60,
+    'MEDIA_ACCEL_REDIRECT': os.environ.get('MEDIA_ACCEL_REDIRECT') or None,
+}
+
+# collectstatic 이 모으는 위치
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'project.assets.CompressedManifestStaticFilesStorage'
+            if ASSET_SERVING['ENABLED']
+            else 'django.contrib.staticfiles.storage.StaticFilesStorage'
+        ),
+    },
+}
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -165,4 +231,152 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
 # 회원가입 폼을 커스텀해서 추가하는 코드
-# AUTH_USER_MODEL = 'accounts.CustomUser'
\ No newline at end of file
+# AUTH_USER_MODEL = 'accounts.CustomUser'
+
+
+# 요청별 측정(project/instrumentation.py) 설정
+    # ENABLED : False면 미들웨어를 사용하지 않음
+    # SERVER_TIMING : Server-Timing 응답 헤더를 붙일지 여부
+    # DUPLICATE_QUERY_THRESHOLD : 같은 SQL이 이 횟수 이상 실행되면 경고 로그 (None이면 검사 안함)
+INSTRUMENTATION = {
+    'ENABLED': True,
+    'SERVER_TIMING': True,
+    'DUPLICATE_QUERY_THRESHOLD': 10,
+}
+
+# 요청마다 남기는 측정 로그(JSON 한 줄)를 콘솔로 출력
+    # 로그 레벨은 환경변수 INSTRUMENTATION_LOG_LEVEL 로 변경 (WARNING이면 중복 쿼리 경고만 출력)
+    # manage.py test 로 실행할 때는 요청마다 찍히지 않도록 WARNING
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'instrumentation': {
+            'handlers': ['console'],
+            'level': os.environ.get('INSTRUMENTATION_LOG_LEVEL', 'WARNING' if 'test' in sys.argv else 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# 캐시 백엔드 설정
+    # default : 프로세스 메모리에 저장하는 locmem (프로세스마다 따로 가짐)
+    # shared : 같은 서버의 모든 프로세스가 공유하는 파일 캐시 (BASE_DIR/.cache/default, CACHE_DIR 환경변수로 변경)
+        # 세션(SESSION_CACHE_ALIAS), 로그인 사용자 / 게시글 목록 버전(ACCOUNTS_USER_CACHE, ARTICLES_INDEX)처럼 다른 프로세스의 변경이 바로 보여야 하는 값을 저장
+        # 여러 서버가 공유해야 하면 redis, memcached 등으로 BACKEND만 바꾸면 됨
+    # 세션 캐시(accounts/session_store.py)와 로그인 사용자 캐시(accounts/user_cache.py)는 공유하는 캐시일 때만 사용됨
+        # locmem 이면 둘다 DB에서 읽고 manage.py check 가 accounts.W001 / accounts.W002 경고
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        # 테스트 실행은 실제 캐시와 섞이지 않도록 하위 디렉터리 사용
+        'LOCATION': os.environ.get('CACHE_DIR') or BASE_DIR / '.cache' / ('test' if 'test' in sys.argv else 'default'),
+    },
+}
+
+# articles:index 목록 설정
+    # PAGE_SIZE : 로그인한 사용자에게 한 페이지에 보여줄 게시글 수
+    # ANONYMOUS_LIMIT : 로그인하지 않은 사용자에게 보여줄 게시글 수
+    # CACHE_TIMEOUT : 렌더링한 목록 부분을 캐시(default)에 보관하는 시간(초)
+    # CACHE : 목록 버전을 저장하는 CACHES 별칭 (프로세스끼리 공유하는 캐시여야 함, articles/cache.py)
+ARTICLES_INDEX = {
+    'PAGE_SIZE': 20,
+    'ANONYMOUS_LIMIT': 3,
+    'CACHE_TIMEOUT': 300,
+    'CACHE': 'shared',
+}
+
+# Article.image 썸네일 설정 (articles/thumbnails.py)
+    # WIDTHS : 만들 썸네일 폭(px) 목록 (원본보다 큰 폭은 건너뜀)
+    # WEBP : JPEG/PNG 외에 WebP 파일도 만들지 여부
+    # QUALITY : JPEG / WebP 압축 품질
+    # WORKERS : 썸네일을 만드는 작업 스레드 수
+    # ASYNC : False면 요청 스레드에서 바로 만듦 (테스트용)
+ARTICLES_THUMBNAILS = {
+    'WIDTHS': [100, 200, 400],
+    'WEBP': True,
+    'QUALITY': 80,
+    'WORKERS': 2,
+    'ASYNC': True,
+}
+
+# 게시글 이미지 업로드 제한 (articles/uploads.py, 게시글 작성 / 수정 뷰에서만 사용)
+    # MAX_SIZE : 파일 하나의 최대 크기(byte)
+    # CONTENT_TYPES : 허용하는 이미지 형식 (Content-Type 헤더와 파일 시그니처 둘다 검사)
+    # DIRECTORY : 업로드 파일을 저장할 MEDIA_ROOT 아래 경로 (Article.image 의 upload_to 와 같게)
+ARTICLES_UPLOADS = {
+    'MAX_SIZE': 10 * 1024 * 1024,
+    'CONTENT_TYPES': ['image/jpeg', 'image/png', 'image/gif', 'image/webp'],
+    'DIRECTORY': 'images/',
+}
+
+# 세션 엔진 (accounts/session_store.py)
+    # 세션을 캐시(SESSION_CACHE_ALIAS = 'shared', 프로세스끼리 공유하는 캐시여야 함)에서 읽고, 내용이 바뀌었을 때만 DB(django_session)에 씀
+    # SESSION_SAVE_EVERY_REQUEST : 장고 기본과 같이 꺼져 있음 (로그인 후 SESSION_COOKIE_AGE 가 지나면 만료)
+        # SESSION_SLIDING_EXPIRY=1 환경변수로 켜면 요청마다 만료 시간을 늘림 (마지막 요청 후 SESSION_COOKIE_AGE 동안 로그인 유지)
+        # 만료 시간만 바뀌는 저장은 EXPIRY_BUMP_INTERVAL 에 한번만 DB에 씀
+SESSION_ENGINE = 'accounts.session_store'
+SESSION_CACHE_ALIAS = 'shared'
+SESSION_SAVE_EVERY_REQUEST = os.environ.get('SESSION_SLIDING_EXPIRY', '0') == '1'
+
+# 세션 엔진 설정
+    # EXPIRY_BUMP_INTERVAL : 만료 시간만 늘어날 때 DB에 다시 쓰는 최소 간격(초, SESSION_SAVE_EVERY_REQUEST 일 때만 사용)
+    # CLEAR_EXPIRED_BATCH_SIZE : python manage.py clearsessions 가 한번에 지우는 세션 수
+ACCOUNTS_SESSIONS = {
+    'EXPIRY_BUMP_INTERVAL': 60 * 60,
+    'CLEAR_EXPIRED_BATCH_SIZE': 1000,
+}
+
+# 로그인 사용자 캐시 설정 (accounts/user_cache.py)
+    # ENABLED : 끄면 장고 기본처럼 요청마다 auth_user 를 조회
+    # TTL : 프로세스 메모리에 보관하는 시간(초)
+    # MAX_ENTRIES : 프로세스마다 보관하는 최대 사용자(세션) 수
+    # CACHE : 사용자별 버전을 저장하는 CACHES 별칭
+        # 프로세스끼리 공유하는 캐시여야 함 (locmem / dummy 면 사용자 캐시를 쓰지 않고 manage.py check 가 accounts.W001 경고)
+ACCOUNTS_USER_CACHE = {
+    'ENABLED': True,
+    'TTL': 60,
+    'MAX_ENTRIES': 1000,
+    'CACHE': 'shared',
+}
+
+# 비밀번호 hasher (앞의 것으로 새 비밀번호를 만들고, 저장된 비밀번호는 알고리즘 이름으로 찾아서 확인)
+    # PooledPBKDF2PasswordHasher : 장고의 PBKDF2PasswordHasher 와 같은 결과를 프로세스 풀에서 계산 (accounts/hashers.py)
+PASSWORD_HASHERS = [
+    'accounts.hashers.PooledPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# 비밀번호 해시 계산 풀 설정
+    # WORKERS : 해시를 계산하는 프로세스 수 (0이면 요청 스레드에서 바로 계산)
+    # QUEUE_SIZE : 계산을 기다릴 수 있는 요청 수 (넘으면 503)
+    # NICE : 작업 프로세스의 우선순위를 낮추는 값 (os.nice, CPU가 부족할 때 요청 처리를 먼저 실행)
+ACCOUNTS_HASHING = {
+    'WORKERS': 2,
+    'QUEUE_SIZE': 8,
+    'NICE': 10,
+}
+
+# 로그인 / 회원가입 / 비밀번호 변경 POST 요청 제한 (accounts/admission.py)
+    # LIMITS : 뷰별 PER_IP / PER_USERNAME = (횟수, 초) - 초 동안 횟수를 넘으면 429
+    # BUSY_RETRY_AFTER : 해시 계산 풀이 가득 찼을 때 Retry-After(초)
+ACCOUNTS_ADMISSION = {
+    'LIMITS': {
+        'login': {'PER_IP': (30, 60), 'PER_USERNAME': (10, 60)},
+        'signup': {'PER_IP': (10, 60)},
+        'change_password': {'PER_IP': (10, 60), 'PER_USERNAME': (5, 60)},
+    },
+    'BUSY_RETRY_AFTER': 1,
+}
+
+# 로그인 / 회원가입을 async 뷰로 처리 (ASGI 로 실행할 때 사용, accounts/async_views.py)
+ACCOUNTS_ASYNC_AUTH = os.environ.get('ACCOUNTS_ASYNC_AUTH', '0') == '1'
@@ -42,4 +42,8 @@ urlpatterns = [
     # 이걸 안 사용하면 여기 파일에 다 떄려넣는건데, 그럼 url이 많아져서 복잡해지고 유지보수 힘들어짐 
     path('accounts/', include('accounts.urls')),
     path('articles/', include('articles.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+# ASSET_SERVING 이 켜져 있으면 미디어 파일은 project.assets.AssetMiddleware 가 응답함
+if not settings.ASSET_SERVING['ENABLED']:
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)